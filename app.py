@@ -1,6 +1,5 @@
 from flask import Flask, jsonify, request
 from flask_swagger_ui import get_swaggerui_blueprint
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -9,36 +8,53 @@ import logging
 import os
 import json
 from config import get_config
-from models import db, User, Task
+from models import db, User, Task, add_missing_columns, create_indexes
+from cache import cache
+from compression import compressor, StaticPayload, FilePayload
+from profiling import profiler
+from events import event_broker, purge_events
+from hashing import password_hasher
+from jwt_cache import CachingJWTManager, revocation_list
+from serialization import create_json_provider
+from database import engine_options, configure_sqlite, init_pool_metrics
+from logging_config import setup_logging, init_logging_metrics
+import ratelimit_storage  # noqa: F401 - enregistre le schéma sqlite:// du limiter
 from auth import auth_bp
-from tasks import tasks_bp
+from tasks import tasks_bp, reconcile_task_counters
+from search import create_search_index
+from seeding import seed_database, SEED_PASSWORD
+import click
 
 # Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("api.log")
-    ]
-)
+setup_logging(get_config())
 logger = logging.getLogger(__name__)
 
 # Création et configuration de l'application Flask
 app = Flask(__name__)
 app.config.from_object(get_config())
+app.json = create_json_provider(app)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
 
 # Initialisation des extensions
 db.init_app(app)
-jwt = JWTManager(app)
+cache.init_app(app)
+compressor.init_app(app)
+event_broker.init_app(app)
+password_hasher.init_app(app)
+jwt = CachingJWTManager(app)
+revocation_list.init_app(app)
 CORS(app)
 
+# Tokens révoqués et comptes désactivés, vérifiés sans requête en base
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    return revocation_list.is_revoked(jwt_payload)
+
 # Configuration du rate limiter
 limiter = Limiter(
     get_remote_address,
     app=app,
-    default_limits=["100 per day", "10 per hour", "1 per second"],
-    strategy="fixed-window"
+    # Limites, stratégie et stockage : RATELIMIT_* (config.py)
 )
 
 # Configuration Prometheus metrics
@@ -59,6 +75,14 @@ endpoint_counter = metrics.counter(
     labels={'endpoint': lambda: request.endpoint}
 )
 
+init_logging_metrics(metrics.registry)
+
+# Réglages SQLite et métriques du pool de connexions
+with app.app_context():
+    configure_sqlite(db.engine, app.config)
+    init_pool_metrics(db.engine, metrics.registry)
+    profiler.init_app(app, db.engine, metrics.registry)
+
 # Configuration Swagger
 SWAGGER_URL = '/api/docs'
 API_URL = '/api/swagger.json'
@@ -76,10 +100,21 @@ app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 app.register_blueprint(auth_bp)
 app.register_blueprint(tasks_bp)
 
+# Corps constants (documentation, page d'accueil) : sérialisés et compressés une
+# seule fois, puis servis avec un ETag et Cache-Control
+def load_swagger(path):
+    with open(path, encoding='utf-8') as f:
+        return app.json.dumps(json.load(f)).encode()
+
+swagger_payload = FilePayload(
+    os.path.join(app.root_path, 'swagger.json'), load_swagger,
+    max_age=app.config['STATIC_MAX_AGE']
+)
+
 @app.route('/api/swagger.json')
 def swagger_json():
-    with open('swagger.json') as f:
-        return jsonify(json.load(f))
+    # Relu uniquement si le fichier a été modifié
+    return swagger_payload.response()
 
 # Endpoint /ping qui répond avec "pong" (pas besoin d'authentification)
 @app.route('/ping', methods=['GET'])
@@ -109,20 +144,22 @@ def home():
         description: Liste les endpoints disponibles
     """
     logger.info("Endpoint / appelé")
-    return jsonify({
-        "message": "Bienvenue sur l'API de test", 
-        "endpoints": [
-            "/ping", 
-            "/api/docs",
-            "/auth/register",
-            "/auth/login",
-            "/auth/refresh",
-            "/auth/me",
-            "/api/tasks",
-            "/metrics",
-            "/health"
-        ]
-    })
+    return home_payload.response()
+
+home_payload = StaticPayload(app.json.dumps({
+    "message": "Bienvenue sur l'API de test", 
+    "endpoints": [
+        "/ping", 
+        "/api/docs",
+        "/auth/register",
+        "/auth/login",
+        "/auth/refresh",
+        "/auth/me",
+        "/api/tasks",
+        "/metrics",
+        "/health"
+    ]
+}).encode(), max_age=app.config['STATIC_MAX_AGE'])
 
 # Route de statut/santé de l'API
 @app.route('/health', methods=['GET'])
@@ -141,7 +178,7 @@ def health():
         # Vérifier la connexion à la base de données
         db_ok = False
         with app.app_context():
-            db.session.execute("SELECT 1").scalar()
+            db.session.execute(db.text("SELECT 1")).scalar()
             db_ok = True
 
         status = {
@@ -155,7 +192,7 @@ def health():
             
         return jsonify(status)
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         return jsonify({
             "status": "error",
             "message": "Health check failed",
@@ -165,30 +202,76 @@ def health():
 # Gestion des erreurs
 @app.errorhandler(404)
 def not_found(e):
-    logger.warning(f"Erreur 404: {request.path} non trouvé")
+    logger.warning("Erreur 404: %s non trouvé", request.path)
     return jsonify({"error": "Route non trouvée"}), 404
 
 @app.errorhandler(500)
 def server_error(e):
-    logger.error(f"Erreur 500: {str(e)}")
+    logger.error("Erreur 500: %s", e)
     return jsonify({"error": "Erreur serveur interne"}), 500
 
 @app.errorhandler(429)
 def ratelimit_handler(e):
-    logger.warning(f"Rate limit exceeded: {request.remote_addr} - {request.path}")
+    logger.warning("Rate limit exceeded: %s - %s", request.remote_addr, request.path)
     return jsonify({
         "error": "Trop de requêtes",
         "message": "Limite de requêtes dépassée. Veuillez réessayer plus tard."
     }), 429
 
-# Création des tables de la base de données
-@app.before_first_request
-def create_tables():
+# Création des tables et des index de la base de données
+# (before_first_request a été supprimé dans Flask 2.3)
+def init_db():
     db.create_all()
+    added = add_missing_columns(db.engine)
+    create_indexes(db.engine)
+    with db.engine.begin() as connection:
+        create_search_index(connection)
+    if 'users.tasks_total' in added:
+        # Compteurs ajoutés sur une base existante : les initialiser depuis les tâches
+        reconcile_task_counters()
     logger.info("Base de données initialisée")
 
+@app.cli.command('init-db')
+def init_db_command():
+    """Créer les tables, colonnes et index manquants (migration des bases existantes)."""
+    init_db()
+
+@app.cli.command('purge-events')
+def purge_events_command():
+    """Supprimer du journal les événements de tâches plus anciens que la rétention."""
+    count = purge_events(app.config['TASK_EVENTS_RETENTION_DAYS'])
+    logger.info("%s événements de tâches purgés", count)
+
+@app.cli.command('reconcile-task-stats')
+def reconcile_task_stats_command():
+    """Recalculer les compteurs de tâches des utilisateurs qui ont divergé."""
+    count = reconcile_task_counters()
+    logger.info("Compteurs de tâches corrigés pour %s utilisateurs", count)
+
+@app.cli.command('seed-data')
+@click.option('--users', type=int, default=1000, show_default=True)
+@click.option('--tasks', type=int, default=100_000, show_default=True)
+@click.option('--skew', type=float, default=1.0, show_default=True,
+              help='Exposant de la loi de Zipf (0 : répartition uniforme)')
+@click.option('--seed', type=int, default=42, show_default=True)
+@click.option('--prefix', default='seed', show_default=True, help='Préfixe des noms d\'utilisateur')
+@click.option('--batch-size', type=int, default=50_000, show_default=True)
+@click.option('--keep-indexes', is_flag=True,
+              help='Maintenir les index pendant le chargement (base partagée)')
+def seed_data_command(users, tasks, skew, seed, prefix, batch_size, keep_indexes):
+    """Générer des utilisateurs et des tâches synthétiques en masse (tests de charge)."""
+    summary = seed_database(users, tasks, skew=skew, seed=seed, prefix=prefix,
+                            batch_size=batch_size, defer_indexes=not keep_indexes)
+    logger.info("Utilisateur le plus chargé : %s (%s tâches), mot de passe commun : %s",
+                summary['first_user'], summary['max_tasks_per_user'], SEED_PASSWORD)
+
+# À l'import, seulement les tables manquantes : les migrations (colonnes, index,
+# index de recherche) verrouillent les tables existantes et ne doivent pas être
+# lancées par chaque worker au démarrage, mais une fois par `flask init-db`
+with app.app_context():
+    db.create_all()
+
 # Démarrage de l'application si exécuté directement
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Serveur de développement uniquement : en production, utiliser gunicorn
+    app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5000)
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from marshmallow import Schema, fields, validate, ValidationError
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
+from marshmallow import fields, validate, ValidationError
 from models import db, User
+from profiling import InstrumentedSchema
+from hashing import PasswordHashingBusy
+from jwt_cache import revocation_list
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,15 +12,25 @@ logger = logging.getLogger(__name__)
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
 # Schéma de validation pour les utilisateurs
-class UserSchema(Schema):
+class UserSchema(InstrumentedSchema):
     username = fields.String(required=True, validate=validate.Length(min=3, max=50))
     email = fields.Email(required=True)
     password = fields.String(required=True, validate=validate.Length(min=6))
 
-class LoginSchema(Schema):
+class LoginSchema(InstrumentedSchema):
     username = fields.String(required=True)
     password = fields.String(required=True)
 
+def hashing_busy_response():
+    """Réponse rapide quand le pool de hachage est saturé."""
+    logger.warning("Pool de hachage saturé: %s rejeté", request.path)
+    response = jsonify({
+        "error": "Service temporairement surchargé",
+        "message": "Veuillez réessayer dans quelques instants."
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # Enregistrement d'un nouvel utilisateur
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -44,7 +57,7 @@ def register():
         db.session.add(new_user)
         db.session.commit()
         
-        logger.info(f"Nouvel utilisateur créé: {new_user.username}")
+        logger.info("Nouvel utilisateur créé: %s", new_user.username)
         
         # Créer les tokens JWT
         access_token = create_access_token(identity=new_user.id)
@@ -58,10 +71,12 @@ def register():
         }), 201
         
     except ValidationError as e:
-        logger.warning(f"Validation error during registration: {e.messages}")
+        logger.warning("Validation error during registration: %s", e.messages)
         return jsonify({"error": e.messages}), 400
+    except PasswordHashingBusy:
+        return hashing_busy_response()
     except Exception as e:
-        logger.error(f"Error during registration: {str(e)}")
+        logger.error("Error during registration: %s", e)
         db.session.rollback()
         return jsonify({"error": "Une erreur est survenue lors de l'inscription"}), 500
 
@@ -80,7 +95,13 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({"error": "Nom d'utilisateur ou mot de passe incorrect"}), 401
         
-        logger.info(f"Connexion réussie pour: {user.username}")
+        # Mettre à niveau le hachage si les paramètres ont changé depuis sa création
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+            logger.info("Mot de passe rehaché pour: %s", user.username)
+        
+        logger.info("Connexion réussie pour: %s", user.username)
         
         # Créer les tokens JWT
         access_token = create_access_token(identity=user.id)
@@ -94,10 +115,13 @@ def login():
         }), 200
         
     except ValidationError as e:
-        logger.warning(f"Validation error during login: {e.messages}")
+        logger.warning("Validation error during login: %s", e.messages)
         return jsonify({"error": e.messages}), 400
+    except PasswordHashingBusy:
+        db.session.rollback()
+        return hashing_busy_response()
     except Exception as e:
-        logger.error(f"Error during login: {str(e)}")
+        logger.error("Error during login: %s", e)
         return jsonify({"error": "Une erreur est survenue lors de la connexion"}), 500
 
 # Obtenir les informations de l'utilisateur actuel
@@ -117,7 +141,7 @@ def me():
         return jsonify({"user": user.to_dict()}), 200
         
     except Exception as e:
-        logger.error(f"Error getting user profile: {str(e)}")
+        logger.error("Error getting user profile: %s", e)
         return jsonify({"error": "Une erreur est survenue"}), 500
 
 # Rafraîchir le token
@@ -136,5 +160,22 @@ def refresh():
         }), 200
         
     except Exception as e:
-        logger.error(f"Error refreshing token: {str(e)}")
+        logger.error("Error refreshing token: %s", e)
+        return jsonify({"error": "Une erreur est survenue"}), 500
+
+# Déconnexion : révoquer le token utilisé (access ou refresh)
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    try:
+        revocation_list.revoke(get_jwt())
+        db.session.commit()
+        
+        logger.info("Token révoqué pour l'utilisateur %s", get_jwt_identity())
+        
+        return jsonify({"message": "Token révoqué"}), 200
+        
+    except Exception as e:
+        logger.error("Error revoking token: %s", e)
+        db.session.rollback()
         return jsonify({"error": "Une erreur est survenue"}), 500
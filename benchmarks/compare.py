@@ -0,0 +1,58 @@
+"""Comparer deux fichiers de résultats et échouer au-delà d'un seuil de régression.
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 10]
+
+Pour chaque benchmark présent dans les deux fichiers, affiche la variation
+de sa valeur ("value") ; une dégradation supérieure à --threshold % (temps
+plus long ou débit plus faible selon "better") est une régression. Le code
+de sortie vaut 1 s'il y a au moins une régression : utilisable en CI.
+"""
+import argparse
+import sys
+
+from benchmarks.results import read_results
+
+
+def compare(baseline, current, threshold):
+    """Lignes (nom, référence, actuel, variation en %, régression)."""
+    previous = {benchmark['name']: benchmark for benchmark in baseline['benchmarks']}
+    rows = []
+    for benchmark in current['benchmarks']:
+        reference = previous.get(benchmark['name'])
+        if reference is None or not reference['value']:
+            continue
+        change = (benchmark['value'] - reference['value']) / reference['value'] * 100
+        # Variation défavorable : positive si la valeur doit baisser, négative sinon
+        worse = change if benchmark.get('better', 'lower') == 'lower' else -change
+        rows.append((benchmark['name'], reference['value'], benchmark['value'], change,
+                     worse > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10,
+                        help='dégradation tolérée, en pourcentage')
+    args = parser.parse_args()
+
+    baseline = read_results(args.baseline)
+    current = read_results(args.current)
+    rows = compare(baseline, current, args.threshold)
+
+    print(f"référence {baseline.get('commit')} -> actuel {current.get('commit')} "
+          f"(seuil {args.threshold:g} %)")
+    print(f"{'benchmark':<40} {'référence':>12} {'actuel':>12} {'variation':>10}")
+    for name, reference, value, change, regression in rows:
+        flag = '  RÉGRESSION' if regression else ''
+        print(f"{name:<40} {reference:>12.6g} {value:>12.6g} {change:>+9.1f}%{flag}")
+
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:g} %")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
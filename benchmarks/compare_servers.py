@@ -0,0 +1,42 @@
+"""Comparer débit et latence de deux serveurs avec le même scénario Locust.
+
+    python -m benchmarks.compare_servers \\
+        --target flask=http://localhost:5000 --target asgi=http://localhost:8000 \\
+        [--locustfile locustfile.py] [--users 50] [--duration 1m]
+
+Lance Locust en mode headless contre chaque serveur, l'un après l'autre, et
+affiche les requêtes par seconde et les percentiles de la ligne "Aggregated"
+des statistiques CSV. Les fichiers CSV sont conservés dans --output.
+"""
+import argparse
+import os
+
+from benchmarks.load import run_locust
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', action='append', required=True,
+                        help='nom=URL du serveur (répétable)')
+    parser.add_argument('--locustfile', default='locustfile.py')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--spawn-rate', type=int, default=10)
+    parser.add_argument('--duration', default='1m')
+    parser.add_argument('--output', default='locust-results')
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    results = {}
+    for target in args.target:
+        name, _, host = target.partition('=')
+        results[name] = run_locust(args.locustfile, host, os.path.join(args.output, name),
+                                   args.users, args.spawn_rate, args.duration)
+
+    print(f"{'serveur':<10} {'req/s':>10} {'échecs':>8} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, row in results.items():
+        print(f"{name:<10} {float(row['Requests/s']):>10.1f} {row['Failure Count']:>8} "
+              f"{row['50%']:>10} {row['99%']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Tests de charge headless reproductibles, résultats JSON comparables entre commits.
+
+    python -m benchmarks.load --host http://localhost:5000 \\
+        [--scenario read-heavy --scenario write-heavy --scenario auth-storm] \\
+        [--users 50] [--spawn-rate 10] [--duration 1m] [--output benchmark-results/load.json]
+
+Chaque scénario de benchmarks/locust_scenarios.py est lancé l'un après
+l'autre contre le même serveur. Pour chacun, la ligne "Aggregated" des
+statistiques CSV donne deux benchmarks : load.<scénario>.rps (débit, plus
+haut est meilleur) et load.<scénario>.p95 (latence en ms, plus bas est
+meilleur), comparables avec benchmarks.compare.
+"""
+import argparse
+import csv
+import os
+import subprocess
+import sys
+
+from benchmarks.results import write_results
+
+LOCUSTFILE = os.path.join(os.path.dirname(__file__), 'locust_scenarios.py')
+SCENARIOS = {
+    'read-heavy': 'ReadHeavyUser',
+    'write-heavy': 'WriteHeavyUser',
+    'auth-storm': 'AuthStormUser',
+}
+
+
+def run_locust(locustfile, host, prefix, users, spawn_rate, duration, user_classes=()):
+    """Lancer Locust en mode headless, renvoyer la ligne "Aggregated" de ses statistiques."""
+    subprocess.run([
+        sys.executable, '-m', 'locust', '-f', locustfile, *user_classes, '--headless',
+        '-u', str(users), '-r', str(spawn_rate), '-t', duration,
+        '--host', host, '--csv', prefix, '--only-summary',
+    ], check=False)
+
+    with open(f'{prefix}_stats.csv', newline='') as f:
+        for row in csv.DictReader(f):
+            if row['Name'] == 'Aggregated':
+                return row
+    raise RuntimeError(f"Pas de statistiques dans {prefix}_stats.csv")
+
+
+def to_benchmarks(scenario, row):
+    stats = {
+        'requests': int(row['Request Count']),
+        'failures': int(row['Failure Count']),
+        'rps': float(row['Requests/s']),
+        'median_ms': float(row['Median Response Time']),
+        'average_ms': float(row['Average Response Time']),
+        **{f'p{percentile}_ms': float(row[f'{percentile}%'])
+           for percentile in (50, 90, 95, 99)},
+    }
+    return [
+        {'name': f'load.{scenario}.rps', 'value': stats['rps'], 'unit': 'req/s',
+         'better': 'higher', 'stats': stats},
+        {'name': f'load.{scenario}.p95', 'value': stats['p95_ms'], 'unit': 'ms',
+         'better': 'lower', 'stats': stats},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', required=True)
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='scénario à lancer (répétable, tous par défaut)')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--spawn-rate', type=int, default=10)
+    parser.add_argument('--duration', default='1m')
+    parser.add_argument('--output', default='benchmark-results/load.json')
+    args = parser.parse_args()
+
+    directory = os.path.join(os.path.dirname(args.output) or '.', 'locust')
+    os.makedirs(directory, exist_ok=True)
+    results = []
+    print(f"{'scénario':<12} {'req/s':>10} {'échecs':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+          f"{'p99 (ms)':>10}")
+    for scenario in args.scenario or list(SCENARIOS):
+        row = run_locust(LOCUSTFILE, args.host, os.path.join(directory, scenario), args.users,
+                         args.spawn_rate, args.duration, [SCENARIOS[scenario]])
+        results.extend(to_benchmarks(scenario, row))
+        print(f"{scenario:<12} {float(row['Requests/s']):>10.1f} {row['Failure Count']:>8} "
+              f"{row['50%']:>10} {row['95%']:>10} {row['99%']:>10}")
+
+    write_results(args.output, 'load', results, host=args.host, users=args.users,
+                  spawn_rate=args.spawn_rate, duration=args.duration)
+    print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
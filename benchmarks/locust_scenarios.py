@@ -0,0 +1,205 @@
+"""Scénarios Locust reproductibles pour benchmarks.load.
+
+    locust -f benchmarks/locust_scenarios.py ReadHeavyUser --headless -u 50 -t 1m
+
+- ReadHeavyUser : listes, curseur, détail, recherche et statistiques, peu d'écritures ;
+- WriteHeavyUser : création, modification, bascule, suppression et lots ;
+- AuthStormUser : inscription, connexion, rafraîchissement du token et profil.
+
+Sans temps d'attente entre les tâches : chaque utilisateur virtuel enchaîne
+les requêtes, le débit mesuré est celui du serveur. Lancer le serveur avec
+RATELIMIT_ENABLED=false pour ne pas mesurer les réponses 429.
+
+Sur une base remplie par `flask seed-data`, LOCUST_SEED_USERS=<nombre
+d'utilisateurs générés> (et LOCUST_SEED_PREFIX si --prefix a été changé)
+connecte chaque utilisateur virtuel à un utilisateur généré, tiré au hasard,
+au lieu d'en inscrire un nouveau avec SEED_TASKS tâches.
+"""
+import os
+import random
+import uuid
+
+from locust import HttpUser, task, constant
+
+# Mot de passe des utilisateurs générés par flask seed-data (seeding.SEED_PASSWORD)
+PASSWORD = 'Password123!'
+WORDS = ['rapport', 'réunion', 'courses', 'facture', 'projet', 'client', 'revue', 'budget',
+         'planning', 'livraison', 'support', 'migration', 'tests', 'documentation']
+SEED_TASKS = 50
+SEED_USERS = int(os.environ.get('LOCUST_SEED_USERS', 0))
+SEED_PREFIX = os.environ.get('LOCUST_SEED_PREFIX', 'seed')
+
+
+def random_title():
+    return ' '.join(random.sample(WORDS, 3)).capitalize()
+
+
+class ApiUser(HttpUser):
+    """Utilisateur inscrit au démarrage, avec SEED_TASKS tâches créées par lot,
+    ou utilisateur généré si LOCUST_SEED_USERS est défini."""
+
+    abstract = True
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.task_ids = []
+        self.headers = {}
+        if SEED_USERS:
+            self.login_seeded()
+            return
+        self.register()
+        response = self.client.post('/api/tasks/batch', headers=self.headers, json={'tasks': [
+            {'title': random_title(), 'description': ' '.join(random.choices(WORDS, k=12)),
+             'completed': random.random() < 0.3}
+            for _ in range(SEED_TASKS)
+        ]}, name='/api/tasks/batch [seed]')
+        if response.status_code == 201:
+            self.task_ids = [result['id'] for result in response.json().get('results', [])]
+
+    def register(self):
+        username = f'bench{uuid.uuid4().hex[:16]}'
+        response = self.client.post('/auth/register', json={
+            'username': username, 'email': f'{username}@example.com', 'password': PASSWORD
+        })
+        if response.status_code == 201:
+            self.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+    def login_seeded(self):
+        response = self.client.post('/auth/login', json={
+            'username': f'{SEED_PREFIX}{random.randrange(SEED_USERS)}', 'password': PASSWORD
+        }, name='/auth/login [seed]')
+        if response.status_code != 200:
+            return
+        self.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+        response = self.client.get('/api/tasks?cursor=&per_page=100&fields=id',
+                                   headers=self.headers, name='/api/tasks?cursor [seed]')
+        if response.status_code == 200:
+            self.task_ids = [item['id'] for item in response.json()['tasks']]
+
+    def task_id(self):
+        return random.choice(self.task_ids) if self.task_ids else None
+
+
+class ReadHeavyUser(ApiUser):
+    @task(10)
+    def list_tasks(self):
+        self.client.get('/api/tasks', headers=self.headers)
+
+    @task(5)
+    def list_tasks_cursor(self):
+        response = self.client.get('/api/tasks?cursor=&per_page=20', headers=self.headers,
+                                   name='/api/tasks?cursor')
+        if response.status_code != 200:
+            return
+        cursor = response.json()['pagination']['next_cursor']
+        if cursor:
+            self.client.get(f'/api/tasks?cursor={cursor}&per_page=20', headers=self.headers,
+                            name='/api/tasks?cursor')
+
+    @task(3)
+    def list_tasks_filtered(self):
+        self.client.get('/api/tasks?completed=false&sort=title&fields=id,title&cursor=',
+                        headers=self.headers, name='/api/tasks?completed&sort&fields')
+
+    @task(5)
+    def get_task(self):
+        task_id = self.task_id()
+        if task_id:
+            self.client.get(f'/api/tasks/{task_id}', headers=self.headers, name='/api/tasks/[id]')
+
+    @task(3)
+    def search_tasks(self):
+        self.client.get(f"/api/tasks/search?q={random.choice(WORDS)[:4]}", headers=self.headers,
+                        name='/api/tasks/search')
+
+    @task(2)
+    def task_stats(self):
+        self.client.get('/api/tasks/stats', headers=self.headers)
+
+    @task(2)
+    def me(self):
+        self.client.get('/auth/me', headers=self.headers)
+
+    @task(1)
+    def update_task(self):
+        task_id = self.task_id()
+        if task_id:
+            self.client.put(f'/api/tasks/{task_id}', headers=self.headers,
+                            json={'title': random_title()}, name='/api/tasks/[id]')
+
+
+class WriteHeavyUser(ApiUser):
+    @task(5)
+    def create_task(self):
+        response = self.client.post('/api/tasks', headers=self.headers, json={
+            'title': random_title(), 'description': ' '.join(random.choices(WORDS, k=12))
+        })
+        if response.status_code == 201:
+            self.task_ids.append(response.json()['task']['id'])
+
+    @task(4)
+    def update_task(self):
+        task_id = self.task_id()
+        if task_id:
+            self.client.put(f'/api/tasks/{task_id}', headers=self.headers, json={
+                'title': random_title(), 'completed': random.random() < 0.5
+            }, name='/api/tasks/[id]')
+
+    @task(4)
+    def toggle_task(self):
+        task_id = self.task_id()
+        if task_id:
+            self.client.patch(f'/api/tasks/{task_id}/toggle', headers=self.headers,
+                              name='/api/tasks/[id]/toggle')
+
+    @task(2)
+    def delete_task(self):
+        if len(self.task_ids) > SEED_TASKS // 2:
+            task_id = self.task_ids.pop(random.randrange(len(self.task_ids)))
+            self.client.delete(f'/api/tasks/{task_id}', headers=self.headers,
+                               name='/api/tasks/[id]')
+
+    @task(1)
+    def batch_toggle(self):
+        ids = random.sample(self.task_ids, min(10, len(self.task_ids)))
+        if ids:
+            self.client.patch('/api/tasks/batch/toggle', headers=self.headers, json={'ids': ids})
+
+    @task(1)
+    def list_tasks(self):
+        self.client.get('/api/tasks', headers=self.headers)
+
+
+class AuthStormUser(HttpUser):
+    """Inscriptions et connexions en rafale : coût du hachage des mots de passe et des JWT."""
+
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.credentials = []
+
+    @task(2)
+    def register(self):
+        username = f'bench{uuid.uuid4().hex[:16]}'
+        response = self.client.post('/auth/register', json={
+            'username': username, 'email': f'{username}@example.com', 'password': PASSWORD
+        })
+        if response.status_code == 201:
+            self.credentials.append(username)
+
+    @task(5)
+    def login(self):
+        if not self.credentials:
+            return
+        response = self.client.post('/auth/login', json={
+            'username': random.choice(self.credentials), 'password': PASSWORD
+        })
+        if response.status_code != 200:
+            return
+        data = response.json()
+        headers = {'Authorization': f"Bearer {data['access_token']}"}
+        refresh = self.client.post('/auth/refresh',
+                                   headers={'Authorization': f"Bearer {data['refresh_token']}"})
+        if refresh.status_code == 200:
+            headers = {'Authorization': f"Bearer {refresh.json()['access_token']}"}
+        self.client.get('/auth/me', headers=headers)
@@ -0,0 +1,64 @@
+"""Latence de /ping selon le mode de logging.
+
+    python -m benchmarks.logging_bench [--requests 5000]
+
+Compare le logging désactivé (niveau WARNING), les handlers synchrones
+(console + fichier dans le thread de la requête) et la file asynchrone
+(QueueHandler + QueueListener). La console est redirigée vers /dev/null.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault('FLASK_ENV', 'testing')
+
+from app import app  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from logging_config import setup_logging, stop_logging  # noqa: E402
+
+MODES = {
+    'off': {'LOG_LEVEL': 'WARNING', 'LOG_ASYNC': False},
+    'sync': {'LOG_LEVEL': 'INFO', 'LOG_ASYNC': False},
+    'async': {'LOG_LEVEL': 'INFO', 'LOG_ASYNC': True},
+}
+
+
+def run(mode, requests, log_file):
+    config = type('BenchConfig', (TestingConfig,), {**MODES[mode], 'LOG_FILE': log_file})
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
+        setup_logging(config)
+        client = app.test_client()
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            client.get('/ping')
+            timings.append(time.perf_counter() - start)
+        stop_logging()
+
+    timings.sort()
+    return {
+        'mean': statistics.mean(timings),
+        'p50': timings[len(timings) // 2],
+        'p99': timings[int(len(timings) * 0.99)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, 'bench.log')
+        print(f"{'mode':<6} {'moyenne (µs)':>14} {'p50 (µs)':>10} {'p99 (µs)':>10}")
+        for mode in MODES:
+            result = run(mode, args.requests, log_file)
+            print(f"{mode:<6} {result['mean'] * 1e6:>14.1f} "
+                  f"{result['p50'] * 1e6:>10.1f} {result['p99'] * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Micro-benchmarks de l'API, sans serveur, sur une base SQLite en mémoire remplie à l'avance.
+
+    python -m benchmarks.micro [--tasks 1000] [--users 1] [--rounds 20] [--filter view.]
+        [--output benchmark-results/micro.json]
+
+Mesure la sérialisation (Task.to_dict, row_to_dict), la validation
+(schémas marshmallow), le décodage des JWT et chaque vue via le client de
+test Flask (cache des réponses désactivé : la vue est exécutée à chaque
+appel). Comme pytest-benchmark, chaque mesure est répétée en --rounds
+tours de plusieurs itérations, après un échauffement ; la médiane par
+itération est la valeur comparée par benchmarks.compare.
+
+Les données sont générées par seeding.seed_database avec une graine fixe :
+deux exécutions sur la même machine mesurent exactement le même travail.
+Les vues sont appelées par le premier utilisateur généré, le plus chargé
+quand --users > 1.
+"""
+import os
+
+# Configuration de test (SQLite en mémoire, sans rate limiting) avant l'import de l'application
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import argparse
+import gc
+import statistics
+import time
+
+import jwt as pyjwt
+from flask_jwt_extended import decode_token
+
+from app import app
+from cache import cache
+from filters import TaskQuerySchema
+from models import db, Task
+from seeding import seed_database, SEED_PASSWORD
+from tasks import TaskSchema
+from benchmarks.results import write_results
+
+
+def seed(client, users, tasks, skew, seed):
+    """Générer les données, renvoyer les tokens du premier utilisateur (le plus chargé)."""
+    with app.app_context():
+        summary = seed_database(users, tasks, skew=skew, seed=seed)
+    body = client.post('/auth/login', json={
+        'username': summary['first_user'], 'password': SEED_PASSWORD
+    }).get_json()
+    return body['access_token'], body['refresh_token']
+
+
+def measure(fn, rounds, min_round_time, warmup):
+    """Temps par itération sur rounds tours (calibrés pour durer au moins min_round_time)."""
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        fn()
+
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_round_time or iterations >= 1_000_000:
+            break
+        iterations *= 2
+
+    timings = []
+    gc.collect()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    return {
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': statistics.median(timings),
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'rounds': rounds,
+        'iterations': iterations,
+        'ops': 1 / statistics.mean(timings),
+    }
+
+
+def benchmarks(client, access_token, refresh_token):
+    """Nom -> fonction mesurée."""
+    headers = {'Authorization': f'Bearer {access_token}'}
+    refresh_headers = {'Authorization': f'Bearer {refresh_token}'}
+    with app.app_context():
+        user_id = decode_token(access_token)['sub']
+        task = db.session.scalars(
+            db.select(Task).where(Task.user_id == user_id).order_by(Task.id)
+        ).first()
+        row = db.session.execute(db.select(*Task.projection()).where(Task.id == task.id)).one()
+        task.to_dict()
+        db.session.expunge(task)
+    task_id = task.id
+    task_schema = TaskSchema()
+    query_schema = TaskQuerySchema()
+    secret = app.config['JWT_SECRET_KEY']
+
+    def in_app_context(fn):
+        def run():
+            with app.app_context():
+                return fn()
+        return run
+
+    def request(method, path, **kwargs):
+        kwargs.setdefault('headers', headers)
+
+        def run():
+            response = getattr(client, method)(path, **kwargs)
+            assert response.status_code < 400, (path, response.status_code)
+        return run
+
+    return {
+        'serialization.task_to_dict': task.to_dict,
+        'serialization.row_to_dict': lambda: Task.row_to_dict(row),
+        'validation.task_schema': lambda: task_schema.load(
+            {'title': 'Rapport', 'description': 'Revue du budget', 'completed': True}
+        ),
+        'validation.task_query_schema': lambda: query_schema.load({
+            'completed': 'true', 'created_after': '2024-01-01T00:00:00',
+            'title_prefix': 'Rap', 'sort': '-completed,title', 'fields': 'id,title',
+        }),
+        'jwt.decode_pyjwt': lambda: pyjwt.decode(access_token, secret, algorithms=['HS256']),
+        'jwt.decode_token': in_app_context(lambda: decode_token(access_token)),
+        'view.get_tasks': request('get', '/api/tasks'),
+        'view.get_tasks_cursor': request('get', '/api/tasks?cursor=&per_page=50'),
+        'view.get_tasks_filtered': request(
+            'get', '/api/tasks?completed=false&sort=title&fields=id,title&cursor='
+        ),
+        'view.get_task': request('get', f'/api/tasks/{task_id}'),
+        'view.search_tasks': request('get', '/api/tasks/search?q=rapport budg'),
+        'view.get_task_stats': request('get', '/api/tasks/stats'),
+        'view.create_task': request('post', '/api/tasks', json={'title': 'Nouvelle tâche'}),
+        'view.update_task': request('put', f'/api/tasks/{task_id}', json={'title': 'Modifiée'}),
+        'view.toggle_task': request('patch', f'/api/tasks/{task_id}/toggle'),
+        'view.me': request('get', '/auth/me'),
+        'view.refresh': request('post', '/auth/refresh', headers=refresh_headers),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1000, help='tâches générées')
+    parser.add_argument('--users', type=int, default=1, help='utilisateurs générés')
+    parser.add_argument('--skew', type=float, default=1.0, help='répartition des tâches (Zipf)')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--min-round-time', type=float, default=0.01, help='secondes')
+    parser.add_argument('--warmup', type=float, default=0.1, help='secondes')
+    parser.add_argument('--filter', default='', help='préfixe des benchmarks à lancer')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark-results/micro.json')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    # Mesurer les vues et non le cache des réponses
+    cache.enabled = False
+    client = app.test_client()
+    access_token, refresh_token = seed(client, args.users, args.tasks, args.skew, args.seed)
+
+    results = []
+    print(f"{'benchmark':<32} {'médiane (µs)':>14} {'min (µs)':>10} {'écart-type':>11} {'ops/s':>10}")
+    for name, fn in benchmarks(client, access_token, refresh_token).items():
+        if not name.startswith(args.filter):
+            continue
+        stats = measure(fn, args.rounds, args.min_round_time, args.warmup)
+        results.append({'name': name, 'value': stats['median'], 'unit': 's',
+                        'better': 'lower', 'stats': stats})
+        print(f"{name:<32} {stats['median'] * 1e6:>14.1f} {stats['min'] * 1e6:>10.1f} "
+              f"{stats['stddev'] * 1e6:>11.1f} {stats['ops']:>10.0f}")
+
+    write_results(args.output, 'micro', results, tasks=args.tasks, users=args.users,
+                  skew=args.skew, seed=args.seed)
+    print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
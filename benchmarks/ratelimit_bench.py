@@ -0,0 +1,63 @@
+"""Coût du rate limiting par requête selon le stockage et la stratégie.
+
+    python -m benchmarks.ratelimit_bench [--requests 5000]
+
+Mesure un appel Limiter.hit() (ce qu'ajoute flask-limiter à chaque requête)
+pour le stockage en mémoire du processus et le fichier SQLite partagé, avec
+les stratégies fixed-window et moving-window. La limite choisie n'est jamais
+atteinte : chaque appel enregistre une entrée.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import STRATEGIES
+
+import ratelimit_storage  # noqa: F401 - enregistre le schéma sqlite://
+
+LIMIT = parse('1000000 per hour')
+
+
+def run(storage_uri, strategy, requests):
+    limiter = STRATEGIES[strategy](storage_from_string(storage_uri))
+    timings = []
+    for i in range(requests):
+        # Quelques clients distincts, comme derrière un proxy
+        client = f'10.0.0.{i % 16}'
+        start = time.perf_counter()
+        limiter.hit(LIMIT, client)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return {
+        'mean': statistics.mean(timings),
+        'p50': timings[len(timings) // 2],
+        'p99': timings[int(len(timings) * 0.99)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    shared_memory = os.path.dirname(ratelimit_storage.default_storage_path())
+    with tempfile.TemporaryDirectory(dir=shared_memory) as directory:
+        storages = {
+            'memory': 'memory://',
+            'sqlite': f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        }
+        print(f"{'stockage':<8} {'stratégie':<14} {'moyenne (µs)':>14} {'p50 (µs)':>10} {'p99 (µs)':>10}")
+        for name, uri in storages.items():
+            for strategy in ('fixed-window', 'moving-window'):
+                result = run(uri, strategy, args.requests)
+                print(f"{name:<8} {strategy:<14} {result['mean'] * 1e6:>14.1f} "
+                      f"{result['p50'] * 1e6:>10.1f} {result['p99'] * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
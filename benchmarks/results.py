@@ -0,0 +1,51 @@
+"""Format commun des résultats de benchmark (micro et charge), comparables entre commits.
+
+    {
+      "kind": "micro" | "load",
+      "commit": "<sha>", "python": "3.11.7", "machine": "...", "created_at": "...",
+      "benchmarks": [
+        {"name": "view.get_tasks", "value": 0.00042, "unit": "s", "better": "lower",
+         "stats": {...}}
+      ]
+    }
+
+"value" est la mesure comparée par benchmarks.compare, "better" son sens.
+"""
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import subprocess
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, kind, benchmarks, **metadata):
+    results = {
+        'kind': kind,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)',
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        **metadata,
+        'benchmarks': benchmarks,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    return results
+
+
+def read_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
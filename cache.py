@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+from flask_jwt_extended import get_jwt_identity
+import pickle
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Cache LRU en mémoire du processus, borné en taille et avec expiration."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Cache partagé entre les workers gunicorn (nécessite le paquet redis)."""
+
+    def __init__(self, url, prefix='cache:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, timeout=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=timeout or None)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_backend(url, max_entries):
+    """Créer le backend correspondant à l'URL (memory:// ou redis://)."""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    return MemoryBackend(max_entries)
+
+
+class ResponseCache:
+    """Cache de lecture des réponses, indexé par la version des données de l'utilisateur.
+
+    La version est lue en base par la fonction enregistrée avec
+    @cache.version_loader (users.tasks_version, incrémentée dans la
+    transaction de chaque écriture) : une écriture faite par un autre worker,
+    un autre déploiement ou directement en base rend les anciennes entrées
+    inaccessibles, qui disparaissent ensuite par expiration ou éviction LRU.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.enabled = False
+        self.timeout = 60
+        self._version_loader = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+        self.timeout = app.config.get('CACHE_DEFAULT_TIMEOUT', 60)
+        self.backend = create_backend(
+            app.config.get('CACHE_URL', 'memory://'),
+            app.config.get('CACHE_MAX_ENTRIES', 10000)
+        )
+
+    def version_loader(self, callback):
+        """Enregistrer la fonction user_id -> version des données (None : pas de cache)."""
+        self._version_loader = callback
+        return callback
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def cached(self, view):
+        """Mettre en cache les réponses 200 d'une vue protégée par @jwt_required."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or self._version_loader is None:
+                return view(*args, **kwargs)
+
+            user_id = get_jwt_identity()
+            version = self._version_loader(user_id)
+            if version is None:
+                return view(*args, **kwargs)
+            params = sorted(request.args.items(multi=True))
+
+            try:
+                key = f'view:{user_id}:{version}:{request.endpoint}:{kwargs}:{params}'
+                entry = self.backend.get(key)
+            except Exception as e:
+                logger.warning("Cache indisponible: %s", e)
+                return view(*args, **kwargs)
+
+            if entry is not None:
+                body, status, mimetype = entry
+                response = make_response(body, status)
+                response.mimetype = mimetype
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                try:
+                    self.backend.set(
+                        key, (response.get_data(), response.status_code, response.mimetype),
+                        self.timeout
+                    )
+                except Exception as e:
+                    logger.warning("Cache indisponible: %s", e)
+            return response
+
+        return wrapper
+
+
+cache = ResponseCache()
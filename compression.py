@@ -0,0 +1,226 @@
+from flask import Response, request
+from cache import MemoryBackend
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle : gzip uniquement
+    brotli = None
+
+
+def available_encodings(preferred):
+    """Encodages utilisables, dans l'ordre de préférence du serveur."""
+    return [encoding for encoding in preferred
+            if encoding == 'gzip' or (encoding == 'br' and brotli is not None)]
+
+
+def compress(data, encoding, level):
+    """Compresser un corps complet (gzip déterministe : mtime à 0)."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Compression incrémentale : chaque morceau est vidé immédiatement vers le client."""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            # wbits=31 : en-tête et somme de contrôle gzip
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        if self.encoding == 'br':
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class Compressor:
+    """Compression des réponses négociée via Accept-Encoding (brotli si installé, gzip).
+
+    - corps complets : compressés au-delà de COMPRESS_MIN_SIZE octets ;
+    - réponses en flux (exports) : compressées morceau par morceau ;
+    - fichiers statiques (send_file) : variante compressée gardée en mémoire,
+      identifiée par le chemin et l'ETag du fichier.
+
+    Le niveau dépend du type de contenu (COMPRESS_LEVELS).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.encodings = []
+        self.min_size = 500
+        self.mimetypes = set()
+        self.levels = {}
+        self._static = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.encodings = available_encodings(app.config.get('COMPRESS_ALGORITHMS', ['br', 'gzip']))
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', ['application/json']))
+        self.levels = app.config.get('COMPRESS_LEVELS', {'*': {'gzip': 6, 'br': 4}})
+        self._static = MemoryBackend(app.config.get('COMPRESS_STATIC_CACHE_ENTRIES', 256))
+        if self.enabled and self.encodings:
+            app.after_request(self.after_request)
+
+    def clear_cache(self):
+        if self._static is not None:
+            self._static.clear()
+
+    def level(self, mimetype, encoding):
+        levels = self.levels.get(mimetype) or self.levels['*']
+        return levels.get(encoding, self.levels['*'][encoding])
+
+    def negotiate(self):
+        """Meilleur encodage accepté par le client (None : pas de compression)."""
+        return request.accept_encodings.best_match(self.encodings)
+
+    def after_request(self, response):
+        if (response.mimetype not in self.mimetypes
+                or response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.cache_control.no_transform):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+        level = self.level(response.mimetype, encoding)
+
+        if response.direct_passthrough:
+            if not self._compress_static(response, encoding, level):
+                return response
+        elif response.is_streamed:
+            self._compress_stream(response, encoding, level)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+
+        # Le corps diffère selon l'encodage : l'ETag fort devient faible
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_stream(self, response, encoding, level):
+        chunks = response.response
+        compressor = StreamCompressor(encoding, level)
+
+        def generate():
+            try:
+                for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    data = compressor.compress(chunk)
+                    if data:
+                        yield data
+                yield compressor.finish()
+            finally:
+                # Client déconnecté : fermer le flux d'origine (contexte de requête)
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+
+        response.response = generate()
+        response.headers.pop('Content-Length', None)
+
+    def _compress_static(self, response, encoding, level):
+        if response.content_length is not None and response.content_length < self.min_size:
+            return False
+
+        etag, _ = response.get_etag()
+        key = f'{request.path}:{etag}:{encoding}' if etag else None
+        data = self._static.get(key) if key else None
+        response.direct_passthrough = False
+        if data is None:
+            # Lire le fichier une fois, puis servir la variante compressée en mémoire
+            data = compress(response.get_data(), encoding, level)
+            if key:
+                self._static.set(key, data)
+        elif hasattr(response.response, 'close'):
+            response.response.close()
+        response.set_data(data)
+        # Les plages d'octets porteraient sur le fichier non compressé
+        response.headers.pop('Accept-Ranges', None)
+        return True
+
+
+compressor = Compressor()
+
+
+class StaticPayload:
+    """Corps constant encodé une seule fois, avec ses variantes compressées.
+
+    Chaque variante a son propre ETag fort ; la réponse porte Cache-Control
+    public et est revalidée par If-None-Match (304 sans corps).
+    """
+
+    def __init__(self, body, mimetype='application/json', max_age=0):
+        self.body = body
+        self.mimetype = mimetype
+        self.max_age = max_age
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.variants = {}
+        if compressor.enabled and len(body) >= compressor.min_size:
+            self.variants = {
+                encoding: compress(body, encoding, compressor.level(mimetype, encoding))
+                for encoding in compressor.encodings
+            }
+
+    def response(self):
+        encoding = request.accept_encodings.best_match(list(self.variants))
+        if encoding:
+            response = Response(self.variants[encoding], mimetype=self.mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f'{self.etag}-{encoding}')
+        else:
+            response = Response(self.body, mimetype=self.mimetype)
+            response.set_etag(self.etag)
+        if self.variants:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
+
+
+class FilePayload:
+    """StaticPayload construit depuis un fichier et reconstruit si sa date de modification change."""
+
+    def __init__(self, path, load, mimetype='application/json', max_age=0):
+        self.path = path
+        self.load = load
+        self.mimetype = mimetype
+        self.max_age = max_age
+        self._mtime = None
+        self._payload = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._payload = StaticPayload(self.load(self.path), self.mimetype, self.max_age)
+                    self._mtime = mtime
+        return self._payload
+
+    def response(self):
+        return self.get().response()
@@ -1,5 +1,7 @@
+import multiprocessing
 import os
 from dotenv import load_dotenv
+from ratelimit_storage import default_storage_path
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -9,20 +11,131 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Déploiement asynchrone (asgi.py) : dérivée de DATABASE_URI si absente
+    # (sqlite+aiosqlite://, postgresql+asyncpg://)
+    ASYNC_DATABASE_URI = os.getenv('ASYNC_DATABASE_URI')
+    
+    # Pool de connexions (voir database.engine_options)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # SQLite (développement)
+    SQLITE_WAL = os.getenv('SQLITE_WAL', 'true').lower() == 'true'
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
     
     # Configuration JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 heure
     JWT_REFRESH_TOKEN_EXPIRES = 2592000  # 30 jours
+    # Cache des claims des tokens déjà vérifiés (voir jwt_cache.py)
+    JWT_CACHE_ENABLED = True
+    JWT_CACHE_MAX_ENTRIES = int(os.getenv('JWT_CACHE_MAX_ENTRIES', 10000))
+    # Délai maximal de prise en compte d'une révocation faite par un autre worker
+    JWT_REVOCATION_SYNC_INTERVAL = int(os.getenv('JWT_REVOCATION_SYNC_INTERVAL', 30))
+    
+    # Hachage des mots de passe (voir hashing.py) : méthode werkzeug, None pour
+    # la méthode par défaut. Modifier la méthode rehache les mots de passe à la
+    # connexion suivante.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD')
+    # 0 : hachage dans le thread de la requête
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    # Démarrage des processus du pool : spawn ne copie pas l'état du worker
+    # (connexions, threads) ; fork démarre plus vite
+    PASSWORD_HASH_MP_CONTEXT = os.getenv('PASSWORD_HASH_MP_CONTEXT', 'spawn')
     
     # Configuration Limiter
     RATELIMIT_DEFAULT = "100 per day, 10 per hour, 1 per second"
-    RATELIMIT_STORAGE_URL = "memory://"
-    RATELIMIT_STRATEGY = "fixed-window"
+    # "memory://" : compteurs propres à chaque worker ; "sqlite:///<fichier>" :
+    # partagés par les workers de l'hôte (voir ratelimit_storage.py)
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
+    # "fixed-window" ou "moving-window" (pas de rafale à la frontière des fenêtres)
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'moving-window')
     RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    
+    # Cache des lectures, indexé par la version des tâches lue en base (jamais
+    # périmé) ; memory:// est propre à chaque worker gunicorn, redis:// partage
+    # les entrées entre workers
+    CACHE_ENABLED = True
+    CACHE_URL = os.getenv('CACHE_URL', 'memory://')
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    
+    # Sérialisation JSON avec orjson lorsqu'il est installé
+    JSON_USE_ORJSON = True
+    
+    # Compression des réponses (voir compression.py) ; "br" ignoré sans le paquet brotli
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_ALGORITHMS = ['br', 'gzip']
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_MIMETYPES = [
+        'application/json', 'application/x-ndjson', 'text/csv',
+        'text/html', 'text/css', 'text/javascript', 'application/javascript',
+    ]
+    # Niveaux par type de contenu ('*' : défaut). Les exports en flux privilégient
+    # la vitesse, les fichiers statiques (compressés une fois) le taux.
+    COMPRESS_LEVELS = {
+        '*': {'gzip': 6, 'br': 4},
+        'application/x-ndjson': {'gzip': 1, 'br': 1},
+        'text/csv': {'gzip': 1, 'br': 1},
+        'text/css': {'gzip': 9, 'br': 11},
+        'text/javascript': {'gzip': 9, 'br': 11},
+        'application/javascript': {'gzip': 9, 'br': 11},
+    }
+    COMPRESS_STATIC_CACHE_ENTRIES = 256
+    # Durée de cache côté client des corps constants (/, /api/swagger.json)
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 300))
     
-    # Configuration de logging
+    # Flux SSE des modifications de tâches (voir events.py)
+    SSE_HEARTBEAT_INTERVAL = int(os.getenv('SSE_HEARTBEAT_INTERVAL', 15))
+    SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', 100))
+    # Durée maximale d'un flux avant reconnexion du client (Last-Event-ID)
+    SSE_MAX_DURATION = int(os.getenv('SSE_MAX_DURATION', 300))
+    SSE_RETRY_MS = 3000
+    # Flux ouverts simultanément par worker (chacun occupe un thread), 503 au-delà ;
+    # 0 : sans limite
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', 0))
+    TASK_EVENTS_RETENTION_DAYS = int(os.getenv('TASK_EVENTS_RETENTION_DAYS', 7))
+    
+    # Instrumentation par requête (voir profiling.py) : requêtes SQL, temps base,
+    # sérialisation et validation par endpoint, détection des N+1
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_N_PLUS_ONE_THRESHOLD = int(os.getenv('PROFILING_N_PLUS_ONE_THRESHOLD', 5))
+    # Part des requêtes profilées avec cProfile (0 : aucune) ; le profil n'est
+    # écrit que si la requête dépasse PROFILING_SLOW_REQUEST_MS
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_SLOW_REQUEST_MS = int(os.getenv('PROFILING_SLOW_REQUEST_MS', 500))
+    PROFILING_DUMP_DIR = os.getenv('PROFILING_DUMP_DIR', 'profiles')
+    
+    # Configuration de logging (voir logging_config.py)
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text ou json
+    LOG_FILE = os.getenv('LOG_FILE', 'api.log')
+    # Écritures dans un thread dédié (QueueHandler + QueueListener)
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    # Échantillonnage par endpoint : "ping=100" garde un log sur 100
+    LOG_SAMPLING = os.getenv('LOG_SAMPLING', '')
+    
+    # Serveur WSGI gunicorn (voir gunicorn.conf.py)
+    GUNICORN_BIND = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+    # sync, gthread ou gevent
+    GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 1))
+    GUNICORN_WORKER_CONNECTIONS = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+    GUNICORN_KEEPALIVE = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+    GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', 30))
+    GUNICORN_GRACEFUL_TIMEOUT = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+    # Recyclage périodique des workers (fuites mémoire), avec gigue pour
+    # éviter qu'ils redémarrent tous en même temps
+    GUNICORN_MAX_REQUESTS = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
 
 class DevelopmentConfig(Config):
     """Configuration pour le développement."""
@@ -31,14 +144,44 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Configuration pour les tests."""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # TEST_DATABASE_URI permet de lancer les tests sur PostgreSQL
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URI', 'sqlite:///:memory:')
+    RATELIMIT_ENABLED = False
+    # Hachage rapide pour les tests
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
     
 class ProductionConfig(Config):
     """Configuration pour la production."""
     DEBUG = False
     RATELIMIT_DEFAULT = "1000 per day, 100 per hour, 5 per second"
-    # En production, utiliser Redis pour le stockage des compteurs de limitation
-    RATELIMIT_STORAGE_URL = os.getenv('REDIS_URL', 'memory://')
+    # En production, compteurs partagés par tous les workers : Redis s'il est
+    # configuré (plusieurs hôtes), sinon un fichier SQLite en mémoire partagée
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', os.getenv(
+        'REDIS_URL', f'sqlite:///{default_storage_path()}'
+    ))
+    # Sans Redis, un cache par worker : moins de succès, jamais de réponse périmée
+    # (clés indexées par users.tasks_version)
+    CACHE_URL = os.getenv('CACHE_URL', os.getenv('REDIS_URL', 'memory://'))
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_SAMPLING = os.getenv('LOG_SAMPLING', 'ping=100,home=100')
+    
+    # gthread : un processus par cœur, plusieurs threads pour recouvrir les
+    # attentes sur la base de données
+    GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 4))
+    GUNICORN_MAX_REQUESTS = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+    
+    # Un pool par worker gunicorn : les cœurs sont répartis entre les workers
+    # pour ne pas lancer cpu_count() processus de hachage dans chacun
+    PASSWORD_HASH_WORKERS = int(os.getenv(
+        'PASSWORD_HASH_WORKERS', max(1, multiprocessing.cpu_count() // GUNICORN_WORKERS)
+    ))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 4))
+    # Au plus la moitié des threads gthread pour les flux SSE : les autres
+    # endpoints gardent des threads libres
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', max(1, GUNICORN_THREADS // 2)))
 
 # Dictionnaire des configurations disponibles
 config = {
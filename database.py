@@ -0,0 +1,116 @@
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+import csv
+import io
+import time
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure le temps d'attente pour obtenir une connexion."""
+
+    # Histogramme renseigné par init_pool_metrics
+    checkout_wait = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.checkout_wait is not None:
+                self.checkout_wait.observe(time.perf_counter() - start)
+
+
+def is_sqlite_memory(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """Construire SQLALCHEMY_ENGINE_OPTIONS à partir des paramètres DB_POOL_*."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    # SQLite en mémoire : Flask-SQLAlchemy impose un StaticPool (une connexion)
+    if is_sqlite_memory(uri):
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    # Inutile pour un fichier SQLite local
+    if make_url(uri).get_backend_name() != 'sqlite':
+        options['pool_pre_ping'] = config['DB_POOL_PRE_PING']
+    return options
+
+
+def supports_copy(connection):
+    """COPY ... FROM STDIN disponible : PostgreSQL avec psycopg2 (copy_expert)."""
+    return connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+
+
+def copy_rows(connection, table, columns, rows, force_not_null=()):
+    """Insérer des lignes (tuples dans l'ordre de columns) par COPY ... FROM STDIN.
+
+    Un seul aller-retour par lot, dans la transaction de connection. En CSV,
+    None (champ vide sans guillemets) vaut NULL ; force_not_null liste les
+    colonnes où un champ vide reste une chaîne vide.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    options = 'FORMAT csv'
+    if force_not_null:
+        options += f", FORCE_NOT_NULL ({', '.join(force_not_null)})"
+    # Curseur DBAPI de la connexion : même transaction
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH ({options})", buffer)
+
+
+def configure_sqlite(engine, config):
+    """Appliquer les PRAGMA SQLite à chaque nouvelle connexion."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # sqlite3 ou connexion adaptée (aiosqlite) du déploiement asynchrone
+        cursor = dbapi_connection.cursor()
+        # WAL : les lectures ne bloquent plus pendant une écriture
+        if config['SQLITE_WAL']:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            # Suffisant en WAL : pas de fsync à chaque commit
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}")
+        cursor.close()
+
+
+def init_pool_metrics(engine, registry):
+    """Exporter l'état du pool de connexions dans le registre Prometheus."""
+    def pool_stat(name):
+        # engine.pool est recréé par engine.dispose() : relu à chaque collecte
+        def read():
+            method = getattr(engine.pool, name, None)
+            return method() if callable(method) else 0
+        return read
+
+    Gauge(
+        'db_pool_checked_out_connections', 'Database connections currently checked out',
+        registry=registry
+    ).set_function(pool_stat('checkedout'))
+    Gauge(
+        'db_pool_size', 'Database connection pool size', registry=registry
+    ).set_function(pool_stat('size'))
+    Gauge(
+        'db_pool_overflow', 'Database connections opened beyond the pool size',
+        registry=registry
+    ).set_function(pool_stat('overflow'))
+
+    InstrumentedQueuePool.checkout_wait = Histogram(
+        'db_pool_checkout_wait_seconds', 'Time spent waiting for a database connection',
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        registry=registry
+    )
@@ -0,0 +1,171 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+from models import db, TaskEvent
+import queue
+import threading
+
+# Nombre d'événements relus par requête lors d'une reprise
+EVENTS_PAGE_SIZE = 500
+
+
+class Subscription:
+    """File d'événements bornée d'un client SSE.
+
+    Si le client ne lit pas assez vite, la file déborde : les événements
+    suivants sont abandonnés et le flux se resynchronise depuis le journal.
+    """
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        return self.queue.get(timeout=timeout)
+
+    def reset(self):
+        """Vider la file avant une relecture du journal."""
+        self.overflowed = False
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class TooManyStreams(Exception):
+    """Nombre maximal de flux ouverts atteint dans ce worker : la requête doit être rejetée (503)."""
+
+
+class EventBroker:
+    """Diffusion en mémoire du processus des événements de tâches aux flux SSE.
+
+    Les événements des autres workers ne passent pas par le broker : ils sont
+    relus dans le journal (task_events) à chaque battement de cœur.
+    Chaque flux occupe un thread du worker pendant sa durée : au-delà de
+    SSE_MAX_STREAMS abonnements (0 : sans limite), subscribe lève
+    TooManyStreams pour garder des threads aux autres endpoints.
+    """
+
+    def __init__(self, app=None):
+        self.queue_size = 100
+        self.max_streams = 0
+        self._count = 0
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.queue_size = app.config.get('SSE_QUEUE_SIZE', 100)
+        self.max_streams = app.config.get('SSE_MAX_STREAMS', 0)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            if self.max_streams and self._count >= self.max_streams:
+                raise TooManyStreams()
+            self._subscriptions[user_id].add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None and subscription in subscriptions:
+                subscriptions.discard(subscription)
+                self._count -= 1
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id, events):
+        """Transmettre des événements validés (après le commit) aux abonnés de l'utilisateur."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            for event in events:
+                subscription.put(event)
+
+
+event_broker = EventBroker()
+
+
+def event_rows(user_id, event_type, tasks, dumps):
+    """Lignes de task_events des tâches, data sérialisée par dumps."""
+    return [{"user_id": user_id, "task_id": task.get('id'), "type": event_type,
+             "data": dumps(task)} for task in tasks]
+
+
+def record_events(user_id, event_type, tasks):
+    """Journaliser des événements dans la transaction en cours.
+
+    tasks : dictionnaires de tâches (to_dict), ou {"id": ...} pour une
+    suppression. Renvoie les événements à publier après le commit.
+    À appeler après touch_user_tasks : le verrou de la ligne users ordonne
+    les identifiants d'un même utilisateur dans l'ordre des commits.
+    """
+    if not tasks:
+        return []
+    rows = event_rows(user_id, event_type, tasks, current_app.json.dumps)
+    if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        ids = db.session.scalars(
+            insert(TaskEvent).returning(TaskEvent.id, sort_by_parameter_order=True), rows
+        ).all()
+    else:
+        # Sans RETURNING multi-lignes (SQLite < 3.35) : une insertion par événement
+        ids = [db.session.execute(insert(TaskEvent.__table__), row).inserted_primary_key[0]
+               for row in rows]
+    return [{"id": event_id, "type": event_type, "data": row["data"]}
+            for event_id, row in zip(ids, rows)]
+
+
+def last_event_id(user_id):
+    return db.session.scalar(
+        select(func.max(TaskEvent.id)).where(TaskEvent.user_id == user_id)
+    ) or 0
+
+
+def events_lost(after_id):
+    """Des événements postérieurs à after_id ont-ils pu être purgés du journal ?
+
+    Journal vide ou dont tous les identifiants sont inférieurs à after_id :
+    tout ce qui a suivi after_id a pu être purgé (et SQLite réattribue les
+    identifiants d'une table vidée).
+    """
+    oldest, newest = db.session.execute(
+        select(func.min(TaskEvent.id), func.max(TaskEvent.id))
+    ).one()
+    if oldest is None:
+        return after_id > 0
+    return oldest > after_id + 1 or newest < after_id
+
+
+def fetch_events(user_id, after_id, limit=EVENTS_PAGE_SIZE):
+    """Événements de l'utilisateur postérieurs à after_id, dans l'ordre."""
+    rows = db.session.execute(
+        select(TaskEvent.id, TaskEvent.type, TaskEvent.data)
+        .where(TaskEvent.user_id == user_id, TaskEvent.id > after_id)
+        .order_by(TaskEvent.id)
+        .limit(limit)
+    ).all()
+    return [{"id": row.id, "type": row.type, "data": row.data} for row in rows]
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {event['data']}\n\n"
+
+
+def purge_events(retention_days):
+    """Supprimer les événements plus anciens que la durée de rétention."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    result = db.session.execute(delete(TaskEvent).where(TaskEvent.created_at < cutoff))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,181 @@
+from marshmallow import fields, validate, validates_schema, post_load, ValidationError, EXCLUDE
+from sqlalchemy import select, func, and_, or_, tuple_, literal
+from datetime import datetime, timezone
+from models import Task
+from profiling import InstrumentedSchema
+
+# Colonnes exposées, dans l'ordre de Task.to_dict ; updated_at vaut created_at
+# pour les tâches antérieures à la colonne
+FIELDS = {
+    'id': Task.id,
+    'title': Task.title,
+    'description': Task.description,
+    'completed': Task.completed,
+    'created_at': Task.created_at,
+    'updated_at': func.coalesce(Task.updated_at, Task.created_at),
+    'user_id': Task.user_id,
+}
+
+# Colonnes autorisées pour le tri (l'id départage toujours les égalités)
+SORT_FIELDS = ('created_at', 'updated_at', 'title', 'completed', 'id')
+DATETIME_FIELDS = ('created_at', 'updated_at')
+
+# Ordre par défaut : celui de l'index ix_tasks_user_id_created_at_id
+DEFAULT_SORT = [('created_at', True)]
+
+
+class CommaSeparated(fields.Field):
+    """Liste de noms séparés par des virgules (?fields=id,title), limitée à choices.
+
+    Avec allow_descending, un nom peut être préfixé par '-' (?sort=-created_at).
+    """
+
+    def __init__(self, choices, allow_descending=False, **kwargs):
+        super().__init__(**kwargs)
+        self.choices = choices
+        self.allow_descending = allow_descending
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str):
+            raise ValidationError("Liste séparée par des virgules attendue")
+        names = [name.strip() for name in value.split(',')]
+        bare = [name.lstrip('-') if self.allow_descending else name for name in names]
+        unknown = [name for name in bare if name not in self.choices]
+        if unknown:
+            raise ValidationError(f"Champs inconnus : {', '.join(unknown)}. "
+                                  f"Valeurs possibles : {', '.join(self.choices)}")
+        if len(set(bare)) != len(bare):
+            raise ValidationError("Champ répété")
+        return names
+
+
+class TaskQuery:
+    """Filtres, tri et colonnes d'une liste de tâches, validés par TaskQuerySchema."""
+
+    def __init__(self, completed=None, created_after=None, created_before=None,
+                 title_prefix=None, sort=None, fields=None):
+        self.completed = completed
+        self.created_after = created_after
+        self.created_before = created_before
+        self.title_prefix = title_prefix
+        self.sort = sort or DEFAULT_SORT
+        # L'id termine toujours le tri : ordre total, utilisable comme curseur
+        if self.sort[-1][0] != 'id':
+            self.sort = self.sort + [('id', self.sort[-1][1])]
+        self.fields = fields or list(FIELDS)
+
+    def conditions(self, user_id, dialect):
+        conditions = [Task.user_id == user_id]
+        if self.completed is not None:
+            conditions.append(Task.completed == self.completed)
+        if self.created_after is not None:
+            conditions.append(Task.created_at >= self.created_after)
+        if self.created_before is not None:
+            conditions.append(Task.created_at < self.created_before)
+        if self.title_prefix:
+            conditions.append(title_prefix_condition(self.title_prefix, dialect))
+        return conditions
+
+    def statement(self, conditions):
+        """Colonnes demandées (et celles du tri, pour le curseur), dans l'ordre demandé."""
+        names = self.fields + [name for name, _ in self.sort if name not in self.fields]
+        order_by = [FIELDS[name].desc() if descending else FIELDS[name].asc()
+                    for name, descending in self.sort]
+        return (select(*[FIELDS[name].label(name) for name in names])
+                .where(*conditions)
+                .order_by(*order_by))
+
+    def serialize(self, row):
+        return {name: value.isoformat() if isinstance(value, datetime) else value
+                for name, value in ((name, getattr(row, name)) for name in self.fields)}
+
+    def position(self, row):
+        """Valeurs du tri d'une ligne, encodables en curseur."""
+        return [serialize_value(getattr(row, name)) for name, _ in self.sort]
+
+    def after(self, position):
+        """Condition : lignes situées après position dans l'ordre du tri."""
+        if not isinstance(position, list) or len(position) != len(self.sort):
+            raise ValidationError("Curseur invalide", field_name='cursor')
+        try:
+            # Paramètres typés : les booléens ne se comparent pas à True/False littéraux
+            keys = [(FIELDS[name], descending, literal(parse_value(name, value), FIELDS[name].type))
+                    for (name, descending), value in zip(self.sort, position)]
+        except (ValueError, TypeError):
+            raise ValidationError("Curseur invalide", field_name='cursor')
+
+        # Même sens pour toutes les colonnes : comparaison de tuples (recherche dans l'index)
+        if len({descending for _, descending, _ in keys}) == 1:
+            columns = tuple_(*[column for column, _, _ in keys])
+            values = tuple_(*[value for _, _, value in keys])
+            return columns < values if keys[0][1] else columns > values
+
+        # Sens mélangés : (a > x) OU (a = x ET b < y) OU ...
+        return or_(*[
+            and_(*[column == value for column, _, value in keys[:i]],
+                 column < value if descending else column > value)
+            for i, (column, descending, value) in enumerate(keys)
+        ])
+
+
+def serialize_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def parse_value(name, value):
+    if name in DATETIME_FIELDS:
+        return datetime.fromisoformat(value)
+    if name == 'id':
+        return int(value)
+    if name == 'completed':
+        return bool(value)
+    return str(value)
+
+
+def title_prefix_condition(prefix, dialect):
+    """Titre commençant par prefix (sensible à la casse), résolu par l'index (user_id, title).
+
+    SQLite : LIKE ignore la casse et n'utilise pas l'index, on compare donc à
+    l'intervalle [prefix, prefix suivant[ (collation binaire). PostgreSQL :
+    LIKE 'prefix%' avec l'index en varchar_pattern_ops.
+    """
+    if dialect == 'sqlite' and ord(prefix[-1]) < 0x10FFFF:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return and_(Task.title >= prefix, Task.title < upper)
+    return Task.title.startswith(prefix, autoescape=True)
+
+
+class TaskQuerySchema(InstrumentedSchema):
+    """Paramètres de filtrage, de tri et de projection de GET /api/tasks.
+
+    ?completed=true&created_after=2024-01-01T00:00:00&title_prefix=Rap
+    &sort=-completed,title&fields=id,title
+    """
+
+    class Meta:
+        # La pagination partage la query string
+        unknown = EXCLUDE
+
+    completed = fields.Boolean()
+    # Les dates sont stockées en UTC sans fuseau : une date avec fuseau est convertie
+    created_after = fields.NaiveDateTime(timezone=timezone.utc)
+    created_before = fields.NaiveDateTime(timezone=timezone.utc)
+    title_prefix = fields.String(validate=validate.Length(min=1, max=100))
+    sort = CommaSeparated(SORT_FIELDS, allow_descending=True)
+    # Schema.fields est réservé par marshmallow
+    columns = CommaSeparated(list(FIELDS), data_key='fields')
+
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        after, before = data.get('created_after'), data.get('created_before')
+        if after and before and after >= before:
+            raise ValidationError("created_after doit précéder created_before",
+                                  field_name='created_after')
+
+    @post_load
+    def make_query(self, data, **kwargs):
+        if 'columns' in data:
+            data['fields'] = data.pop('columns')
+        if 'sort' in data:
+            data['sort'] = [(name.lstrip('-'), name.startswith('-')) for name in data['sort']]
+        return TaskQuery(**data)
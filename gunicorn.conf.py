@@ -0,0 +1,52 @@
+"""Configuration gunicorn, chargée automatiquement depuis le répertoire courant.
+
+    FLASK_ENV=production gunicorn app:app
+
+Les valeurs proviennent de la configuration de l'environnement (config.py),
+surchargeables par les variables GUNICORN_*.
+
+Rechargement gracieux : ``kill -HUP <pid du master>`` relance les workers en
+terminant les requêtes en cours. Avec preload_app, le code est chargé dans le
+master : pour déployer une nouvelle version sans coupure, utiliser
+``kill -USR2`` (nouveau master) puis ``kill -WINCH`` et ``kill -QUIT`` sur
+l'ancien.
+"""
+from config import get_config
+
+settings = get_config()
+
+bind = settings.GUNICORN_BIND
+worker_class = settings.GUNICORN_WORKER_CLASS
+workers = settings.GUNICORN_WORKERS
+threads = settings.GUNICORN_THREADS
+worker_connections = settings.GUNICORN_WORKER_CONNECTIONS
+
+# Connexions HTTP persistantes (derrière un proxy ou un load balancer, garder
+# cette valeur supérieure au timeout d'inactivité de celui-ci)
+keepalive = settings.GUNICORN_KEEPALIVE
+timeout = settings.GUNICORN_TIMEOUT
+graceful_timeout = settings.GUNICORN_GRACEFUL_TIMEOUT
+max_requests = settings.GUNICORN_MAX_REQUESTS
+max_requests_jitter = settings.GUNICORN_MAX_REQUESTS_JITTER
+
+# Charger l'application une fois dans le master (démarrage plus rapide,
+# mémoire partagée par copy-on-write). gevent doit patcher la bibliothèque
+# standard avant l'import de l'application : pas de préchargement.
+preload_app = worker_class != 'gevent'
+
+accesslog = '-'
+errorlog = '-'
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def post_fork(server, worker):
+    """Réinitialiser dans chaque worker les ressources créées par le master."""
+    if preload_app:
+        from app import app
+        from models import db
+        from logging_config import setup_logging
+        # Ne pas partager les connexions ouvertes par le master
+        with app.app_context():
+            db.engine.dispose(close=False)
+        # Le thread d'écriture des logs ne survit pas au fork
+        setup_logging(settings)
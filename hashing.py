@@ -0,0 +1,90 @@
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+import multiprocessing
+import threading
+
+
+class PasswordHashingBusy(Exception):
+    """Trop de hachages en attente : la requête doit être rejetée (503)."""
+
+
+class PasswordHasher:
+    """Hachage et vérification des mots de passe dans un pool de processus borné.
+
+    Le hachage est volontairement coûteux en CPU : l'exécuter dans le thread de
+    la requête bloque le worker (et le GIL) pour toutes les autres requêtes.
+    Au-delà de PASSWORD_HASH_MAX_PENDING opérations en cours ou en attente, les
+    nouvelles demandes échouent immédiatement avec PasswordHashingBusy.
+    Avec PASSWORD_HASH_WORKERS = 0, le hachage s'exécute dans le thread appelant.
+    """
+
+    def __init__(self, app=None):
+        self.method = None
+        self.workers = 0
+        self.timeout = None
+        self._slots = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._method_prefix = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.method = app.config.get('PASSWORD_HASH_METHOD')
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.mp_context = app.config.get('PASSWORD_HASH_MP_CONTEXT', 'spawn')
+        max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.workers * 4)
+        self._slots = threading.BoundedSemaphore(max_pending) if self.workers else None
+        self._method_prefix = None
+
+    def _get_executor(self):
+        # Créé au premier usage : jamais dans le master gunicorn avant le fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.mp_context)
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout=self.timeout)
+
+    def hash(self, password):
+        if self.method:
+            return self._run(generate_password_hash, password, self.method)
+        return self._run(generate_password_hash, password)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Le hachage a-t-il été produit avec d'autres paramètres que la configuration ?"""
+        if self._method_prefix is None:
+            # Paramètres complets (ex: "pbkdf2:sha256:600000") de la méthode configurée
+            sample = generate_password_hash('', self.method) if self.method \
+                else generate_password_hash('')
+            self._method_prefix = sample.split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
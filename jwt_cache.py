@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from flask_jwt_extended import JWTManager
+from cache import MemoryBackend
+from models import db, User, RevokedToken
+import hashlib
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager qui garde en mémoire les claims des tokens déjà vérifiés.
+
+    Un token est identifié par son empreinte SHA-256 : tant qu'il n'a pas
+    expiré, la signature n'est pas revérifiée. Le cache est un LRU borné
+    (JWT_CACHE_MAX_ENTRIES) dont chaque entrée expire avec le token.
+    """
+
+    def __init__(self, app=None, add_context_processor=False):
+        self._claims_cache = None
+        super().__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        if app.config.get('JWT_CACHE_ENABLED', True):
+            self._claims_cache = MemoryBackend(app.config.get('JWT_CACHE_MAX_ENTRIES', 10000))
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Tokens en cookie (jeton CSRF) ou expirés acceptés : pas de cache
+        if self._claims_cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.sha256(encoded_token.encode()).hexdigest()
+        claims = self._claims_cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            expires_in = claims.get('exp', 0) - time.time()
+            if expires_in > 0:
+                self._claims_cache.set(key, claims, expires_in)
+        # Copie : les claims sont exposés à l'application via get_jwt()
+        return dict(claims)
+
+    def clear_cache(self):
+        if self._claims_cache is not None:
+            self._claims_cache.clear()
+
+
+class RevocationList:
+    """Liste de révocation en mémoire, resynchronisée périodiquement avec la base.
+
+    Contient les jti révoqués et les utilisateurs désactivés
+    (User.is_active = False) : la vérification d'un token ne fait aucune
+    requête. Une révocation faite par ce processus s'applique immédiatement,
+    celles des autres workers au plus tard après JWT_REVOCATION_SYNC_INTERVAL
+    secondes.
+    """
+
+    def __init__(self, app=None):
+        self.interval = 30
+        self._revoked_jtis = frozenset()
+        self._inactive_users = frozenset()
+        self._synced_at = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.interval = app.config.get('JWT_REVOCATION_SYNC_INTERVAL', 30)
+        self._synced_at = None
+
+    def sync(self):
+        """Recharger depuis la base les tokens révoqués non expirés et les comptes désactivés."""
+        now = datetime.utcnow()
+        jtis = db.session.scalars(
+            db.select(RevokedToken.jti).where(RevokedToken.expires_at > now)
+        ).all()
+        users = db.session.scalars(
+            db.select(User.id).where(User.is_active.is_(False))
+        ).all()
+        self._revoked_jtis = frozenset(jtis)
+        self._inactive_users = frozenset(str(user_id) for user_id in users)
+        self._synced_at = time.monotonic()
+
+    def _maybe_sync(self):
+        if self._synced_at is not None and time.monotonic() - self._synced_at < self.interval:
+            return
+        # Un seul thread resynchronise, les autres utilisent la liste courante
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.sync()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Synchronisation de la liste de révocation impossible: %s", e)
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jwt_payload):
+        self._maybe_sync()
+        return (jwt_payload.get('jti') in self._revoked_jtis
+                or str(jwt_payload.get('sub')) in self._inactive_users)
+
+    def revoke(self, jwt_payload):
+        """Révoquer un token (à committer par l'appelant)."""
+        db.session.add(RevokedToken(
+            jti=jwt_payload['jti'],
+            user_id=jwt_payload.get('sub'),
+            expires_at=datetime.fromtimestamp(jwt_payload['exp'], timezone.utc).replace(tzinfo=None)
+        ))
+        self._revoked_jtis = self._revoked_jtis | {jwt_payload['jti']}
+
+
+revocation_list = RevocationList()
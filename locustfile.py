@@ -1,21 +1,24 @@
+import os
 import random
+import uuid
 from locust import HttpUser, task, between
 
 class ApiTestUser(HttpUser):
-    wait_time = between(1, 5)  # Attendre entre 1 et 5 secondes entre les tâches
+    # Attendre entre 1 et 5 secondes entre les tâches (LOCUST_MIN_WAIT=0 LOCUST_MAX_WAIT=0 pour mesurer le débit)
+    wait_time = between(float(os.environ.get('LOCUST_MIN_WAIT', 1)),
+                        float(os.environ.get('LOCUST_MAX_WAIT', 5)))
     
     # Variables pour stocker les données d'authentification
     token = None
     refresh_token = None
     user_id = None
     
-    # Liste pour stocker les IDs des tâches créées
-    task_ids = []
-    
     def on_start(self):
         """Exécuté au démarrage de chaque utilisateur."""
-        # Créer un utilisateur aléatoire pour les tests
-        username = f"testuser{random.randint(1000, 9999)}"
+        # IDs des tâches créées par cet utilisateur (un attribut de classe serait partagé)
+        self.task_ids = []
+        # Créer un utilisateur unique pour les tests
+        username = f"testuser{uuid.uuid4().hex[:16]}"
         email = f"{username}@example.com"
         password = "Password123!"
         
@@ -0,0 +1,23 @@
+from locust import HttpUser, task, constant
+
+
+class ThroughputUser(HttpUser):
+    """Profil de saturation : aucune attente entre les requêtes.
+
+    Sert à comparer le débit maximal du serveur de développement et de
+    gunicorn (voir LOAD_TESTING.md). Les endpoints choisis sont exemptés du
+    rate limiting pour ne mesurer que le serveur.
+    """
+    wait_time = constant(0)
+
+    @task(10)
+    def ping_endpoint(self):
+        self.client.get("/ping")
+
+    @task(5)
+    def get_homepage(self):
+        self.client.get("/")
+
+    @task(1)
+    def check_health(self):
+        self.client.get("/health")
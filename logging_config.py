@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+from flask import has_request_context, request
+from logging.handlers import QueueHandler, QueueListener
+from prometheus_client import Gauge
+import atexit
+import itertools
+import json
+import logging
+import queue
+import threading
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributs standard d'un LogRecord, exclus des champs supplémentaires du JSON
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Un objet JSON par ligne, avec les champs passés via extra=."""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajouter la route et la méthode de la requête en cours aux enregistrements."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+            record.endpoint = request.endpoint
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Ne garder qu'un enregistrement sur N pour les endpoints très sollicités.
+
+    Les avertissements et erreurs sont toujours conservés.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._counters = {endpoint: itertools.count() for endpoint in rates}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not has_request_context():
+            return True
+        counter = self._counters.get(request.endpoint)
+        if counter is None:
+            return True
+        return next(counter) % self.rates[request.endpoint] == 0
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler qui laisse le formatage au thread d'écriture.
+
+    QueueHandler.prepare() formate le message dans le thread appelant ; la
+    file étant interne au processus, l'enregistrement peut être transmis tel
+    quel et formaté par le QueueListener.
+
+    dropped compte, pour tout le processus, les enregistrements perdus faute
+    de place dans la file (exporté par init_logging_metrics).
+    """
+
+    dropped = 0
+    _dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        # File pleine : abandonner l'enregistrement plutôt que bloquer la requête
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                LazyQueueHandler.dropped += 1
+
+
+def parse_sampling(value):
+    """Convertir "ping=100,home=10" en {'ping': 100, 'home': 10}."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        endpoint, _, rate = item.partition('=')
+        rates[endpoint.strip()] = max(int(rate), 1)
+    return rates
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def stop_logging():
+    """Vider la file et arrêter le thread d'écriture."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def setup_logging(config):
+    """Configurer le logging racine à partir de la configuration de l'application.
+
+    Avec LOG_ASYNC, les requêtes ne font qu'ajouter l'enregistrement à une
+    file : un thread QueueListener se charge du formatage et des écritures
+    (console et fichier).
+    """
+    global _listener
+    stop_logging()
+
+    formatter = JSONFormatter() if config.LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if config.LOG_FILE:
+        handlers.append(logging.FileHandler(config.LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    filters = [RequestContextFilter()]
+    rates = parse_sampling(config.LOG_SAMPLING)
+    if rates:
+        filters.append(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(config.LOG_LEVEL)
+
+    if config.LOG_ASYNC:
+        log_queue = queue.Queue(config.LOG_QUEUE_SIZE)
+        front_handlers = [LazyQueueHandler(log_queue)]
+        with _listener_lock:
+            _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _listener.start()
+    else:
+        front_handlers = handlers
+
+    for handler in front_handlers:
+        for log_filter in filters:
+            handler.addFilter(log_filter)
+        root.addHandler(handler)
+
+
+def init_logging_metrics(registry):
+    """Exporter le nombre d'enregistrements abandonnés par la file de logs."""
+    Gauge(
+        'log_records_dropped', 'Log records dropped because the logging queue was full',
+        registry=registry
+    ).set_function(lambda: LazyQueueHandler.dropped)
+
+
+atexit.register(stop_logging)
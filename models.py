@@ -1,6 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from hashing import password_hasher
 
 db = SQLAlchemy()
 
@@ -13,14 +13,26 @@ class User(db.Model):
     password_hash = db.Column(db.String(256), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Marqueur de modification des tâches (ETag / Last-Modified de la liste)
+    tasks_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    tasks_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Compteurs maintenus dans les transactions d'écriture (GET /api/tasks/stats)
+    tasks_total = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    tasks_completed = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     def __init__(self, username, email, password):
         self.username = username
         self.email = email
-        self.password_hash = generate_password_hash(password)
+        self.set_password(password)
+        
+    def set_password(self, password):
+        self.password_hash = password_hasher.hash(password)
         
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         return {
@@ -42,10 +54,21 @@ class Task(db.Model):
     description = db.Column(db.Text)
     completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     user = db.relationship('User', backref=db.backref('tasks', lazy=True))
     
+    __table_args__ = (
+        # Liste paginée (page et curseur) : WHERE user_id ORDER BY created_at DESC, id DESC
+        db.Index('ix_tasks_user_id_created_at_id', user_id, created_at.desc(), id),
+        # Liste filtrée : WHERE user_id AND completed ORDER BY created_at DESC
+        db.Index('ix_tasks_user_id_completed_created_at', user_id, completed, created_at),
+        # Filtre par préfixe et tri par titre ; LIKE 'préfixe%' sur PostgreSQL
+        db.Index('ix_tasks_user_id_title', user_id, title,
+                 postgresql_ops={'title': 'varchar_pattern_ops'}),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -53,8 +76,104 @@ class Task(db.Model):
             'description': self.description,
             'completed': self.completed,
             'created_at': self.created_at.isoformat(),
+            'updated_at': self.last_modified.isoformat(),
             'user_id': self.user_id
         }
         
+    @classmethod
+    def projection(cls):
+        """Colonnes sérialisées par to_dict, pour les lectures sans objet ORM."""
+        return (cls.id, cls.title, cls.description, cls.completed,
+                cls.created_at, cls.updated_at, cls.user_id)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Équivalent de to_dict pour une ligne issue de projection()."""
+        return {
+            'id': row.id,
+            'title': row.title,
+            'description': row.description,
+            'completed': row.completed,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': (row.updated_at or row.created_at).isoformat(),
+            'user_id': row.user_id
+        }
+    
+    @property
+    def last_modified(self):
+        # Les tâches antérieures à la colonne updated_at n'ont pas de valeur
+        return self.updated_at or self.created_at
+    
     def __repr__(self):
         return f'<Task {self.title}>'
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    # Au-delà, le token est refusé de toute façon : la ligne peut être purgée
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+class TaskEvent(db.Model):
+    """Journal des modifications de tâches, relu par les flux SSE (Last-Event-ID)."""
+    __tablename__ = 'task_events'
+    
+    # Identifiant croissant : sert d'id d'événement SSE
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Sans clé étrangère : l'événement survit à la suppression de la tâche
+    task_id = db.Column(db.Integer)
+    type = db.Column(db.String(20), nullable=False)
+    # Tâche sérialisée en JSON (id seul pour une suppression)
+    data = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    __table_args__ = (
+        # Reprise : WHERE user_id AND id > :last_event_id ORDER BY id
+        db.Index('ix_task_events_user_id_id', user_id, id),
+    )
+    
+    def __repr__(self):
+        return f'<TaskEvent {self.id} {self.type}>'
+
+def add_missing_columns(engine):
+    """Ajouter les colonnes manquantes sur une base existante.
+
+    Les colonnes ajoutées doivent être nullables ou avoir un server_default.
+    Renvoie les colonnes ajoutées ("table.colonne").
+    """
+    added = []
+    inspector = db.inspect(engine)
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} ' \
+                      f'{column.type.compile(engine.dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+                connection.exec_driver_sql(ddl)
+                added.append(f'{table.name}.{column.name}')
+    return added
+
+def create_indexes(engine):
+    """Créer les index manquants sur une base existante.
+
+    db.create_all() ignore les tables déjà présentes, y compris leurs index :
+    cette fonction sert de migration idempotente pour les bases existantes.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
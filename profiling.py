@@ -0,0 +1,195 @@
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from marshmallow import Schema
+from prometheus_client import Counter as PrometheusCounter, Histogram
+from sqlalchemy import event
+import cProfile
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestProfile:
+    """Mesures d'une requête : requêtes SQL (par texte), temps base, sérialisation, validation."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.statements = Counter()
+        self.timings = {'db': 0.0, 'serialization': 0.0, 'validation': 0.0}
+        self.profiler = None
+
+    @property
+    def statement_count(self):
+        return sum(self.statements.values())
+
+
+def current_profile():
+    if has_request_context():
+        return g.get('_request_profile')
+    return None
+
+
+@contextmanager
+def timed(name):
+    """Ajouter la durée du bloc au temps name de la requête en cours (si instrumentée)."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.timings[name] += time.perf_counter() - start
+
+
+class InstrumentedSchema(Schema):
+    """Schéma marshmallow dont le temps de validation (load) est mesuré par requête."""
+
+    def load(self, *args, **kwargs):
+        with timed('validation'):
+            return super().load(*args, **kwargs)
+
+
+class RequestProfiler:
+    """Instrumentation par requête, activée par PROFILING_ENABLED.
+
+    - nombre de requêtes SQL et temps passé en base (événements
+      before/after_cursor_execute du moteur) ;
+    - temps de sérialisation (jsonify) et de validation (InstrumentedSchema.load) ;
+    - histogrammes Prometheus par endpoint et en-tête Server-Timing ;
+    - N+1 : une même requête SQL exécutée PROFILING_N_PLUS_ONE_THRESHOLD fois
+      ou plus dans une requête HTTP est comptée et journalisée ;
+    - une requête sur PROFILING_SAMPLE_RATE est profilée avec cProfile, le
+      profil est écrit dans PROFILING_DUMP_DIR si elle dépasse
+      PROFILING_SLOW_REQUEST_MS.
+
+    Désactivée, aucun hook n'est installé.
+    """
+
+    def __init__(self, app=None, engine=None, registry=None):
+        self.enabled = False
+        self.n_plus_one_threshold = 5
+        self.sample_rate = 0.0
+        self.slow_request = 0.5
+        self.dump_dir = 'profiles'
+        if app is not None:
+            self.init_app(app, engine, registry)
+
+    def init_app(self, app, engine, registry=None):
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        if not self.enabled:
+            return
+        self.n_plus_one_threshold = app.config.get('PROFILING_N_PLUS_ONE_THRESHOLD', 5)
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.slow_request = app.config.get('PROFILING_SLOW_REQUEST_MS', 500) / 1000
+        self.dump_dir = app.config.get('PROFILING_DUMP_DIR', 'profiles')
+
+        self.sql_statements = Histogram(
+            'request_sql_statements', 'SQL statements executed per request',
+            ['endpoint'], buckets=STATEMENT_BUCKETS, registry=registry
+        )
+        self.durations = {
+            name: Histogram(
+                f'request_{name}_seconds', description, ['endpoint'],
+                buckets=TIME_BUCKETS, registry=registry
+            )
+            for name, description in (
+                ('db', 'Time spent executing SQL statements per request'),
+                ('serialization', 'Time spent serializing JSON responses per request'),
+                ('validation', 'Time spent validating request data per request'),
+            )
+        }
+        self.n_plus_one = PrometheusCounter(
+            'request_n_plus_one', 'Requests executing the same SQL statement repeatedly',
+            ['endpoint'], registry=registry
+        )
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._instrument_json(app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _instrument_json(self, app):
+        provider = app.json
+        response = provider.response
+
+        def timed_response(*args, **kwargs):
+            with timed('serialization'):
+                return response(*args, **kwargs)
+
+        provider.response = timed_response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if current_profile() is not None:
+            context._profiling_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile()
+        start = getattr(context, '_profiling_start', None)
+        if profile is None or start is None:
+            return
+        profile.timings['db'] += time.perf_counter() - start
+        # Requête paramétrée : même texte pour chaque itération d'un N+1
+        profile.statements[statement] += 1
+
+    def _before_request(self):
+        profile = g._request_profile = RequestProfile()
+        if self.sample_rate and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Un autre profileur est déjà actif
+                return
+            profile.profiler = profiler
+
+    def _after_request(self, response):
+        profile = g.pop('_request_profile', None)
+        if profile is None:
+            return response
+        if profile.profiler is not None:
+            profile.profiler.disable()
+        duration = time.perf_counter() - profile.started_at
+        endpoint = request.endpoint or 'unknown'
+
+        self.sql_statements.labels(endpoint).observe(profile.statement_count)
+        for name, seconds in profile.timings.items():
+            self.durations[name].labels(endpoint).observe(seconds)
+
+        repeated = [(statement, count) for statement, count in profile.statements.items()
+                    if count >= self.n_plus_one_threshold]
+        if repeated:
+            self.n_plus_one.labels(endpoint).inc()
+            for statement, count in repeated:
+                logger.warning("N+1 probable sur %s : requête exécutée %s fois : %s",
+                               endpoint, count, ' '.join(statement.split())[:200])
+
+        if profile.profiler is not None and duration >= self.slow_request:
+            self._dump(profile.profiler, endpoint, duration)
+
+        response.headers['Server-Timing'] = ', '.join(
+            [f'{name};dur={seconds * 1000:.2f}' for name, seconds in profile.timings.items()]
+            + [f'total;dur={duration * 1000:.2f}', f'sql;desc="{profile.statement_count} statements"']
+        )
+        return response
+
+    def _dump(self, profiler, endpoint, duration):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        path = os.path.join(
+            self.dump_dir, f'{endpoint}-{int(time.time() * 1000)}-{os.getpid()}.prof'
+        )
+        profiler.dump_stats(path)
+        logger.warning("Requête lente sur %s (%.0f ms) : profil écrit dans %s",
+                       endpoint, duration * 1000, path)
+
+
+profiler = RequestProfiler()
@@ -0,0 +1,192 @@
+from limits.storage import Storage, MovingWindowSupport
+from sqlalchemy.engine import make_url
+import os
+import random
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS window_entries (
+    key TEXT NOT NULL,
+    acquired_at REAL NOT NULL,
+    -- Fin de la fenêtre de la limite qui a créé l'entrée (purge par clé)
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_window_entries_key_acquired_at
+    ON window_entries (key, acquired_at);
+"""
+
+
+def default_storage_path():
+    """Fichier des compteurs : en RAM (/dev/shm) quand le système le permet."""
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else '/tmp'
+    return os.path.join(directory, 'api-ratelimit.db')
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """Stockage des compteurs de limitation partagé par les processus d'un hôte.
+
+        sqlite:////dev/shm/api-ratelimit.db
+
+    Le stockage "memory://" est propre à chaque worker gunicorn : avec N
+    workers, un client dispose en pratique de N fois la limite. Ici les
+    compteurs vivent dans un fichier SQLite (en RAM sous /dev/shm) partagé par
+    tous les workers, sans service externe. Les données étant éphémères, le
+    fichier est ouvert en WAL sans synchronisation disque.
+
+    Supporte les stratégies "fixed-window" et "moving-window".
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    # Probabilité de purger les entrées expirées de toutes les clés à chaque écriture
+    PURGE_PROBABILITY = 0.001
+
+    def __init__(self, uri, wrap_exceptions=False, busy_timeout=5000, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # Même convention que SQLAlchemy : sqlite:////dev/shm/x.db -> /dev/shm/x.db,
+        # sqlite:///x.db -> x.db (relatif au répertoire courant)
+        self.path = make_url(uri).database or default_storage_path()
+        self.busy_timeout = int(busy_timeout)
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Ajouter expires_at aux entrées d'un fichier créé par une version précédente."""
+        with self._transaction() as connection:
+            columns = {row[1] for row in connection.execute('PRAGMA table_info(window_entries)')}
+            if 'expires_at' not in columns:
+                connection.execute('ALTER TABLE window_entries ADD COLUMN expires_at REAL')
+                # Rétention fixe d'un jour de la version précédente
+                connection.execute('UPDATE window_entries SET expires_at = acquired_at + 86400')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # Une connexion par thread, recréée après un fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout / 1000,
+                isolation_level=None, check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def _maybe_purge(self, connection, now):
+        # Chaque entrée porte la fin de sa fenêtre : une limite "per month" garde
+        # ses entrées un mois, quelle que soit la durée des autres limites
+        if random.random() < self.PURGE_PROBABILITY:
+            connection.execute('DELETE FROM counters WHERE expires_at <= ?', (now,))
+            connection.execute('DELETE FROM window_entries WHERE expires_at <= ?', (now,))
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                'DELETE FROM counters WHERE key = ? AND expires_at <= ?', (key, now)
+            )
+            connection.execute(
+                'INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = value + excluded.value'
+                + (', expires_at = excluded.expires_at' if elastic_expiry else ''),
+                (key, amount, now + expiry)
+            )
+            (value,) = connection.execute(
+                'SELECT value FROM counters WHERE key = ?', (key,)
+            ).fetchone()
+            self._maybe_purge(connection, now)
+        return value
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM counters WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            'SELECT expires_at FROM counters WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._transaction() as connection:
+            count = connection.execute('DELETE FROM counters').rowcount
+            count += connection.execute('DELETE FROM window_entries').rowcount
+        return count
+
+    def clear(self, key):
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM counters WHERE key = ?', (key,))
+            connection.execute('DELETE FROM window_entries WHERE key = ?', (key,))
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                'DELETE FROM window_entries WHERE key = ? AND acquired_at <= ?',
+                (key, now - expiry)
+            )
+            (count,) = connection.execute(
+                'SELECT COUNT(*) FROM window_entries WHERE key = ?', (key,)
+            ).fetchone()
+            if count + amount > limit:
+                return False
+            connection.executemany(
+                'INSERT INTO window_entries (key, acquired_at, expires_at) VALUES (?, ?, ?)',
+                [(key, now, now + expiry)] * amount
+            )
+            self._maybe_purge(connection, now)
+        return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, count = self._connection().execute(
+            'SELECT MIN(acquired_at), COUNT(*) FROM window_entries '
+            'WHERE key = ? AND acquired_at > ?',
+            (key, now - expiry)
+        ).fetchone()
+        return (oldest if count else now), count
+
+
+class _Transaction:
+    """Transaction BEGIN IMMEDIATE : le verrou d'écriture est pris dès le début,
+    la lecture du compteur et sa mise à jour sont atomiques entre processus."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+        return False
@@ -0,0 +1,157 @@
+from sqlalchemy import and_, case, event, func, literal_column, or_, select, table, column, tuple_
+from models import db, Task
+import re
+
+# Mots de la requête : les opérateurs des syntaxes FTS5 / tsquery sont ignorés
+WORD = re.compile(r'\w+')
+MAX_QUERY_TERMS = 10
+
+# Configuration PostgreSQL : sans racinisation, compatible avec la recherche par préfixe
+TSCONFIG = 'simple'
+
+# SQLite : table FTS5 à contenu externe (le texte reste dans tasks), tenue à
+# jour par des triggers dans la transaction de chaque écriture. Les index de
+# préfixes de 2 et 3 caractères accélèrent les recherches "mot*". user_id est
+# indexé pour restreindre le MATCH aux tâches de l'utilisateur dans l'index.
+SQLITE_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, user_id, content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description, user_id)
+        VALUES (new.id, new.title, new.description, new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, user_id)
+        VALUES ('delete', old.id, old.title, old.description, old.user_id);
+    END""",
+    # Seuls les changements de texte réindexent la tâche (pas les bascules)
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, user_id)
+        VALUES ('delete', old.id, old.title, old.description, old.user_id);
+        INSERT INTO tasks_fts (rowid, title, description, user_id)
+        VALUES (new.id, new.title, new.description, new.user_id);
+    END""",
+]
+
+# PostgreSQL : colonne générée (calculée à chaque écriture) et index GIN
+# composite (user_id, search_vector) grâce à btree_gin : la recherche ne lit
+# que les entrées de l'utilisateur. Le titre pèse plus que la description
+# dans le classement.
+POSTGRESQL_SCHEMA = [
+    f"""ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{TSCONFIG}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{TSCONFIG}', coalesce(description, '')), 'B')
+        ) STORED""",
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    # Index global des versions précédentes
+    "DROP INDEX IF EXISTS ix_tasks_search_vector",
+    """CREATE INDEX IF NOT EXISTS ix_tasks_user_search_vector
+        ON tasks USING GIN (user_id, search_vector)""",
+]
+
+tasks_fts = table('tasks_fts', column('rowid'))
+
+
+def create_search_index(connection):
+    """Créer l'index de recherche s'il est absent (migration idempotente).
+
+    Sur SQLite, une table FTS5 nouvellement créée est remplie depuis les
+    tâches existantes ; une table d'une version précédente, sans user_id,
+    est recréée.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        inspector = db.inspect(connection)
+        created = not inspector.has_table('tasks_fts')
+        if not created and 'user_id' not in {c['name'] for c in inspector.get_columns('tasks_fts')}:
+            drop_search_index(connection)
+            created = True
+        for ddl in SQLITE_SCHEMA:
+            connection.exec_driver_sql(ddl)
+        if created:
+            connection.exec_driver_sql("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        for ddl in POSTGRESQL_SCHEMA:
+            connection.exec_driver_sql(ddl)
+
+
+def drop_search_index(connection):
+    """Supprimer l'index de recherche (chargement en masse, recréé par create_search_index).
+
+    Sur PostgreSQL, la colonne générée est supprimée avec son index : la
+    recréer calcule tous les vecteurs en une passe.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update'):
+            connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+        connection.exec_driver_sql('DROP TABLE IF EXISTS tasks_fts')
+    elif dialect == 'postgresql':
+        connection.exec_driver_sql('DROP INDEX IF EXISTS ix_tasks_user_search_vector')
+        connection.exec_driver_sql('ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector')
+
+
+@event.listens_for(Task.__table__, 'after_create')
+def _after_create_tasks(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Task.__table__, 'before_drop')
+def _before_drop_tasks(target, connection, **kw):
+    # L'index FTS5 ne doit pas survivre à la table qu'il indexe
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS tasks_fts')
+
+
+def query_terms(q):
+    return WORD.findall(q.lower())[:MAX_QUERY_TERMS]
+
+
+def search_statement(dialect, user_id, terms):
+    """Tâches de l'utilisateur contenant tous les termes (préfixes), les plus pertinentes d'abord.
+
+    Renvoie (requête, score) : le score croît quand la pertinence décroît,
+    l'ordre (score, id) sert de clé au curseur. Sans index plein texte
+    (autres dialectes), recherche des termes par ILIKE, titres d'abord.
+
+    Seuls les scores de PostgreSQL (ts_rank, calculé sur le seul document) et
+    de la recherche ILIKE sont stables : le curseur reprend exactement où la
+    page précédente s'arrêtait. Sur SQLite, bm25 dépend des statistiques de
+    toute la table FTS5 : une écriture de n'importe quel utilisateur entre deux
+    pages décale les scores, et le curseur peut sauter ou répéter des résultats.
+    """
+    if dialect == 'sqlite':
+        # Filtre user_id dans l'expression MATCH : l'index ne parcourt que ses tâches
+        match = f'user_id : "{int(user_id)}" AND {{title description}} : (' + ' '.join(
+            f'"{term}"*' for term in terms) + ')'
+        # bm25 : négatif, d'autant plus petit que la tâche est pertinente
+        score = func.bm25(literal_column('tasks_fts'), 10.0, 1.0, 0.0)
+        stmt = (select(*Task.projection(), score.label('score'))
+                .select_from(Task)
+                .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+                .where(literal_column('tasks_fts').op('MATCH')(match)))
+    elif dialect == 'postgresql':
+        vector = literal_column('tasks.search_vector')
+        query = func.to_tsquery(literal_column(f"'{TSCONFIG}'::regconfig"),
+                                ' & '.join(f'{term}:*' for term in terms))
+        score = -func.ts_rank(vector, query)
+        stmt = (select(*Task.projection(), score.label('score'))
+                .where(vector.op('@@')(query)))
+    else:
+        in_title = [Task.title.icontains(term, autoescape=True) for term in terms]
+        score = case((and_(*in_title), 0.0), else_=1.0)
+        stmt = (select(*Task.projection(), score.label('score'))
+                .where(*[or_(title, Task.description.icontains(term, autoescape=True))
+                         for title, term in zip(in_title, terms)]))
+    return stmt.where(Task.user_id == user_id).order_by(score, Task.id), score
+
+
+def match_tasks(user_id, terms, limit, after=None):
+    """Une page de résultats : lignes (avec leur score), et une ligne de plus si la suite existe."""
+    stmt, score = search_statement(db.session.get_bind().dialect.name, user_id, terms)
+    if after is not None:
+        stmt = stmt.where(tuple_(score, Task.id) > after)
+    return db.session.execute(stmt.limit(limit + 1)).all()
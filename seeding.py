@@ -0,0 +1,224 @@
+"""Génération de données synthétiques en masse pour les tests de charge.
+
+    flask seed-data --users 100000 --tasks 10000000 [--skew 1.0] [--seed 42]
+
+Les utilisateurs s'appellent <prefix><n> (seed0, seed1...) et partagent le
+mot de passe SEED_PASSWORD. Les tâches sont réparties selon une loi de Zipf
+d'exposant skew : l'utilisateur de rang n reçoit une part proportionnelle à
+1 / (n + 1) ** skew. seed0 est donc le plus chargé ; skew = 0 donne une
+répartition uniforme.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, insert, select, update
+from models import db, User, Task
+from hashing import password_hasher
+from database import copy_rows, supports_copy
+from search import create_search_index, drop_search_index
+import logging
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Même mot de passe que les scénarios Locust
+SEED_PASSWORD = 'Password123!'
+
+WORDS = ['rapport', 'réunion', 'courses', 'facture', 'projet', 'client', 'revue', 'budget',
+         'planning', 'livraison', 'support', 'migration', 'tests', 'documentation', 'devis',
+         'contrat', 'formation', 'recrutement', 'inventaire', 'sauvegarde', 'déploiement',
+         'audit', 'relance', 'commande', 'présentation', 'archivage', 'maintenance', 'sécurité']
+
+# Titres et descriptions tirés dans des réserves pré-générées : un tirage par ligne
+POOL_BITS = 12
+
+TASK_COLUMNS = ('title', 'description', 'completed', 'created_at', 'updated_at', 'user_id')
+
+
+def task_counts(users, tasks, skew):
+    """Nombre de tâches de chaque utilisateur (loi de Zipf), de somme tasks."""
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    total = sum(weights)
+    counts = [int(tasks * weight / total) for weight in weights]
+    # Le reste des arrondis va aux utilisateurs les plus chargés
+    for rank in range(tasks - sum(counts)):
+        counts[rank % users] += 1
+    return counts
+
+
+def next_rank(connection, prefix):
+    """Rang suivant le plus grand <prefix><n> existant, 0 s'il n'y en a pas.
+
+    Seuls les noms formés du préfixe suivi de chiffres comptent : seed_admin
+    ou seedling ne décalent pas la numérotation.
+    """
+    pattern = re.compile(re.escape(prefix) + r'(\d+)')
+    usernames = connection.scalars(
+        select(User.username).where(User.username.startswith(prefix, autoescape=True))
+    )
+    matches = (pattern.fullmatch(username) for username in usernames)
+    return max((int(match.group(1)) + 1 for match in matches if match), default=0)
+
+
+def sqlite_datetime(value):
+    # Format de stockage du type DateTime de SQLAlchemy sur SQLite
+    return value.isoformat(' ', 'microseconds')
+
+
+def bulk_insert(connection, table, columns, rows):
+    """Insérer un lot de lignes (tuples dans l'ordre de columns, valeurs au format du driver).
+
+    - PostgreSQL (psycopg2) : COPY ... FROM STDIN, un aller-retour par lot ;
+    - SQLite : executemany du driver sur l'INSERT compilé, sans traitement des
+      paramètres par SQLAlchemy (qui coûterait plus que l'insertion) ;
+    - autres : INSERT multi-lignes par lots de SQLAlchemy (insertmanyvalues).
+    """
+    if supports_copy(connection):
+        copy_rows(connection, table.name, columns, rows)
+    elif connection.dialect.name == 'sqlite':
+        compiled = insert(table).compile(dialect=connection.dialect, column_keys=list(columns))
+        order = [columns.index(name) for name in compiled.positiontup]
+        if order != list(range(len(columns))):
+            rows = [tuple(row[i] for i in order) for row in rows]
+        connection.exec_driver_sql(compiled.string, rows)
+    else:
+        connection.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+class TaskGenerator:
+    """Lignes de la table tasks (tuples de TASK_COLUMNS), dates réparties sur les days derniers jours."""
+
+    def __init__(self, rng, now, days=365, completed_ratio=0.3, format_datetime=None):
+        self.rng = rng
+        self.now = now
+        self.format_datetime = format_datetime or (lambda value: value)
+        self.span = days * 86400
+        self.completed_ratio = completed_ratio
+        self.titles = [self.text(3).capitalize() for _ in range(1 << POOL_BITS)]
+        self.descriptions = [self.text(12) for _ in range(1 << POOL_BITS)]
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words))
+
+    def rows(self, user_id, count):
+        rng = self.rng
+        format_datetime = self.format_datetime
+        rows = []
+        for _ in range(count):
+            created_at = self.now - timedelta(seconds=rng.random() * self.span)
+            completed = rng.random() < self.completed_ratio
+            # Une tâche terminée a été modifiée après sa création
+            updated_at = created_at + (self.now - created_at) * rng.random() if completed else created_at
+            rows.append((
+                self.titles[rng.getrandbits(POOL_BITS)],
+                # Une tâche sur cinq sans description
+                self.descriptions[rng.getrandbits(POOL_BITS)] if rng.random() < 0.8 else None,
+                completed,
+                format_datetime(created_at),
+                format_datetime(updated_at),
+                user_id,
+            ))
+        return rows
+
+
+def seed_database(users, tasks, skew=1.0, seed=0, prefix='seed', batch_size=50_000,
+                  completed_ratio=0.3, days=365, defer_indexes=True):
+    """Insérer users utilisateurs et tasks tâches en masse, renvoyer un résumé.
+
+    Insertions par lots de batch_size (COPY sur PostgreSQL, voir bulk_insert),
+    validées lot par lot.
+    Avec defer_indexes, les index secondaires et l'index de recherche de
+    tasks sont supprimés pendant le chargement puis reconstruits en une
+    passe, bien plus rapide que leur mise à jour ligne par ligne. À réserver
+    aux bases de test : les lectures concurrentes perdent leurs index.
+    Les compteurs tasks_total et tasks_completed sont renseignés directement.
+    """
+    start = time.perf_counter()
+    counts = task_counts(users, tasks, skew)
+    now = datetime.utcnow()
+    # Un seul hachage (coûteux par construction) pour tous les utilisateurs
+    password_hash = password_hasher.hash(SEED_PASSWORD)
+
+    with db.engine.connect() as connection:
+        offset = next_rank(connection, prefix)
+        sqlite = connection.dialect.name == 'sqlite'
+        generator = TaskGenerator(random.Random(seed), now, days, completed_ratio,
+                                  sqlite_datetime if sqlite else None)
+        if sqlite:
+            # Pas de fsync à chaque lot : une base de test se régénère
+            synchronous = connection.exec_driver_sql('PRAGMA synchronous').scalar()
+            connection.exec_driver_sql('PRAGMA synchronous=OFF')
+        try:
+            if defer_indexes:
+                drop_search_index(connection)
+                for index in Task.__table__.indexes:
+                    index.drop(connection, checkfirst=True)
+                connection.commit()
+
+            user_ids = []
+            for first in range(0, users, batch_size):
+                user_ids += connection.scalars(
+                    insert(User.__table__).returning(User.__table__.c.id, sort_by_parameter_order=True),
+                    [{
+                        'username': f'{prefix}{offset + rank}',
+                        'email': f'{prefix}{offset + rank}@example.com',
+                        'password_hash': password_hash,
+                        'created_at': now,
+                        'is_active': True,
+                        'tasks_total': counts[rank],
+                        'tasks_completed': 0,
+                    } for rank in range(first, min(first + batch_size, users))]
+                ).all()
+                connection.commit()
+
+            completed = []
+            batch = []
+            inserted = 0
+            for user_id, count in zip(user_ids, counts):
+                rows = generator.rows(user_id, count)
+                completed.append({'user': user_id, 'completed': sum(row[2] for row in rows)})
+                batch += rows
+                while len(batch) >= batch_size:
+                    bulk_insert(connection, Task.__table__, TASK_COLUMNS, batch[:batch_size])
+                    connection.commit()
+                    inserted += batch_size
+                    del batch[:batch_size]
+                    logger.info("%s / %s tâches insérées (%.0f lignes/s)", inserted, tasks,
+                                inserted / (time.perf_counter() - start))
+            if batch:
+                bulk_insert(connection, Task.__table__, TASK_COLUMNS, batch)
+                inserted += len(batch)
+
+            for first in range(0, len(completed), batch_size):
+                connection.execute(
+                    update(User.__table__)
+                    .where(User.__table__.c.id == bindparam('user'))
+                    .values(tasks_completed=bindparam('completed')),
+                    completed[first:first + batch_size]
+                )
+            connection.commit()
+        finally:
+            # Même après une erreur, ne pas laisser la base sans index ni fsync
+            connection.rollback()
+            if defer_indexes:
+                logger.info("Reconstruction des index")
+                for index in Task.__table__.indexes:
+                    index.create(connection, checkfirst=True)
+                create_search_index(connection)
+                connection.commit()
+            if sqlite:
+                connection.exec_driver_sql(f'PRAGMA synchronous={synchronous}')
+
+        # Statistiques du planificateur à jour pour les nouveaux volumes
+        connection.exec_driver_sql('ANALYZE')
+        connection.commit()
+
+    seconds = time.perf_counter() - start
+    logger.info("%s utilisateurs et %s tâches générés en %.1f s", users, inserted, seconds)
+    return {
+        'users': users,
+        'tasks': inserted,
+        'max_tasks_per_user': max(counts, default=0),
+        'first_user': f'{prefix}{offset}',
+        'seconds': seconds,
+    }
@@ -0,0 +1,52 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson est optionnel
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON basé sur orjson, compatible avec le fournisseur par défaut.
+
+    Les dates restent sérialisées par le fournisseur par défaut (format HTTP)
+    pour ne pas changer le contenu des réponses existantes.
+    """
+
+    # Le tri des clés coûte cher sur les grandes listes et n'est pas nécessaire
+    sort_keys = False
+
+    def _options(self):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # Options spécifiques au module json (indent, cls...) : fournisseur par défaut
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # En debug, garder la sortie indentée du fournisseur par défaut
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def create_json_provider(app):
+    """Utiliser orjson s'il est installé, sinon le module json standard."""
+    if orjson is not None and app.config.get('JSON_USE_ORJSON', True):
+        return ORJSONProvider(app)
+    return DefaultJSONProvider(app)
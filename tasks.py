@@ -1,32 +1,324 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, make_response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from marshmallow import Schema, fields, validate, ValidationError
+from marshmallow import fields, validate, validates, ValidationError, EXCLUDE
+from sqlalchemy import insert, update, delete, select, not_, func
+from datetime import datetime, timedelta, timezone
+from functools import wraps
 from models import db, Task, User
+from profiling import InstrumentedSchema
+from cache import cache
+from search import query_terms, match_tasks
+from filters import TaskQuerySchema
+from database import copy_rows, supports_copy
+from events import (event_broker, record_events, last_event_id, events_lost, fetch_events,
+                    format_event, EVENTS_PAGE_SIZE, TooManyStreams)
+import base64
+import csv
+import hashlib
+import io
+import json
 import logging
+import math
+import queue
+import time
 
 logger = logging.getLogger(__name__)
 
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 
 # Schéma de validation pour les tâches
-class TaskSchema(Schema):
+class TaskSchema(InstrumentedSchema):
     title = fields.String(required=True, validate=validate.Length(min=1, max=100))
     description = fields.String(required=False)
     completed = fields.Boolean(required=False, default=False)
 
+# Opérations groupées : une tâche existante identifiée par son id
+MAX_BATCH_SIZE = 1000
+
+class TaskBatchItemSchema(TaskSchema):
+    id = fields.Integer(required=True)
+
+def repeated_ids(ids):
+    """Identifiants présents plusieurs fois (une seule écriture serait appliquée)."""
+    seen = set()
+    return sorted({task_id for task_id in ids if task_id in seen or seen.add(task_id)})
+
+class TaskIdsSchema(InstrumentedSchema):
+    ids = fields.List(fields.Integer(), required=True,
+                      validate=validate.Length(min=1, max=MAX_BATCH_SIZE))
+
+    @validates('ids')
+    def validate_unique(self, value, **kwargs):
+        repeated = repeated_ids(value)
+        if repeated:
+            raise ValidationError(f"Identifiants répétés : {', '.join(map(str, repeated))}")
+
 # Pagination schema
-class PaginationSchema(Schema):
+class PaginationSchema(InstrumentedSchema):
+    class Meta:
+        # Les filtres (ex: completed) partagent la query string
+        unknown = EXCLUDE
+
     page = fields.Integer(missing=1, validate=validate.Range(min=1))
     per_page = fields.Integer(missing=10, validate=validate.Range(min=1, max=100))
 
+# Pagination par curseur (keyset) : le curseur encode les valeurs du tri (created_at, id par défaut)
+class CursorPaginationSchema(InstrumentedSchema):
+    class Meta:
+        unknown = EXCLUDE
+
+    cursor = fields.String(required=True)
+    per_page = fields.Integer(missing=10, validate=validate.Range(min=1, max=100))
+    include_total = fields.Boolean(missing=False)
+
+# Export complet : format de sortie et taille des lots lus depuis la base
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'tasks.ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'tasks.csv'),
+}
+EXPORT_BATCH_SIZE = 1000
+
+class ExportSchema(InstrumentedSchema):
+    class Meta:
+        unknown = EXCLUDE
+
+    format = fields.String(missing='ndjson', validate=validate.OneOf(list(EXPORT_FORMATS)))
+    completed = fields.Boolean(required=False)
+
+# Import : lignes validées et insérées par lots, chaque lot dans sa transaction
+IMPORT_FORMATS = {'application/x-ndjson': 'ndjson', 'text/csv': 'csv'}
+IMPORT_CHUNK_SIZE = 1000
+# Erreurs détaillées dans le résumé (les suivantes sont seulement comptées)
+MAX_IMPORT_ERRORS = 100
+
+# Recherche plein texte : résultats par pertinence, curseur (score, id)
+class SearchSchema(InstrumentedSchema):
+    class Meta:
+        unknown = EXCLUDE
+
+    q = fields.String(required=True, validate=validate.Length(min=1, max=200))
+    cursor = fields.String(required=False)
+    per_page = fields.Integer(missing=10, validate=validate.Range(min=1, max=100))
+
+def encode_position(values):
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_position(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        return json.loads(raw)
+    except ValueError:
+        raise ValidationError("Curseur invalide", field_name='cursor')
+
+def decode_search_cursor(cursor):
+    """Décoder un curseur de recherche en tuple (score, id)."""
+    try:
+        score, task_id = decode_position(cursor)
+        return float(score), int(task_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Curseur invalide", field_name='cursor')
+
+def get_tasks_by_cursor(query, conditions, args):
+    """Paginer par recherche directe dans l'index plutôt que par OFFSET.
+
+    Le curseur encode les valeurs du tri (created_at, id par défaut) de la
+    dernière tâche de la page.
+    """
+    params = CursorPaginationSchema().load(args)
+    per_page = params['per_page']
+
+    page_conditions = list(conditions)
+    if params['cursor']:
+        page_conditions.append(query.after(decode_position(params['cursor'])))
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = db.session.execute(query.statement(page_conditions).limit(per_page + 1)).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    pagination = {
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": encode_position(query.position(rows[-1])) if has_next else None,
+    }
+    # Le COUNT(*) est coûteux sur les gros volumes : uniquement sur demande
+    if params['include_total']:
+        pagination["total"] = count_tasks(conditions)
+
+    return {
+        "tasks": [query.serialize(row) for row in rows],
+        "pagination": pagination
+    }
+
+def list_statement(conditions):
+    """Tâches projetées, des plus récentes aux plus anciennes (ordre de l'index)."""
+    return (select(*Task.projection())
+            .where(*conditions)
+            .order_by(Task.created_at.desc(), Task.id.desc()))
+
+def count_statement(conditions):
+    return select(func.count()).select_from(Task).where(*conditions)
+
+def count_tasks(conditions):
+    return db.session.scalar(count_statement(conditions))
+
+# Marqueur de modification par utilisateur, incrémenté dans chaque transaction d'écriture
+def touch_statement(user_id, total=0, completed=0):
+    """Incrémenter la version de la liste et appliquer les variations des compteurs.
+
+    Les compteurs sont mis à jour par incrément (x = x + delta) dans le même
+    UPDATE : pas de requête supplémentaire, et les transactions concurrentes
+    s'additionnent sans se perdre.
+    """
+    values = {"tasks_version": User.tasks_version + 1, "tasks_updated_at": datetime.utcnow()}
+    if total:
+        values["tasks_total"] = User.tasks_total + total
+    if completed:
+        values["tasks_completed"] = User.tasks_completed + completed
+    return (update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .execution_options(synchronize_session=False))
+
+def touch_user_tasks(user_id, total=0, completed=0):
+    db.session.execute(touch_statement(user_id, total, completed))
+
+def completed_statement(task_id, user_id):
+    """État de complétion d'une tâche, verrouillée jusqu'à la fin de la transaction."""
+    return (select(Task.completed)
+            .where(Task.id == task_id, Task.user_id == user_id)
+            .with_for_update())
+
+def reconcile_statement(user_id=None):
+    """Recalculer les compteurs qui ont divergé des tâches (une requête)."""
+    total = (select(func.count()).select_from(Task)
+             .where(Task.user_id == User.id)
+             .scalar_subquery())
+    completed = (select(func.count()).select_from(Task)
+                 .where(Task.user_id == User.id, Task.completed.is_(True))
+                 .scalar_subquery())
+    stmt = (update(User)
+            .where((User.tasks_total != total) | (User.tasks_completed != completed))
+            .values(tasks_total=total, tasks_completed=completed,
+                    # Invalider l'ETag de /stats
+                    tasks_version=User.tasks_version + 1)
+            .execution_options(synchronize_session=False))
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    return stmt
+
+def reconcile_task_counters(user_id=None):
+    """Corriger les compteurs de tâches, renvoie le nombre d'utilisateurs corrigés."""
+    count = db.session.execute(reconcile_statement(user_id)).rowcount
+    db.session.commit()
+    return count
+
+def tasks_marker(user_id):
+    """Version et date de modification de la liste des tâches (lecture par clé primaire).
+
+    Lu une fois par requête : @conditional et le cache des réponses
+    partagent la même version.
+    """
+    # Mémorisé dans la requête (g peut survivre à plusieurs requêtes de test)
+    markers = request.environ.setdefault('tasks.markers', {})
+    if user_id not in markers:
+        markers[user_id] = db.session.execute(
+            select(User.tasks_version, User.tasks_updated_at).where(User.id == user_id)
+        ).first()
+    return markers[user_id]
+
+@cache.version_loader
+def tasks_version(user_id):
+    """Version des réponses en cache : celle de la base, commune à tous les workers."""
+    marker = tasks_marker(user_id)
+    return marker.tasks_version if marker else None
+
+def task_marker(user_id, task_id):
+    """Version et date de modification d'une tâche, sans charger l'objet."""
+    row = db.session.execute(
+        select(Task.updated_at, Task.created_at)
+        .where(Task.id == task_id, Task.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    last_modified = row.updated_at or row.created_at
+    return last_modified.isoformat(), last_modified
+
+def conditional(marker):
+    """Répondre 304 si la ressource n'a pas changé, sans exécuter la vue.
+
+    L'ETag est dérivé du marqueur de modification, de l'endpoint et de ses
+    paramètres : une requête de validation ne charge ni ne sérialise de tâche.
+    Il est toujours faible (W/), que la réponse soit compressée ou non.
+
+    Les dates HTTP sont à la seconde : Last-Modified annonce la fin de la
+    seconde de la modification, et seulement une fois cette seconde écoulée.
+    If-Modified-Since n'obtient un 304 que si la modification (à la
+    microseconde) lui est antérieure : une seconde écriture dans la même
+    seconde n'est jamais masquée.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            state = marker(get_jwt_identity(), **kwargs)
+            if state is None:
+                return view(*args, **kwargs)
+            
+            version, modified_at = state
+            now = datetime.utcnow()
+            modified_at = modified_at or now
+            last_modified = modified_at.replace(microsecond=0) + timedelta(seconds=1)
+            params = sorted(request.args.items(multi=True))
+            etag = hashlib.sha1(
+                f'{request.endpoint}:{kwargs}:{params}:{version}'.encode()
+            ).hexdigest()
+            
+            if request.if_none_match:
+                # Comparaison faible : l'ETag devient faible quand la réponse est compressée
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                since = since.astimezone(timezone.utc).replace(tzinfo=None) if since else None
+                # Une date future (horloge du client) est ignorée
+                not_modified = since is not None and since <= now and modified_at < since
+            
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            # Même validateur faible dans les réponses 200 (compressées ou non) et 304
+            response.set_etag(etag, weak=True)
+            if last_modified <= now:
+                response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+            # Le client doit revalider à chaque fois (réponse propre à l'utilisateur)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
 # Obtenir toutes les tâches (avec pagination)
 @tasks_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional(tasks_marker)
+@cache.cached
 def get_tasks():
     try:
         # Obtenir l'identité de l'utilisateur actuel
         user_id = get_jwt_identity()
         
+        # Filtres, tri et colonnes validés puis compilés en une requête
+        query = TaskQuerySchema().load(request.args)
+        conditions = query.conditions(user_id, db.session.get_bind().dialect.name)
+        
+        # Mode curseur (opt-in) : présence du paramètre cursor, vide pour la première page
+        if 'cursor' in request.args:
+            return jsonify(get_tasks_by_cursor(query, conditions, request.args)), 200
+        
         # Valider les paramètres de pagination
         pagination_schema = PaginationSchema()
         params = pagination_schema.load(request.args)
@@ -34,41 +326,358 @@ def get_tasks():
         page = params.get('page', 1)
         per_page = params.get('per_page', 10)
         
-        # Filtrer par état de complétion si spécifié
-        completed = request.args.get('completed')
-        query = Task.query.filter_by(user_id=user_id)
-        
-        if completed is not None:
-            completed = completed.lower() == 'true'
-            query = query.filter_by(completed=completed)
-        
-        # Appliquer la pagination
-        paginated_tasks = query.order_by(Task.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Appliquer la pagination : projection des colonnes, sans objets ORM
+        total = count_tasks(conditions)
+        rows = db.session.execute(
+            query.statement(conditions).limit(per_page).offset((page - 1) * per_page)
+        ).all()
+        pages = math.ceil(total / per_page)
         
         # Préparer la réponse
         response = {
-            "tasks": [task.to_dict() for task in paginated_tasks.items],
+            "tasks": [query.serialize(row) for row in rows],
             "pagination": {
-                "total": paginated_tasks.total,
-                "pages": paginated_tasks.pages,
+                "total": total,
+                "pages": pages,
                 "page": page,
                 "per_page": per_page,
-                "has_next": paginated_tasks.has_next,
-                "has_prev": paginated_tasks.has_prev,
+                "has_next": page < pages,
+                "has_prev": page > 1,
             }
         }
         
         return jsonify(response), 200
         
     except ValidationError as e:
-        logger.warning(f"Validation error: {e.messages}")
+        logger.warning("Validation error: %s", e.messages)
         return jsonify({"error": e.messages}), 400
     except Exception as e:
-        logger.error(f"Error getting tasks: {str(e)}")
+        logger.error("Error getting tasks: %s", e)
         return jsonify({"error": "Une erreur est survenue"}), 500
 
+# Rechercher dans le titre et la description (index plein texte)
+@tasks_bp.route('/search', methods=['GET'])
+@jwt_required()
+@conditional(tasks_marker)
+# Pas de cache des réponses : sur SQLite, le score bm25 dépend de tout l'index
+# (toutes les écritures de tous les utilisateurs), pas seulement de tasks_version
+def search_tasks():
+    try:
+        # Obtenir l'identité de l'utilisateur actuel
+        user_id = get_jwt_identity()
+        params = SearchSchema().load(request.args)
+        
+        terms = query_terms(params['q'])
+        if not terms:
+            raise ValidationError("Aucun mot à rechercher", field_name='q')
+        after = decode_search_cursor(params['cursor']) if params.get('cursor') else None
+        per_page = params['per_page']
+        
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        rows = match_tasks(user_id, terms, per_page, after)
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        
+        return jsonify({
+            "tasks": [Task.row_to_dict(row) for row in rows],
+            "pagination": {
+                "per_page": per_page,
+                "has_next": has_next,
+                "next_cursor": encode_position([rows[-1].score, rows[-1].id]) if has_next else None,
+            }
+        }), 200
+        
+    except ValidationError as e:
+        logger.warning("Validation error: %s", e.messages)
+        return jsonify({"error": e.messages}), 400
+    except Exception as e:
+        logger.error("Error searching tasks: %s", e)
+        return jsonify({"error": "Une erreur est survenue"}), 500
+
+# Statistiques des tâches : compteurs maintenus à l'écriture, lecture par clé primaire
+@tasks_bp.route('/stats', methods=['GET'])
+@jwt_required()
+@conditional(tasks_marker)
+def get_task_stats():
+    try:
+        # Obtenir l'identité de l'utilisateur actuel
+        user_id = get_jwt_identity()
+        
+        row = db.session.execute(
+            select(User.tasks_total, User.tasks_completed).where(User.id == user_id)
+        ).first()
+        
+        if row is None:
+            return jsonify({"error": "Utilisateur non trouvé"}), 404
+        
+        return jsonify({
+            "stats": {
+                "total": row.tasks_total,
+                "completed": row.tasks_completed,
+                "pending": row.tasks_total - row.tasks_completed
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error("Error getting task stats: %s", e)
+        return jsonify({"error": "Une erreur est survenue"}), 500
+
+def export_rows(conditions):
+    """Parcourir les tâches par lots de EXPORT_BATCH_SIZE lignes, en une seule requête.
+
+    yield_per active un curseur côté serveur (PostgreSQL) : seul le lot
+    courant est en mémoire, quel que soit le nombre de tâches.
+    """
+    result = db.session.execute(
+        list_statement(conditions).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    yield from result.partitions()
+
+def export_ndjson(conditions):
+    dumps = current_app.json.dumps
+    for rows in export_rows(conditions):
+        yield ''.join(dumps(Task.row_to_dict(row)) + '\n' for row in rows)
+
+def export_csv(conditions):
+    columns = [column.key for column in Task.projection()]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for rows in export_rows(conditions):
+        writer.writerows(Task.row_to_dict(row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Aucune tâche : l'en-tête seul
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# Exporter toutes les tâches (NDJSON ou CSV) en flux continu
+@tasks_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    try:
+        # Obtenir l'identité de l'utilisateur actuel
+        user_id = get_jwt_identity()
+        params = ExportSchema().load(request.args)
+        
+        conditions = [Task.user_id == user_id]
+        if 'completed' in params:
+            conditions.append(Task.completed == params['completed'])
+        
+        generate = export_csv if params['format'] == 'csv' else export_ndjson
+        mimetype, filename = EXPORT_FORMATS[params['format']]
+        
+        logger.info("Export %s des tâches de l'utilisateur %s", params['format'], user_id)
+        
+        # Le générateur s'exécute après le retour de la vue : garder le contexte
+        # (session SQLAlchemy) jusqu'à la fin du flux
+        response = Response(stream_with_context(generate(conditions)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+        
+    except ValidationError as e:
+        logger.warning("Validation error: %s", e.messages)
+        return jsonify({"error": e.messages}), 400
+    except Exception as e:
+        logger.error("Error exporting tasks: %s", e)
+        return jsonify({"error": "Une erreur est survenue"}), 500
+
+def read_import_lines(stream, import_format):
+    """Lire le corps de la requête ligne par ligne : (numéro de ligne, données ou erreur)."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if import_format == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Colonnes vides : valeur par défaut du schéma
+            yield reader.line_num, {key: value for key, value in row.items()
+                                    if key and value not in (None, '')}
+        return
+    
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, ValidationError("JSON invalide")
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def insert_tasks(rows):
+    """Insérer un lot de tâches : COPY sur PostgreSQL (psycopg2), executemany sinon."""
+    connection = db.session.connection()
+    if supports_copy(connection):
+        columns = ('title', 'description', 'completed', 'user_id', 'created_at', 'updated_at')
+        now = datetime.utcnow()
+        # Description absente : chaîne vide, comme l'insertion des autres bases
+        copy_rows(connection, 'tasks', columns,
+                  [(row['title'], row['description'], row['completed'], row['user_id'], now, now)
+                   for row in rows],
+                  force_not_null=('description',))
+        return
+    db.session.execute(insert(Task), rows)
+
+# Importer des tâches depuis un corps NDJSON ou CSV envoyé en flux
+@tasks_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_tasks():
+    # Obtenir l'identité de l'utilisateur actuel
+    user_id = get_jwt_identity()
+    import_format = IMPORT_FORMATS.get(request.mimetype)
+    if import_format is None:
+        return jsonify({
+            "error": f"Content-Type attendu : {' ou '.join(IMPORT_FORMATS)}"
+        }), 415
+    
+    # Les colonnes d'un export (id, created_at...) sont ignorées
+    schema = TaskSchema(unknown=EXCLUDE)
+    summary = {"accepted": 0, "rejected": 0, "errors": []}
+    
+    def reject(line_number, messages):
+        summary["rejected"] += 1
+        if len(summary["errors"]) < MAX_IMPORT_ERRORS:
+            summary["errors"].append({"line": line_number, "error": messages})
+    
+    try:
+        lines = read_import_lines(request.stream, import_format)
+        for chunk in chunked(lines, IMPORT_CHUNK_SIZE):
+            rows = []
+            for line_number, data in chunk:
+                try:
+                    if isinstance(data, ValidationError):
+                        raise data
+                    if not isinstance(data, dict):
+                        raise ValidationError("Un objet JSON est attendu")
+                    item = schema.load(data)
+                except ValidationError as e:
+                    reject(line_number, e.messages)
+                    continue
+                rows.append({
+                    "title": item['title'],
+                    "description": item.get('description', ''),
+                    "completed": item.get('completed', False),
+                    "user_id": user_id
+                })
+            
+            if rows:
+                insert_tasks(rows)
+                # Un événement par lot : les clients rechargent la liste
+                touch_user_tasks(user_id, len(rows), sum(row['completed'] for row in rows))
+                events = record_events(user_id, 'imported', [{"count": len(rows)}])
+                db.session.commit()
+                event_broker.publish(user_id, events)
+                summary["accepted"] += len(rows)
+        
+        logger.info("Import de l'utilisateur %s: %s tâches acceptées, %s rejetées",
+                    user_id, summary["accepted"], summary["rejected"])
+        
+        return jsonify(summary), 200
+        
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({**summary, "error": "Le corps doit être encodé en UTF-8"}), 400
+    except Exception as e:
+        logger.error("Error importing tasks: %s", e)
+        db.session.rollback()
+        # Les lots déjà validés restent importés : "accepted" les compte
+        return jsonify({
+            **summary, "error": "Une erreur est survenue lors de l'import des tâches"
+        }), 500
+
+# Flux SSE des modifications de tâches (remplace l'interrogation périodique)
+@tasks_bp.route('/stream', methods=['GET'])
+@jwt_required()
+def stream_tasks():
+    """Événements created/updated/toggled/deleted/imported de l'utilisateur.
+
+    Reprise après déconnexion via l'en-tête Last-Event-ID (ou le paramètre
+    last_event_id) ; "reset" signale que des événements ont été purgés et que
+    la liste doit être rechargée. Le flux est fermé après SSE_MAX_DURATION
+    secondes : le client se reconnecte avec le dernier id reçu.
+    """
+    user_id = get_jwt_identity()
+    config = current_app.config
+    last_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_id = int(last_id) if last_id is not None else None
+    except ValueError:
+        return jsonify({"error": {"Last-Event-ID": ["Identifiant d'événement invalide"]}}), 400
+    
+    # S'abonner avant de relire le journal : aucun événement n'est manqué entre les deux
+    try:
+        subscription = event_broker.subscribe(user_id)
+    except TooManyStreams:
+        logger.warning("Flux SSE refusé : %s flux ouverts dans ce worker", event_broker.max_streams)
+        response = jsonify({
+            "error": "Service temporairement surchargé",
+            "message": "Trop de flux ouverts, reconnectez-vous dans quelques instants."
+        })
+        response.headers['Retry-After'] = str(max(1, config['SSE_RETRY_MS'] // 1000))
+        return response, 503
+    try:
+        lost = last_id is not None and events_lost(last_id)
+        if last_id is None:
+            last_id = last_event_id(user_id)
+        db.session.close()
+    except Exception as e:
+        event_broker.unsubscribe(subscription)
+        logger.error("Error opening task stream: %s", e)
+        return jsonify({"error": "Une erreur est survenue"}), 500
+    
+    logger.info("Flux d'événements ouvert pour l'utilisateur %s", user_id)
+    
+    def generate():
+        nonlocal last_id
+        deadline = time.monotonic() + config['SSE_MAX_DURATION']
+        resync = True
+        try:
+            yield f"retry: {config['SSE_RETRY_MS']}\n\n"
+            if lost:
+                yield format_event({"id": last_id, "type": "reset", "data": "{}"})
+            
+            while time.monotonic() < deadline:
+                if resync or subscription.overflowed:
+                    # Relire le journal : reprise, débordement de la file, autres workers
+                    subscription.reset()
+                    while True:
+                        events = fetch_events(user_id, last_id)
+                        for event in events:
+                            yield format_event(event)
+                            last_id = event['id']
+                        if len(events) < EVENTS_PAGE_SIZE:
+                            break
+                    # Rendre la connexion au pool entre deux lectures
+                    db.session.close()
+                    resync = False
+                
+                timeout = min(config['SSE_HEARTBEAT_INTERVAL'], deadline - time.monotonic())
+                try:
+                    event = subscription.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    resync = True
+                    continue
+                if event['id'] > last_id:
+                    yield format_event(event)
+                    last_id = event['id']
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un proxy nginx
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # Créer une nouvelle tâche
 @tasks_bp.route('', methods=['POST'])
 @jwt_required()
@@ -91,26 +700,32 @@ def create_task():
         
         # Ajouter à la base de données
         db.session.add(new_task)
+        db.session.flush()
+        task_dict = new_task.to_dict()
+        touch_user_tasks(user_id, 1, int(task_dict['completed']))
+        events = record_events(user_id, 'created', [task_dict])
         db.session.commit()
+        event_broker.publish(user_id, events)
         
-        logger.info(f"Nouvelle tâche créée par l'utilisateur {user_id}: {new_task.title}")
+        logger.info("Nouvelle tâche créée par l'utilisateur %s: %s", user_id, task_dict['title'])
         
         return jsonify({
             "message": "Tâche créée avec succès",
-            "task": new_task.to_dict()
+            "task": task_dict
         }), 201
         
     except ValidationError as e:
-        logger.warning(f"Validation error: {e.messages}")
+        logger.warning("Validation error: %s", e.messages)
         return jsonify({"error": e.messages}), 400
     except Exception as e:
-        logger.error(f"Error creating task: {str(e)}")
+        logger.error("Error creating task: %s", e)
         db.session.rollback()
         return jsonify({"error": "Une erreur est survenue lors de la création de la tâche"}), 500
 
 # Obtenir une tâche spécifique
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @jwt_required()
+@conditional(task_marker)
 def get_task(task_id):
     try:
         # Obtenir l'identité de l'utilisateur actuel
@@ -125,9 +740,36 @@ def get_task(task_id):
         return jsonify({"task": task.to_dict()}), 200
         
     except Exception as e:
-        logger.error(f"Error getting task {task_id}: {str(e)}")
+        logger.error("Error getting task %s: %s", task_id, e)
         return jsonify({"error": "Une erreur est survenue"}), 500
 
+# Écritures en une seule requête : UPDATE/DELETE ... WHERE id AND user_id RETURNING
+def update_user_task(task_id, user_id, **values):
+    """Mettre à jour une tâche de l'utilisateur et la renvoyer (None si absente)."""
+    stmt = (update(Task)
+            .where(Task.id == task_id, Task.user_id == user_id)
+            .values(**values)
+            .execution_options(synchronize_session=False))
+    if db.session.get_bind().dialect.update_returning:
+        return db.session.scalars(stmt.returning(Task)).first()
+    
+    # SQLite < 3.35 ne supporte pas RETURNING : relire la tâche modifiée
+    if db.session.execute(stmt).rowcount == 0:
+        return None
+    return db.session.get(Task, task_id, populate_existing=True)
+
+def delete_user_task(task_id, user_id):
+    """Supprimer une tâche de l'utilisateur, renvoie son état de complétion (None si absente)."""
+    stmt = (delete(Task)
+            .where(Task.id == task_id, Task.user_id == user_id)
+            .execution_options(synchronize_session=False))
+    if db.session.get_bind().dialect.delete_returning:
+        return db.session.scalar(stmt.returning(Task.completed))
+    completed = db.session.scalar(completed_statement(task_id, user_id))
+    if completed is not None:
+        db.session.execute(stmt)
+    return completed
+
 # Mettre à jour une tâche
 @tasks_bp.route('/<int:task_id>', methods=['PUT'])
 @jwt_required()
@@ -136,35 +778,40 @@ def update_task(task_id):
         # Obtenir l'identité de l'utilisateur actuel
         user_id = get_jwt_identity()
         
-        # Rechercher la tâche
-        task = Task.query.filter_by(id=task_id, user_id=user_id).first()
-        
-        if not task:
-            return jsonify({"error": "Tâche non trouvée"}), 404
-        
         # Valider les données d'entrée
         schema = TaskSchema()
         data = schema.load(request.json)
         
-        # Mettre à jour la tâche
-        task.title = data['title']
-        task.description = data.get('description', task.description)
-        task.completed = data.get('completed', task.completed)
+        # Mettre à jour la tâche (les champs absents sont conservés)
+        values = {key: data[key] for key in ('title', 'description', 'completed') if key in data}
+        # État précédent (verrouillé) : variation du compteur de tâches terminées
+        previous = (db.session.scalar(completed_statement(task_id, user_id))
+                    if 'completed' in values else None)
+        task = update_user_task(task_id, user_id, **values)
         
+        if not task:
+            return jsonify({"error": "Tâche non trouvée"}), 404
+        
+        # Sérialiser avant le commit, qui expire les attributs de la tâche
+        task_dict = task.to_dict()
+        completed = int(task_dict['completed']) - int(previous) if previous is not None else 0
+        touch_user_tasks(user_id, completed=completed)
+        events = record_events(user_id, 'updated', [task_dict])
         db.session.commit()
+        event_broker.publish(user_id, events)
         
-        logger.info(f"Tâche {task_id} mise à jour par l'utilisateur {user_id}")
+        logger.info("Tâche %s mise à jour par l'utilisateur %s", task_id, user_id)
         
         return jsonify({
             "message": "Tâche mise à jour avec succès",
-            "task": task.to_dict()
+            "task": task_dict
         }), 200
         
     except ValidationError as e:
-        logger.warning(f"Validation error: {e.messages}")
+        logger.warning("Validation error: %s", e.messages)
         return jsonify({"error": e.messages}), 400
     except Exception as e:
-        logger.error(f"Error updating task {task_id}: {str(e)}")
+        logger.error("Error updating task %s: %s", task_id, e)
         db.session.rollback()
         return jsonify({"error": "Une erreur est survenue lors de la mise à jour de la tâche"}), 500
 
@@ -176,24 +823,24 @@ def delete_task(task_id):
         # Obtenir l'identité de l'utilisateur actuel
         user_id = get_jwt_identity()
         
-        # Rechercher la tâche
-        task = Task.query.filter_by(id=task_id, user_id=user_id).first()
-        
-        if not task:
+        # Supprimer la tâche
+        completed = delete_user_task(task_id, user_id)
+        if completed is None:
             return jsonify({"error": "Tâche non trouvée"}), 404
         
-        # Supprimer la tâche
-        db.session.delete(task)
+        touch_user_tasks(user_id, -1, -int(completed))
+        events = record_events(user_id, 'deleted', [{"id": task_id}])
         db.session.commit()
+        event_broker.publish(user_id, events)
         
-        logger.info(f"Tâche {task_id} supprimée par l'utilisateur {user_id}")
+        logger.info("Tâche %s supprimée par l'utilisateur %s", task_id, user_id)
         
         return jsonify({
             "message": "Tâche supprimée avec succès"
         }), 200
         
     except Exception as e:
-        logger.error(f"Error deleting task {task_id}: {str(e)}")
+        logger.error("Error deleting task %s: %s", task_id, e)
         db.session.rollback()
         return jsonify({"error": "Une erreur est survenue lors de la suppression de la tâche"}), 500
 
@@ -205,25 +852,243 @@ def toggle_task(task_id):
         # Obtenir l'identité de l'utilisateur actuel
         user_id = get_jwt_identity()
         
-        # Rechercher la tâche
-        task = Task.query.filter_by(id=task_id, user_id=user_id).first()
+        # Inverser l'état de complétion
+        task = update_user_task(task_id, user_id, completed=not_(Task.completed))
         
         if not task:
             return jsonify({"error": "Tâche non trouvée"}), 404
         
-        # Inverser l'état de complétion
-        task.completed = not task.completed
+        task_dict = task.to_dict()
+        touch_user_tasks(user_id, completed=1 if task_dict['completed'] else -1)
+        events = record_events(user_id, 'toggled', [task_dict])
         db.session.commit()
+        event_broker.publish(user_id, events)
         
-        status = "terminée" if task.completed else "non terminée"
-        logger.info(f"Tâche {task_id} marquée comme {status} par l'utilisateur {user_id}")
+        status = "terminée" if task_dict['completed'] else "non terminée"
+        logger.info("Tâche %s marquée comme %s par l'utilisateur %s", task_id, status, user_id)
         
         return jsonify({
             "message": f"Tâche marquée comme {status}",
-            "task": task.to_dict()
+            "task": task_dict
         }), 200
         
     except Exception as e:
-        logger.error(f"Error toggling task {task_id}: {str(e)}")
+        logger.error("Error toggling task %s: %s", task_id, e)
+        db.session.rollback()
+        return jsonify({"error": "Une erreur est survenue"}), 500
+
+# Opérations groupées : une seule transaction et des requêtes ensemblistes
+def load_batch(schema):
+    """Valider la liste "tasks" du corps de la requête."""
+    body = request.json
+    if not isinstance(body, dict):
+        raise ValidationError({"tasks": ["Objet JSON attendu : {\"tasks\": [...]}"]})
+    items = body.get('tasks')
+    if not isinstance(items, list) or not 1 <= len(items) <= MAX_BATCH_SIZE:
+        raise ValidationError(
+            {"tasks": [f"Une liste de 1 à {MAX_BATCH_SIZE} tâches est requise"]}
+        )
+    items = schema(many=True).load(items)
+    repeated = repeated_ids([item['id'] for item in items if 'id' in item])
+    if repeated:
+        raise ValidationError(
+            {"tasks": [f"Identifiants répétés : {', '.join(map(str, repeated))}"]}
+        )
+    return items
+
+def find_user_tasks(user_id, ids):
+    """Charger en une requête les tâches de l'utilisateur parmi ids.
+
+    Les tâches sont verrouillées : leur état sert au calcul des compteurs.
+    """
+    tasks = (Task.query.filter(Task.id.in_(set(ids)), Task.user_id == user_id)
+             .with_for_update().all())
+    return {task.id: task for task in tasks}
+
+def not_found_result(task_id):
+    return {"id": task_id, "status": 404, "error": "Tâche non trouvée"}
+
+# Créer plusieurs tâches
+@tasks_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_tasks_batch():
+    try:
+        user_id = get_jwt_identity()
+        items = load_batch(TaskSchema)
+        
+        rows = [{
+            "title": item['title'],
+            "description": item.get('description', ''),
+            "completed": item.get('completed', False),
+            "user_id": user_id
+        } for item in items]
+        
+        if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            # INSERT multi-lignes avec RETURNING, dans l'ordre des paramètres
+            new_tasks = db.session.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True), rows
+            ).all()
+        else:
+            # Sans RETURNING (SQLite < 3.35) : une insertion par tâche au flush
+            new_tasks = [Task(**row) for row in rows]
+            db.session.add_all(new_tasks)
+            db.session.flush()
+        results = [{"id": task.id, "status": 201, "task": task.to_dict()}
+                   for task in new_tasks]
+        touch_user_tasks(user_id, len(new_tasks), sum(task.completed for task in new_tasks))
+        events = record_events(user_id, 'created', [result["task"] for result in results])
+        db.session.commit()
+        event_broker.publish(user_id, events)
+        
+        logger.info("%s tâches créées par l'utilisateur %s", len(results), user_id)
+        
+        return jsonify({"results": results}), 201
+        
+    except ValidationError as e:
+        logger.warning("Validation error: %s", e.messages)
+        return jsonify({"error": e.messages}), 400
+    except Exception as e:
+        logger.error("Error creating tasks batch: %s", e)
+        db.session.rollback()
+        return jsonify({"error": "Une erreur est survenue lors de la création des tâches"}), 500
+
+# Mettre à jour plusieurs tâches
+@tasks_bp.route('/batch', methods=['PUT'])
+@jwt_required()
+def update_tasks_batch():
+    try:
+        user_id = get_jwt_identity()
+        items = load_batch(TaskBatchItemSchema)
+        tasks = find_user_tasks(user_id, [item['id'] for item in items])
+        
+        now = datetime.utcnow()
+        rows = []
+        results = []
+        for item in items:
+            task = tasks.get(item['id'])
+            if not task:
+                results.append(not_found_result(item['id']))
+                continue
+            row = {
+                "id": task.id,
+                "title": item['title'],
+                "description": item.get('description', task.description),
+                "completed": item.get('completed', task.completed),
+                "updated_at": now
+            }
+            rows.append(row)
+            task_dict = {**task.to_dict(), **row, "updated_at": now.isoformat()}
+            results.append({"id": task.id, "status": 200, "task": task_dict})
+        
+        # UPDATE par clé primaire exécuté en executemany
+        if rows:
+            db.session.execute(
+                update(Task).execution_options(synchronize_session=False), rows
+            )
+        touch_user_tasks(user_id, completed=sum(
+            int(row['completed']) - int(tasks[row['id']].completed) for row in rows
+        ))
+        events = record_events(user_id, 'updated',
+                               [result["task"] for result in results if result["status"] == 200])
+        db.session.commit()
+        event_broker.publish(user_id, events)
+        
+        logger.info("%s tâches mises à jour par l'utilisateur %s", len(rows), user_id)
+        
+        return jsonify({"results": results}), 200
+        
+    except ValidationError as e:
+        logger.warning("Validation error: %s", e.messages)
+        return jsonify({"error": e.messages}), 400
+    except Exception as e:
+        logger.error("Error updating tasks batch: %s", e)
+        db.session.rollback()
+        return jsonify({"error": "Une erreur est survenue lors de la mise à jour des tâches"}), 500
+
+# Basculer l'état de plusieurs tâches
+@tasks_bp.route('/batch/toggle', methods=['PATCH'])
+@jwt_required()
+def toggle_tasks_batch():
+    try:
+        user_id = get_jwt_identity()
+        ids = TaskIdsSchema().load(request.json or {})['ids']
+        tasks = find_user_tasks(user_id, ids)
+        now = datetime.utcnow()
+        
+        if tasks:
+            db.session.execute(
+                update(Task)
+                .where(Task.id.in_(list(tasks)), Task.user_id == user_id)
+                .values(completed=not_(Task.completed), updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        
+        results = []
+        for task_id in ids:
+            task = tasks.get(task_id)
+            if not task:
+                results.append(not_found_result(task_id))
+                continue
+            task_dict = task.to_dict()
+            task_dict['completed'] = not task.completed
+            task_dict['updated_at'] = now.isoformat()
+            results.append({"id": task_id, "status": 200, "task": task_dict})
+        touch_user_tasks(user_id, completed=sum(
+            -1 if task.completed else 1 for task in tasks.values()
+        ))
+        events = record_events(user_id, 'toggled',
+                               [result["task"] for result in results if result["status"] == 200])
+        db.session.commit()
+        event_broker.publish(user_id, events)
+        
+        logger.info("%s tâches basculées par l'utilisateur %s", len(tasks), user_id)
+        
+        return jsonify({"results": results}), 200
+        
+    except ValidationError as e:
+        logger.warning("Validation error: %s", e.messages)
+        return jsonify({"error": e.messages}), 400
+    except Exception as e:
+        logger.error("Error toggling tasks batch: %s", e)
         db.session.rollback()
         return jsonify({"error": "Une erreur est survenue"}), 500
+
+# Supprimer plusieurs tâches
+@tasks_bp.route('/batch', methods=['DELETE'])
+@jwt_required()
+def delete_tasks_batch():
+    try:
+        user_id = get_jwt_identity()
+        ids = TaskIdsSchema().load(request.json or {})['ids']
+        # id -> état de complétion des tâches supprimées (compteurs)
+        found = dict(db.session.execute(
+            select(Task.id, Task.completed)
+            .where(Task.id.in_(set(ids)), Task.user_id == user_id)
+            .with_for_update()
+        ).all())
+        
+        if found:
+            db.session.execute(
+                delete(Task)
+                .where(Task.id.in_(list(found)), Task.user_id == user_id)
+                .execution_options(synchronize_session=False)
+            )
+        touch_user_tasks(user_id, -len(found), -sum(found.values()))
+        events = record_events(user_id, 'deleted', [{"id": task_id} for task_id in sorted(found)])
+        db.session.commit()
+        event_broker.publish(user_id, events)
+        
+        results = [{"id": task_id, "status": 200} if task_id in found
+                   else not_found_result(task_id) for task_id in ids]
+        
+        logger.info("%s tâches supprimées par l'utilisateur %s", len(found), user_id)
+        
+        return jsonify({"results": results}), 200
+        
+    except ValidationError as e:
+        logger.warning("Validation error: %s", e.messages)
+        return jsonify({"error": e.messages}), 400
+    except Exception as e:
+        logger.error("Error deleting tasks batch: %s", e)
+        db.session.rollback()
+        return jsonify({"error": "Une erreur est survenue lors de la suppression des tâches"}), 500
@@ -0,0 +1,38 @@
+import os
+
+# La configuration de test doit être choisie avant l'import de l'application
+os.environ.setdefault('FLASK_ENV', 'testing')
+
+import pytest
+from app import app as flask_app, jwt
+from models import db
+from cache import cache
+from compression import compressor
+from jwt_cache import revocation_list
+
+
+@pytest.fixture
+def app():
+    """Application avec une base de données vierge pour chaque test."""
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    cache.clear()
+    jwt.clear_cache()
+    compressor.clear_cache()
+    revocation_list.init_app(flask_app)
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """En-têtes d'authentification pour un utilisateur de test."""
+    response = client.post('/auth/register', json={
+        'username': 'testuser',
+        'email': 'testuser@example.com',
+        'password': 'Password123!'
+    })
+    token = response.get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
@@ -1,4 +1,5 @@
 import json
+import os
 import pytest
 from app import app
 
@@ -33,3 +34,94 @@ def test_invalid_endpoint(client):
     """Test qu'une route invalide renvoie un statut 404."""
     response = client.get('/route_inexistante')
     assert response.status_code == 404
+
+def test_json_provider_matches_default(client):
+    """Test que le fournisseur orjson produit le même JSON que le module standard."""
+    from datetime import datetime
+    from flask.json.provider import DefaultJSONProvider
+
+    payload = {'texte': 'tâche', 'nombre': 1, 'date': datetime(2024, 1, 2, 3, 4, 5), 'liste': [None, True]}
+    default = DefaultJSONProvider(app)
+
+    assert json.loads(app.json.dumps(payload)) == json.loads(default.dumps(payload))
+    assert app.json.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+
+def test_log_sampling_and_json_records():
+    """Test l'échantillonnage par endpoint et le format JSON des logs."""
+    import logging
+    from logging_config import JSONFormatter, RequestContextFilter, SamplingFilter, parse_sampling
+
+    sampling = SamplingFilter(parse_sampling('ping=3'))
+    context = RequestContextFilter()
+    with app.test_request_context('/ping'):
+        records = [logging.makeLogRecord({'msg': 'pong %s', 'args': (i,), 'levelno': logging.INFO})
+                   for i in range(6)]
+        kept = [r for r in records if context.filter(r) and sampling.filter(r)]
+        warning = logging.makeLogRecord({'msg': 'alerte', 'levelno': logging.WARNING})
+        assert sampling.filter(warning)
+
+    assert len(kept) == 2
+    entry = json.loads(JSONFormatter().format(kept[1]))
+    assert entry['message'] == 'pong 3'
+    assert entry['endpoint'] == 'ping'
+    assert entry['path'] == '/ping'
+
+def test_swagger_json_is_cached_and_revalidated(client):
+    """Test que swagger.json est servi depuis la mémoire avec un ETag par encodage."""
+    import brotli
+
+    with open(os.path.join(app.root_path, 'swagger.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+
+    response = client.get('/api/swagger.json')
+    assert response.status_code == 200
+    assert json.loads(response.data) == expected
+    assert 'public' in response.headers['Cache-Control']
+
+    compressed = client.get('/api/swagger.json', headers={'Accept-Encoding': 'br'})
+    assert compressed.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(compressed.data) == response.data
+    assert compressed.headers['ETag'] != response.headers['ETag']
+
+    revalidated = client.get('/api/swagger.json', headers={
+        'Accept-Encoding': 'br', 'If-None-Match': compressed.headers['ETag']
+    })
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+
+def test_file_payload_reloads_on_change(tmp_path):
+    """Test que le corps est reconstruit uniquement quand le fichier change."""
+    from compression import FilePayload
+
+    path = tmp_path / 'payload.json'
+    path.write_text('{"version": 1}')
+    loads = []
+    payload = FilePayload(str(path), lambda p: loads.append(p) or open(p, 'rb').read())
+
+    first = payload.get()
+    assert payload.get() is first
+    path.write_text('{"version": 2}')
+    os.utime(path, ns=(0, 10 ** 9))
+    assert payload.get().body == b'{"version": 2}'
+    assert len(loads) == 2
+
+def test_home_is_static_payload(client):
+    """Test que la page d'accueil est revalidée par son ETag."""
+    response = client.get('/')
+    revalidated = client.get('/', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_dropped_log_records_are_exported(client):
+    """Test que les enregistrements perdus sur file pleine sont comptés dans /metrics."""
+    import logging
+    import queue
+    from logging_config import LazyQueueHandler
+
+    handler = LazyQueueHandler(queue.Queue(1))
+    before = LazyQueueHandler.dropped
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({'msg': 'x'}))
+    assert LazyQueueHandler.dropped == before + 2
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert f'log_records_dropped {float(before + 2)}' in body
@@ -0,0 +1,151 @@
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('httpx')
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from asgi import create_app  # noqa: E402
+
+
+@pytest.fixture
+def async_client():
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.fixture
+def async_auth_headers(async_client):
+    response = async_client.post('/auth/register', json={
+        'username': 'asyncuser',
+        'email': 'async@example.com',
+        'password': 'password123'
+    })
+    assert response.status_code == 201
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+
+def test_async_task_lifecycle(async_client, async_auth_headers):
+    """Test le cycle de vie d'une tâche sur le déploiement asynchrone."""
+    response = async_client.post('/api/tasks', json={'title': 'Async'}, headers=async_auth_headers)
+    assert response.status_code == 201
+    task = response.json()['task']
+
+    response = async_client.put(f"/api/tasks/{task['id']}", json={'title': 'Modifiée'},
+                                headers=async_auth_headers)
+    assert response.json()['task']['title'] == 'Modifiée'
+
+    response = async_client.patch(f"/api/tasks/{task['id']}/toggle", headers=async_auth_headers)
+    assert response.json()['task']['completed'] is True
+
+    response = async_client.get('/api/tasks?completed=true', headers=async_auth_headers)
+    assert [t['id'] for t in response.json()['tasks']] == [task['id']]
+    assert response.json()['pagination']['total'] == 1
+
+    response = async_client.delete(f"/api/tasks/{task['id']}", headers=async_auth_headers)
+    assert response.status_code == 200
+    response = async_client.get(f"/api/tasks/{task['id']}", headers=async_auth_headers)
+    assert response.status_code == 404
+
+
+def test_async_writes_record_events(async_client, async_auth_headers):
+    """Test que les écritures asynchrones sont journalisées pour les flux SSE."""
+    from sqlalchemy import select
+    from models import TaskEvent
+
+    task = async_client.post('/api/tasks', json={'title': 'Async'},
+                             headers=async_auth_headers).json()['task']
+    async_client.put(f"/api/tasks/{task['id']}", json={'title': 'Modifiée', 'completed': True},
+                     headers=async_auth_headers)
+    async_client.patch(f"/api/tasks/{task['id']}/toggle", headers=async_auth_headers)
+    async_client.delete(f"/api/tasks/{task['id']}", headers=async_auth_headers)
+
+    async def journal():
+        async with async_client.app.state.sessions() as session:
+            return (await session.execute(
+                select(TaskEvent.type, TaskEvent.task_id).order_by(TaskEvent.id)
+            )).all()
+
+    assert async_client.portal.call(journal) == [
+        ('created', task['id']), ('updated', task['id']), ('toggled', task['id']),
+        ('deleted', task['id'])
+    ]
+
+
+def test_async_cursor_pagination_and_validation(async_client, async_auth_headers):
+    """Test que la pagination par curseur et la validation sont partagées avec Flask."""
+    for i in range(3):
+        async_client.post('/api/tasks', json={'title': f'Tâche {i}'}, headers=async_auth_headers)
+
+    response = async_client.get('/api/tasks?cursor=&per_page=2', headers=async_auth_headers)
+    data = response.json()
+    assert len(data['tasks']) == 2
+    response = async_client.get(f"/api/tasks?cursor={data['pagination']['next_cursor']}",
+                                headers=async_auth_headers)
+    assert [t['title'] for t in response.json()['tasks']] == ['Tâche 0']
+
+    response = async_client.post('/api/tasks', json={'title': ''}, headers=async_auth_headers)
+    assert response.status_code == 400
+    assert 'title' in response.json()['error']
+
+
+def test_async_task_query_matches_flask(client, auth_headers, async_client, async_auth_headers):
+    """Test que filtres, tri, colonnes et validation donnent la même réponse qu'avec Flask."""
+    for title, completed in (('Rapport', True), ('Revue', False), ('Budget', False), ('Rappel', False)):
+        task = {'title': title, 'completed': completed}
+        client.post('/api/tasks', json=task, headers=auth_headers)
+        async_client.post('/api/tasks', json=task, headers=async_auth_headers)
+
+    queries = [
+        '?completed=false&sort=title&fields=title,completed',
+        '?title_prefix=Rap&fields=title',
+        '?sort=-completed,title&fields=title&cursor=&per_page=2',
+        '?created_after=2000-01-01T00:00:00&created_before=2100-01-01T00:00:00&fields=title',
+    ]
+    for query in queries:
+        expected = client.get(f'/api/tasks{query}', headers=auth_headers).get_json()
+        response = async_client.get(f'/api/tasks{query}', headers=async_auth_headers)
+        assert response.status_code == 200
+        assert response.json()['tasks'] == expected['tasks'], query
+
+    cursor = async_client.get('/api/tasks?sort=-completed,title&fields=title&cursor=&per_page=2',
+                              headers=async_auth_headers).json()['pagination']['next_cursor']
+    response = async_client.get(f'/api/tasks?sort=-completed,title&fields=title&cursor={cursor}',
+                                headers=async_auth_headers)
+    assert [t['title'] for t in response.json()['tasks']] == ['Rappel', 'Revue']
+
+    for query in ('?completed=banana', '?sort=priority', '?fields=secret', '?fields=-id'):
+        assert client.get(f'/api/tasks{query}', headers=auth_headers).status_code == 400
+        assert async_client.get(f'/api/tasks{query}', headers=async_auth_headers).status_code == 400
+
+
+def test_async_tokens_are_compatible_with_flask(app, async_client, async_auth_headers):
+    """Test qu'un token émis par le serveur asynchrone est accepté par Flask, et inversement."""
+    from flask_jwt_extended import create_access_token, decode_token
+
+    token = async_auth_headers['Authorization'].split()[1]
+    with app.app_context():
+        assert decode_token(token)['type'] == 'access'
+        flask_token = create_access_token(identity=1)
+
+    response = async_client.get('/auth/me', headers={'Authorization': f'Bearer {flask_token}'})
+    assert response.json()['user']['username'] == 'asyncuser'
+
+
+def test_async_refresh_and_logout(async_client):
+    """Test le rafraîchissement et la révocation du token."""
+    tokens = async_client.post('/auth/register', json={
+        'username': 'asyncuser2', 'email': 'async2@example.com', 'password': 'password123'
+    }).json()
+    refresh = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+    access = {'Authorization': f"Bearer {tokens['access_token']}"}
+
+    assert async_client.get('/auth/me', headers=refresh).status_code == 422
+    assert async_client.post('/auth/refresh', headers=refresh).status_code == 200
+
+    assert async_client.post('/auth/logout', headers=access).status_code == 200
+    response = async_client.get('/auth/me', headers=access)
+    assert response.status_code == 401
+    assert response.json() == {'msg': 'Token has been revoked'}
+    assert async_client.get('/api/tasks').status_code == 401
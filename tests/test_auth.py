@@ -0,0 +1,107 @@
+from unittest import mock
+
+import pytest
+from flask import Flask
+
+from hashing import PasswordHasher, PasswordHashingBusy, password_hasher
+from jwt_cache import revocation_list
+from models import db, User
+
+
+def make_hasher(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    return PasswordHasher(app)
+
+
+def test_login_rehashes_outdated_password(app, client, auth_headers, monkeypatch):
+    """Test que la connexion rehache un mot de passe créé avec d'anciens paramètres."""
+    monkeypatch.setattr(password_hasher, 'method', 'pbkdf2:sha256:2000')
+    monkeypatch.setattr(password_hasher, '_method_prefix', None)
+
+    response = client.post('/auth/login', json={'username': 'testuser', 'password': 'Password123!'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+        assert user.check_password('Password123!')
+
+
+def test_login_returns_503_when_hashing_pool_is_full(client, auth_headers, monkeypatch):
+    """Test le rejet immédiat quand le pool de hachage est saturé."""
+    def busy(*args):
+        raise PasswordHashingBusy()
+    monkeypatch.setattr(password_hasher, 'verify', busy)
+
+    response = client.post('/auth/login', json={'username': 'testuser', 'password': 'Password123!'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_hasher_uses_process_pool():
+    """Test le hachage et la vérification dans un pool de processus."""
+    hasher = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_HASH_WORKERS=1,
+                         PASSWORD_HASH_MP_CONTEXT='fork')
+    try:
+        password_hash = hasher.hash('secret')
+        assert hasher.verify(password_hash, 'secret')
+        assert not hasher.verify(password_hash, 'autre')
+        assert not hasher.needs_rehash(password_hash)
+    finally:
+        hasher.shutdown()
+
+
+def test_production_hashing_pool_shares_cores_between_workers():
+    """Test que les pools de hachage des workers gunicorn ne dépassent pas le nombre de cœurs."""
+    import multiprocessing
+    from config import Config, ProductionConfig
+
+    assert Config.PASSWORD_HASH_MP_CONTEXT == 'spawn'
+    assert ProductionConfig.PASSWORD_HASH_WORKERS >= 1
+    assert (ProductionConfig.PASSWORD_HASH_WORKERS * ProductionConfig.GUNICORN_WORKERS
+            <= max(multiprocessing.cpu_count(), ProductionConfig.GUNICORN_WORKERS))
+
+
+def test_hasher_rejects_when_no_slot_available():
+    """Test la contre-pression : aucune place libre, échec sans attendre."""
+    hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1)
+    assert hasher._slots.acquire(blocking=False)
+
+    with pytest.raises(PasswordHashingBusy):
+        hasher.hash('secret')
+
+
+def test_verified_token_claims_are_cached(client, auth_headers):
+    """Test que la signature d'un token n'est vérifiée qu'une fois."""
+    from flask_jwt_extended import JWTManager
+
+    with mock.patch.object(JWTManager, '_decode_jwt_from_config',
+                           autospec=True, side_effect=JWTManager._decode_jwt_from_config) as decode:
+        client.get('/auth/me', headers=auth_headers)
+        client.get('/api/tasks', headers=auth_headers)
+
+    assert decode.call_count == 1
+
+
+def test_logout_revokes_token(client, auth_headers):
+    """Test qu'un token révoqué est refusé immédiatement."""
+    assert client.get('/auth/me', headers=auth_headers).status_code == 200
+
+    response = client.post('/auth/logout', headers=auth_headers)
+    assert response.status_code == 200
+
+    assert client.get('/auth/me', headers=auth_headers).status_code == 401
+
+
+def test_deactivated_user_is_rejected_after_sync(app, client, auth_headers):
+    """Test qu'un compte désactivé est refusé après synchronisation de la liste."""
+    assert client.get('/api/tasks', headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(username='testuser').first()
+        user.is_active = False
+        db.session.commit()
+        revocation_list.sync()
+
+    assert client.get('/api/tasks', headers=auth_headers).status_code == 401
@@ -0,0 +1,99 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import event
+
+from cache import MemoryBackend
+from models import db, Task, User
+from tasks import touch_user_tasks
+
+
+def test_memory_backend_lru_eviction():
+    """Test que l'entrée la moins récemment utilisée est évincée."""
+    backend = MemoryBackend(max_entries=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    backend.get('a')
+    backend.set('c', 3)
+
+    assert backend.get('a') == 1
+    assert backend.get('b') is None
+    assert backend.get('c') == 3
+
+
+def test_memory_backend_expiration():
+    """Test qu'une entrée expirée n'est plus renvoyée."""
+    backend = MemoryBackend()
+    with mock.patch('cache.time.monotonic', return_value=100.0):
+        backend.set('a', 1, timeout=10)
+    with mock.patch('cache.time.monotonic', return_value=111.0):
+        assert backend.get('a') is None
+
+
+def test_cached_reads_are_invalidated_by_mutations(client, auth_headers):
+    """Test que les lectures sont servies par le cache jusqu'à la prochaine écriture."""
+    client.post('/api/tasks', json={'title': 'A'}, headers=auth_headers)
+    first = client.get('/api/tasks', headers=auth_headers)
+
+    with mock.patch.object(Task, 'to_dict', side_effect=AssertionError('cache manqué')):
+        second = client.get('/api/tasks', headers=auth_headers)
+    assert second.status_code == 200
+    assert second.data == first.data
+
+    client.post('/api/tasks', json={'title': 'B'}, headers=auth_headers)
+    third = client.get('/api/tasks', headers=auth_headers)
+    assert third.get_json()['pagination']['total'] == 2
+
+
+def test_cache_is_keyed_by_query_parameters(client, auth_headers):
+    """Test que des paramètres différents ne partagent pas la même entrée."""
+    client.post('/api/tasks', json={'title': 'A', 'completed': True}, headers=auth_headers)
+
+    done = client.get('/api/tasks?completed=true', headers=auth_headers).get_json()
+    todo = client.get('/api/tasks?completed=false', headers=auth_headers).get_json()
+
+    assert done['pagination']['total'] == 1
+    assert todo['pagination']['total'] == 0
+
+
+def test_cache_follows_database_version(app, client, auth_headers):
+    """Test qu'une écriture faite hors de ce processus (autre worker, base) n'est pas masquée."""
+    client.post('/api/tasks', json={'title': 'A'}, headers=auth_headers)
+    first = client.get('/api/tasks', headers=auth_headers)
+    assert len(first.get_json()['tasks']) == 1
+
+    # Écriture directe en base, sans passer par les vues de ce processus
+    with app.app_context():
+        user_id = db.session.scalar(db.select(User.id))
+        db.session.add(Task(title='B', user_id=user_id))
+        touch_user_tasks(user_id, 1)
+        db.session.commit()
+
+    second = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert len(second.get_json()['tasks']) == 2
+    assert second.headers['ETag'] != first.headers['ETag']
+
+    third = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': second.headers['ETag']})
+    assert third.status_code == 304
+
+
+@pytest.mark.parametrize('path, queries', [('/auth/me', 1), ('/api/tasks/{task_id}', 2)])
+def test_single_row_reads_are_not_cached(app, client, auth_headers, path, queries):
+    """Test que les lectures par clé primaire ne paient pas la lecture de la version du cache."""
+    task_id = client.post('/api/tasks', json={'title': 'A'}, headers=auth_headers).get_json()['task']['id']
+    with app.app_context():
+        engine = db.engine
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(2):
+            assert client.get(path.format(task_id=task_id), headers=auth_headers).status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert len(statements) == 2 * queries
@@ -0,0 +1,90 @@
+import csv
+import gzip
+import io
+
+import brotli
+import pytest
+
+from compression import StreamCompressor, compressor
+
+
+def create_tasks(client, headers, count):
+    rows = [{'title': f'Tâche {i}', 'description': 'Description ' * 5} for i in range(count)]
+    response = client.post('/api/tasks/batch', json={'tasks': rows}, headers=headers)
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize('accept, encoding, decompress', [
+    ('gzip', 'gzip', gzip.decompress),
+    ('gzip, br', 'br', brotli.decompress),
+    ('br;q=0.5, gzip', 'gzip', gzip.decompress),
+])
+def test_json_response_is_compressed(client, auth_headers, accept, encoding, decompress):
+    """Test que l'encodage est négocié d'après Accept-Encoding."""
+    create_tasks(client, auth_headers, 20)
+    plain = client.get('/api/tasks?per_page=20', headers=auth_headers)
+
+    response = client.get('/api/tasks?per_page=20',
+                          headers={**auth_headers, 'Accept-Encoding': accept})
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert decompress(response.data) == plain.data
+    assert len(response.data) < len(plain.data)
+
+
+def test_small_or_refused_responses_are_not_compressed(client, auth_headers):
+    """Test le seuil de taille et le refus explicite de l'encodage."""
+    response = client.get('/ping', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+    create_tasks(client, auth_headers, 20)
+    response = client.get('/api/tasks?per_page=20',
+                          headers={**auth_headers, 'Accept-Encoding': 'gzip;q=0, br;q=0'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_conditional_get_with_compressed_etag(client, auth_headers):
+    """Test que l'ETag faible d'une réponse compressée permet une revalidation (304)."""
+    create_tasks(client, auth_headers, 20)
+    headers = {**auth_headers, 'Accept-Encoding': 'gzip'}
+    response = client.get('/api/tasks?per_page=20', headers=headers)
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+
+    response = client.get('/api/tasks?per_page=20', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_streamed_export_is_compressed(client, auth_headers, monkeypatch):
+    """Test que l'export en flux est compressé morceau par morceau."""
+    monkeypatch.setattr('tasks.EXPORT_BATCH_SIZE', 5)
+    create_tasks(client, auth_headers, 20)
+
+    response = client.get('/api/tasks/export?format=csv',
+                          headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert len(rows) == 20
+
+
+def test_stream_compressor_flushes_each_chunk():
+    """Test que chaque morceau compressé est décodable sans attendre la fin du flux."""
+    stream = StreamCompressor('gzip', 6)
+    first = stream.compress(b'{"id": 1}\n')
+    decoder = gzip.zlib.decompressobj(31)
+    assert decoder.decompress(first) == b'{"id": 1}\n'
+    assert decoder.decompress(stream.compress(b'{"id": 2}\n') + stream.finish()) == b'{"id": 2}\n'
+
+
+def test_static_files_are_compressed_once(client, monkeypatch):
+    """Test que la variante compressée d'un fichier statique est réutilisée."""
+    calls = []
+    original = compressor._static.set
+    monkeypatch.setattr(compressor._static, 'set', lambda *args: calls.append(args) or original(*args))
+
+    for _ in range(2):
+        response = client.get('/api/docs/swagger-ui.css', headers={'Accept-Encoding': 'br'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.data).startswith(b'.swagger-ui')
+    assert len(calls) == 1
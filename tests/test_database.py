@@ -0,0 +1,65 @@
+from sqlalchemy import create_engine, text
+
+from config import Config
+from database import InstrumentedQueuePool, engine_options, configure_sqlite
+
+
+def make_config(uri):
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config['SQLALCHEMY_DATABASE_URI'] = uri
+    return config
+
+
+def test_engine_options_by_backend():
+    """Test que les options de pool dépendent de la base configurée."""
+    assert engine_options(make_config('sqlite:///:memory:')) == {}
+
+    sqlite_options = engine_options(make_config('sqlite:///app.db'))
+    assert sqlite_options['poolclass'] is InstrumentedQueuePool
+    assert 'pool_pre_ping' not in sqlite_options
+
+    postgres_options = engine_options(make_config('postgresql://u:p@db/taskdb'))
+    assert postgres_options['pool_size'] == Config.DB_POOL_SIZE
+    assert postgres_options['pool_pre_ping'] is Config.DB_POOL_PRE_PING
+
+
+def test_sqlite_pragmas(tmp_path):
+    """Test que WAL, synchronous=NORMAL et busy_timeout sont appliqués."""
+    config = make_config(f'sqlite:///{tmp_path}/test.db')
+    engine = create_engine(config['SQLALCHEMY_DATABASE_URI'], **engine_options(config))
+    configure_sqlite(engine, config)
+
+    with engine.connect() as connection:
+        assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert connection.execute(text('PRAGMA synchronous')).scalar() == 1
+        assert connection.execute(text('PRAGMA busy_timeout')).scalar() == Config.SQLITE_BUSY_TIMEOUT
+    engine.dispose()
+
+
+def test_pool_metrics_are_exported(client):
+    """Test que les métriques du pool sont exposées sur /metrics."""
+    response = client.get('/metrics')
+    body = response.get_data(as_text=True)
+
+    assert 'db_pool_checked_out_connections' in body
+    assert 'db_pool_checkout_wait_seconds_bucket' in body
+
+
+def test_init_db_command_applies_migrations(app):
+    """Test que `flask init-db` recrée les index absents d'une base existante."""
+    from models import db, Task
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP TABLE tasks_fts')
+            for index in Task.__table__.indexes:
+                index.drop(connection)
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        assert inspector.has_table('tasks_fts')
+        indexes = {index['name'] for index in inspector.get_indexes('tasks')}
+        assert {index.name for index in Task.__table__.indexes} <= indexes
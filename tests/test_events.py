@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from events import Subscription, event_broker, events_lost, purge_events
+from models import db, TaskEvent
+
+
+@pytest.fixture
+def fast_stream(app):
+    app.config.update(SSE_HEARTBEAT_INTERVAL=0.05, SSE_MAX_DURATION=5)
+
+
+def read_events(response, count):
+    """Lire les count premiers événements (hors commentaires et retry) du flux."""
+    events = []
+    for chunk in response.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('id:'):
+            fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+            events.append(fields)
+            if len(events) == count:
+                break
+    response.close()
+    return events
+
+
+def test_stream_replays_from_last_event_id(client, auth_headers, fast_stream):
+    """Test la reprise depuis le journal à partir de Last-Event-ID."""
+    first = client.post('/api/tasks', json={'title': 'A'}, headers=auth_headers).get_json()['task']
+    client.post('/api/tasks', json={'title': 'B'}, headers=auth_headers)
+    client.patch(f"/api/tasks/{first['id']}/toggle", headers=auth_headers)
+    client.delete(f"/api/tasks/{first['id']}", headers=auth_headers)
+
+    response = client.get('/api/tasks/stream', headers={**auth_headers, 'Last-Event-ID': '0'},
+                          buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    events = read_events(response, 4)
+
+    assert [event['event'] for event in events] == ['created', 'created', 'toggled', 'deleted']
+    assert json.loads(events[2]['data'])['completed'] is True
+    assert json.loads(events[3]['data']) == {'id': first['id']}
+
+    # Reprise après le deuxième événement
+    response = client.get('/api/tasks/stream', headers={
+        **auth_headers, 'Last-Event-ID': events[1]['id']
+    }, buffered=False)
+    assert [event['event'] for event in read_events(response, 2)] == ['toggled', 'deleted']
+
+
+def test_stream_pushes_live_events(app, client, auth_headers, fast_stream):
+    """Test qu'une modification est poussée aux flux ouverts."""
+    received = []
+
+    def listen():
+        response = app.test_client().get('/api/tasks/stream', headers=auth_headers, buffered=False)
+        received.extend(read_events(response, 1))
+
+    def subscriptions():
+        return sum(len(subscriptions) for subscriptions in event_broker._subscriptions.values())
+
+    before = subscriptions()
+    listener = threading.Thread(target=listen)
+    listener.start()
+    deadline = time.monotonic() + 5
+    while subscriptions() == before and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    client.post('/api/tasks', json={'title': 'En direct'}, headers=auth_headers)
+    listener.join(5)
+
+    assert [event['event'] for event in received] == ['created']
+    assert json.loads(received[0]['data'])['title'] == 'En direct'
+
+
+def test_stream_heartbeat_and_invalid_id(client, auth_headers, fast_stream):
+    """Test les battements de cœur et le rejet d'un Last-Event-ID invalide."""
+    response = client.get('/api/tasks/stream', headers=auth_headers, buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'retry:')
+    assert next(chunks) == b': heartbeat\n\n'
+    response.close()
+    assert not event_broker._subscriptions
+
+    response = client.get('/api/tasks/stream', headers={**auth_headers, 'Last-Event-ID': 'abc'})
+    assert response.status_code == 400
+
+
+def test_stream_reset_after_purge(app, client, auth_headers, fast_stream):
+    """Test qu'un client dont les événements ont été purgés doit recharger la liste."""
+    for title in ('A', 'B', 'C'):
+        client.post('/api/tasks', json={'title': title}, headers=auth_headers)
+    with app.app_context():
+        oldest = db.session.scalars(db.select(TaskEvent).order_by(TaskEvent.id).limit(2)).all()
+        for event in oldest:
+            event.created_at = event.created_at.replace(year=2000)
+        db.session.commit()
+        assert purge_events(retention_days=7) == 2
+
+    response = client.get('/api/tasks/stream', headers={**auth_headers, 'Last-Event-ID': '0'},
+                          buffered=False)
+    assert [event['event'] for event in read_events(response, 2)] == ['reset', 'created']
+
+
+def test_stream_reset_after_full_purge(app, client, auth_headers, fast_stream):
+    """Test qu'un journal entièrement purgé impose aussi le rechargement."""
+    client.post('/api/tasks', json={'title': 'A'}, headers=auth_headers)
+    with app.app_context():
+        last_id = db.session.scalar(db.select(db.func.max(TaskEvent.id)))
+        db.session.execute(db.update(TaskEvent).values(created_at=datetime(2000, 1, 1)))
+        db.session.commit()
+        assert purge_events(retention_days=7) == 1
+        assert events_lost(last_id)
+        assert not events_lost(0)
+
+    response = client.get('/api/tasks/stream',
+                          headers={**auth_headers, 'Last-Event-ID': str(last_id)},
+                          buffered=False)
+    assert [event['event'] for event in read_events(response, 1)] == ['reset']
+
+
+def test_write_locks_user_before_events(app, client, auth_headers):
+    """Test que la ligne users est verrouillée avant l'allocation des identifiants d'événements."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[:3])
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        client.post('/api/tasks', json={'title': 'A'}, headers=auth_headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    touch = statements.index(['UPDATE', 'users', 'SET'])
+    insert = statements.index(['INSERT', 'INTO', 'task_events'])
+    assert touch < insert
+
+
+def test_stream_limit_per_worker(client, auth_headers, fast_stream, monkeypatch):
+    """Test qu'au-delà de SSE_MAX_STREAMS flux ouverts, un nouveau flux est refusé (503)."""
+    monkeypatch.setattr(event_broker, 'max_streams', 1)
+    # Flux déjà ouvert dans ce worker (autre client)
+    subscription = event_broker.subscribe(user_id=99)
+    try:
+        response = client.get('/api/tasks/stream', headers=auth_headers)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '3'
+    finally:
+        event_broker.unsubscribe(subscription)
+    # Abonnement fermé : la place est libérée, un second retrait ne la compte pas deux fois
+    event_broker.unsubscribe(subscription)
+    assert event_broker._count == 0
+
+    response = client.get('/api/tasks/stream', headers=auth_headers, buffered=False)
+    assert response.status_code == 200
+    next(iter(response.response))
+    response.close()
+    assert event_broker._count == 0
+
+
+def test_subscription_overflow_triggers_resync():
+    """Test qu'une file pleine est marquée pour relecture du journal."""
+    subscription = Subscription(user_id=1, maxsize=1)
+    subscription.put({'id': 1})
+    subscription.put({'id': 2})
+    assert subscription.overflowed
+
+    subscription.reset()
+    assert not subscription.overflowed
+    assert subscription.queue.empty()
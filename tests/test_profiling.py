@@ -0,0 +1,84 @@
+import os
+
+import pytest
+from flask import Flask, jsonify
+from marshmallow import fields
+from prometheus_client import CollectorRegistry
+
+from models import db, User
+from profiling import InstrumentedSchema, RequestProfiler
+
+
+class NameSchema(InstrumentedSchema):
+    name = fields.String(required=True)
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    """Application minimale instrumentée, avec son propre registre Prometheus."""
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite:///:memory:',
+        PROFILING_ENABLED=True,
+        PROFILING_N_PLUS_ONE_THRESHOLD=3,
+        PROFILING_SAMPLE_RATE=1.0,
+        PROFILING_SLOW_REQUEST_MS=0,
+        PROFILING_DUMP_DIR=str(tmp_path),
+    )
+    db.init_app(app)
+    registry = CollectorRegistry()
+
+    @app.route('/users')
+    def users():
+        NameSchema().load({'name': 'x'})
+        # Une requête par utilisateur : motif N+1
+        for user_id in range(1, 5):
+            db.session.get(User, user_id)
+        return jsonify({"users": []})
+
+    @app.route('/ping')
+    def ping():
+        return jsonify({"message": "pong"})
+
+    with app.app_context():
+        db.create_all()
+        RequestProfiler(app, db.engine, registry)
+    return app, registry, tmp_path
+
+
+def sample(registry, name, endpoint):
+    return registry.get_sample_value(name, {'endpoint': endpoint})
+
+
+def test_profiler_records_per_endpoint_metrics(profiled, caplog):
+    """Test les histogrammes par endpoint, la détection N+1 et l'en-tête Server-Timing."""
+    app, registry, _ = profiled
+    client = app.test_client()
+
+    response = client.get('/users')
+    assert 'db;dur=' in response.headers['Server-Timing']
+    assert '4 statements' in response.headers['Server-Timing']
+    assert sample(registry, 'request_sql_statements_sum', 'users') == 4
+    assert sample(registry, 'request_db_seconds_count', 'users') == 1
+    assert sample(registry, 'request_validation_seconds_sum', 'users') > 0
+    assert sample(registry, 'request_serialization_seconds_sum', 'users') > 0
+    assert sample(registry, 'request_n_plus_one_total', 'users') == 1
+    assert 'N+1 probable sur users' in caplog.text
+
+    client.get('/ping')
+    assert sample(registry, 'request_sql_statements_sum', 'ping') == 0
+    assert sample(registry, 'request_n_plus_one_total', 'ping') is None
+
+
+def test_profiler_dumps_slow_requests(profiled):
+    """Test l'écriture d'un profil cProfile pour une requête échantillonnée et lente."""
+    app, _, dump_dir = profiled
+    app.test_client().get('/ping')
+    dumps = os.listdir(dump_dir)
+    assert len(dumps) == 1 and dumps[0].startswith('ping-')
+
+
+def test_profiler_disabled_installs_nothing(app, client):
+    """Test que l'instrumentation est inactive par défaut."""
+    response = client.get('/ping')
+    assert 'Server-Timing' not in response.headers
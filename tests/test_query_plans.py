@@ -0,0 +1,136 @@
+import json
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from models import db
+
+
+@contextmanager
+def captured_statements(engine, all_tables=False):
+    """Capturer les requêtes SQL portant sur la table tasks (hors INSERT), ou toutes."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if all_tables or (re.search(r'\btasks\b', statement)
+                          and not statement.lstrip().upper().startswith('INSERT')):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_scans(connection, statement, parameters):
+    """Renvoyer les parcours complets de la table tasks dans le plan d'exécution."""
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+        return [row[-1] for row in rows if row[-1] == 'SCAN tasks']
+
+    # PostgreSQL préfère un Seq Scan sur une petite table : on le désactive
+    # pour vérifier qu'un index est utilisable
+    connection.exec_driver_sql('SET enable_seqscan = off')
+    plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == 'tasks':
+            scans.append(node['Node Type'])
+        nodes.extend(node.get('Plans', []))
+    return scans
+
+
+@pytest.mark.parametrize('method, path, body', [
+    ('get', '/api/tasks', None),
+    ('get', '/api/tasks?completed=true', None),
+    ('get', '/api/tasks?cursor=', None),
+    ('get', '/api/tasks?title_prefix=T&cursor=', None),
+    ('get', '/api/tasks?sort=title&fields=id,title&cursor=', None),
+    ('get', '/api/tasks?created_after=2020-01-01T00:00:00&cursor=', None),
+    ('get', '/api/tasks/search?q=tache', None),
+    ('get', '/api/tasks/{task_id}', None),
+    ('get', '/api/tasks/export', None),
+    ('put', '/api/tasks/{task_id}', {'title': 'Modifiée'}),
+    ('patch', '/api/tasks/{task_id}/toggle', None),
+    ('delete', '/api/tasks/{task_id}', None),
+])
+def test_task_paths_use_indexes(app, client, auth_headers, method, path, body):
+    """Test que les chemins de lecture et d'écriture n'effectuent pas de parcours complet."""
+    for i in range(3):
+        response = client.post('/api/tasks', json={'title': f'Tâche {i}'}, headers=auth_headers)
+    task_id = response.get_json()['task']['id']
+
+    with app.app_context():
+        engine = db.engine
+
+    with captured_statements(engine) as statements:
+        response = getattr(client, method)(
+            path.format(task_id=task_id), json=body, headers=auth_headers
+        )
+    assert response.status_code == 200
+    assert statements
+
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            assert full_scans(connection, statement, parameters) == [], statement
+
+
+# Budget d'une écriture unitaire : la requête sur tasks, l'UPDATE
+# de users (verrou, version de la liste, compteurs) et l'INSERT du journal
+# d'événements. Envoyer completed dans un PUT ajoute la lecture verrouillée
+# de l'ancienne valeur (variation du compteur des tâches terminées).
+WRITE_STATEMENTS = ['UPDATE users', 'INSERT INTO task_events']
+
+
+@pytest.mark.parametrize('method, path, body, statements', [
+    ('post', '/api/tasks', {'title': 'Nouvelle'}, ['INSERT INTO tasks']),
+    ('put', '/api/tasks/{task_id}', {'title': 'Modifiée'}, ['UPDATE tasks']),
+    ('put', '/api/tasks/{task_id}', {'title': 'Modifiée', 'completed': True},
+     ['SELECT tasks.completed', 'UPDATE tasks']),
+    ('patch', '/api/tasks/{task_id}/toggle', None, ['UPDATE tasks']),
+    ('delete', '/api/tasks/{task_id}', None, ['DELETE FROM tasks']),
+])
+def test_task_writes_statement_budget(app, client, auth_headers, method, path, body, statements):
+    """Test le nombre et l'ordre de toutes les requêtes d'une écriture unitaire."""
+    response = client.post('/api/tasks', json={'title': 'Tâche'}, headers=auth_headers)
+    task_id = response.get_json()['task']['id']
+
+    with app.app_context():
+        engine = db.engine
+
+    with captured_statements(engine, all_tables=True) as captured:
+        response = getattr(client, method)(
+            path.format(task_id=task_id), json=body, headers=auth_headers
+        )
+    assert response.status_code in (200, 201)
+    expected = statements + WRITE_STATEMENTS
+    assert len(captured) == len(expected)
+    for (statement, _), prefix in zip(captured, expected):
+        assert ' '.join(statement.split()).startswith(prefix), statement
+    # UPDATE et DELETE renvoient la tâche (l'INSERT, son id) : pas de relecture
+    if method != 'post':
+        assert 'RETURNING' in captured[len(statements) - 1][0]
+
+
+def test_export_streams_single_query(app, client, auth_headers, monkeypatch):
+    """Test que l'export lit toutes les tâches en une requête, par lots."""
+    monkeypatch.setattr('tasks.EXPORT_BATCH_SIZE', 2)
+    for i in range(5):
+        client.post('/api/tasks', json={'title': f'Tâche {i}'}, headers=auth_headers)
+
+    with app.app_context():
+        engine = db.engine
+
+    with captured_statements(engine) as statements:
+        response = client.get('/api/tasks/export', headers=auth_headers)
+        lines = response.data.splitlines()
+    assert len(lines) == 5
+    assert len(statements) == 1
@@ -0,0 +1,108 @@
+import multiprocessing
+import sqlite3
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+import pytest
+
+from ratelimit_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return storage_from_string(f"sqlite:///{tmp_path / 'ratelimit.db'}")
+
+
+def hit_from_child(uri, results):
+    limiter = MovingWindowRateLimiter(storage_from_string(uri))
+    results.put([limiter.hit(parse('3 per minute'), 'client') for _ in range(2)])
+
+
+def test_storage_is_registered_for_sqlite_scheme(storage):
+    """Test que le schéma sqlite:// est résolu vers le stockage partagé."""
+    assert isinstance(storage, SQLiteStorage)
+    assert storage.check()
+
+
+def test_storage_path_follows_sqlalchemy_urls(tmp_path, monkeypatch):
+    """Test que sqlite:/// désigne un chemin relatif et sqlite://// un chemin absolu."""
+    monkeypatch.chdir(tmp_path)
+    assert SQLiteStorage('sqlite:///ratelimit.db').path == 'ratelimit.db'
+    assert (tmp_path / 'ratelimit.db').exists()
+    assert SQLiteStorage(f"sqlite:///{tmp_path / 'absolu.db'}").path == str(tmp_path / 'absolu.db')
+
+
+def test_fixed_window_counts_hits(storage):
+    """Test que la fenêtre fixe refuse les requêtes au-delà de la limite."""
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse('2 per minute')
+
+    assert limiter.hit(limit, 'client')
+    assert limiter.hit(limit, 'client')
+    assert not limiter.hit(limit, 'client')
+    assert limiter.hit(limit, 'other')
+
+
+def test_moving_window_expires_old_entries(storage):
+    """Test que la fenêtre glissante libère les entrées plus anciennes que la période."""
+    limiter = MovingWindowRateLimiter(storage)
+    limit = parse('2 per minute')
+
+    assert limiter.hit(limit, 'client')
+    assert limiter.hit(limit, 'client')
+    assert not limiter.hit(limit, 'client')
+    assert limiter.get_window_stats(limit, 'client').remaining == 0
+
+    # Entrées vieillies de plus d'une minute
+    connection = storage._connection()
+    connection.execute('UPDATE window_entries SET acquired_at = acquired_at - 61')
+    assert limiter.hit(limit, 'client')
+
+
+def test_purge_keeps_entries_of_long_windows(storage, monkeypatch):
+    """Test que la purge globale respecte la fenêtre de chaque clé (ex. "per month")."""
+    monkeypatch.setattr(storage, 'PURGE_PROBABILITY', 1)
+    limiter = MovingWindowRateLimiter(storage)
+    monthly, minute = parse('2 per month'), parse('5 per minute')
+    assert limiter.hit(monthly, 'client')
+    assert limiter.hit(minute, 'client')
+
+    # Entrées vieillies de deux jours : hors de la fenêtre d'une minute seulement
+    connection = storage._connection()
+    connection.execute('UPDATE window_entries SET acquired_at = acquired_at - 172800, '
+                       'expires_at = expires_at - 172800')
+    assert limiter.hit(minute, 'other')
+    keys = [row[0] for row in connection.execute('SELECT key FROM window_entries')]
+    assert len(keys) == 2
+    assert limiter.get_window_stats(monthly, 'client').remaining == 1
+
+
+def test_storage_migrates_entries_without_expiry(tmp_path):
+    """Test qu'un fichier d'une version précédente reçoit la colonne expires_at."""
+    path = tmp_path / 'ancien.db'
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE window_entries (key TEXT NOT NULL, acquired_at REAL NOT NULL)')
+    connection.execute("INSERT INTO window_entries VALUES ('client', 1000)")
+    connection.commit()
+    connection.close()
+
+    storage = SQLiteStorage(f'sqlite:///{path}')
+    assert storage._connection().execute('SELECT expires_at FROM window_entries').fetchall() == [(87400,)]
+    assert MovingWindowRateLimiter(storage).hit(parse('1 per minute'), 'client')
+
+
+def test_counters_are_shared_between_processes(tmp_path):
+    """Test que deux processus consomment la même limite."""
+    uri = f"sqlite:///{tmp_path / 'ratelimit.db'}"
+    limiter = MovingWindowRateLimiter(storage_from_string(uri))
+    assert limiter.hit(parse('3 per minute'), 'client')
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=hit_from_child, args=(uri, results))
+    process.start()
+    process.join(30)
+
+    assert results.get(timeout=5) == [True, True]
+    assert not limiter.hit(parse('3 per minute'), 'client')
@@ -0,0 +1,135 @@
+import pytest
+
+from models import db
+from search import create_search_index, query_terms, search_statement
+
+
+def search(client, headers, q, **params):
+    response = client.get('/api/tasks/search', query_string={'q': q, **params}, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def titles(result):
+    return [task['title'] for task in result['tasks']]
+
+
+def test_search_ranks_and_matches_prefixes(client, auth_headers):
+    """Test le classement (titre avant description), les préfixes et les accents."""
+    client.post('/api/tasks', json={'title': 'Courses', 'description': 'Acheter du pain'},
+                headers=auth_headers)
+    client.post('/api/tasks', json={'title': 'Pain au levain', 'description': 'Boulangerie'},
+                headers=auth_headers)
+    client.post('/api/tasks', json={'title': 'Réunion équipe'}, headers=auth_headers)
+
+    assert titles(search(client, auth_headers, 'pain')) == ['Pain au levain', 'Courses']
+    assert titles(search(client, auth_headers, 'boulan')) == ['Pain au levain']
+    assert titles(search(client, auth_headers, 'reunion equ')) == ['Réunion équipe']
+    # Les opérateurs de la syntaxe d'index sont ignorés
+    assert titles(search(client, auth_headers, 'pain" OR "réunion')) == []
+    assert titles(search(client, auth_headers, 'absent')) == []
+
+
+def test_search_follows_writes(client, auth_headers):
+    """Test que l'index suit les modifications et suppressions, par utilisateur."""
+    task_id = client.post('/api/tasks', json={'title': 'Rapport annuel'},
+                          headers=auth_headers).get_json()['task']['id']
+    client.post('/api/tasks/batch', json={'tasks': [{'title': 'Rapport mensuel'}]},
+                headers=auth_headers)
+
+    client.put(f'/api/tasks/{task_id}', json={'title': 'Bilan annuel'}, headers=auth_headers)
+    assert titles(search(client, auth_headers, 'rapport')) == ['Rapport mensuel']
+    assert titles(search(client, auth_headers, 'bilan')) == ['Bilan annuel']
+
+    client.delete(f'/api/tasks/{task_id}', headers=auth_headers)
+    assert titles(search(client, auth_headers, 'annuel')) == []
+
+    response = client.post('/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'Password123!'
+    })
+    other = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    assert titles(search(client, other, 'rapport')) == []
+
+
+def test_search_pages_are_not_cached(client, auth_headers, monkeypatch):
+    """Test que chaque page de recherche est recalculée (scores SQLite dépendants de tout l'index)."""
+    import tasks
+    calls = []
+    match_tasks = tasks.match_tasks
+
+    def counting_match_tasks(*args):
+        calls.append(args)
+        return match_tasks(*args)
+
+    monkeypatch.setattr(tasks, 'match_tasks', counting_match_tasks)
+    client.post('/api/tasks', json={'title': 'Rapport'}, headers=auth_headers)
+    search(client, auth_headers, 'rapport')
+    search(client, auth_headers, 'rapport')
+    assert len(calls) == 2
+
+
+def test_search_cursor_pagination(client, auth_headers):
+    """Test que le curseur parcourt tous les résultats sans doublon."""
+    client.post('/api/tasks/batch', json={'tasks': [
+        {'title': f'Note {i}', 'description': 'note ' * (i % 3)} for i in range(7)
+    ]}, headers=auth_headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {'per_page': 3, **({'cursor': cursor} if cursor else {})}
+        result = search(client, auth_headers, 'note', **params)
+        seen.extend(task['id'] for task in result['tasks'])
+        cursor = result['pagination']['next_cursor']
+        if not result['pagination']['has_next']:
+            break
+    assert len(seen) == len(set(seen)) == 7
+
+
+@pytest.mark.parametrize('params', [{}, {'q': '!!!'}, {'q': 'a', 'cursor': 'invalide'}])
+def test_search_validation(client, auth_headers, params):
+    """Test le rejet d'une recherche vide ou d'un curseur invalide."""
+    response = client.get('/api/tasks/search', query_string=params, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_create_search_index_rebuilds(app, client, auth_headers):
+    """Test qu'un index créé sur une base existante contient les tâches présentes."""
+    client.post('/api/tasks', json={'title': 'Ancienne tâche'}, headers=auth_headers)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP TABLE tasks_fts')
+            create_search_index(connection)
+            create_search_index(connection)
+
+    assert titles(search(client, auth_headers, 'ancienne')) == ['Ancienne tâche']
+
+
+def test_create_search_index_upgrades_global_index(app, client, auth_headers):
+    """Test qu'un index FTS5 sans user_id (version précédente) est recréé par utilisateur."""
+    client.post('/api/tasks', json={'title': 'Ancienne tâche'}, headers=auth_headers)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP TABLE tasks_fts')
+            connection.exec_driver_sql(
+                "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, "
+                "content='tasks', content_rowid='id')"
+            )
+            create_search_index(connection)
+            columns = [row[1] for row in connection.exec_driver_sql('PRAGMA table_info(tasks_fts)')]
+        assert 'user_id' in columns
+
+    assert titles(search(client, auth_headers, 'ancienne')) == ['Ancienne tâche']
+
+
+def test_search_without_full_text_index(app, client, auth_headers):
+    """Test la recherche par ILIKE des dialectes sans index plein texte, titres d'abord."""
+    task = client.post('/api/tasks', json={'title': 'Courses', 'description': 'Acheter du PAIN'},
+                       headers=auth_headers).get_json()['task']
+    client.post('/api/tasks', json={'title': 'Pain 100%_bio'}, headers=auth_headers)
+    client.post('/api/tasks', json={'title': 'Réunion'}, headers=auth_headers)
+    user_id = task['user_id']
+    with app.app_context():
+        stmt, _ = search_statement('mssql', user_id, query_terms('pain'))
+        assert [row.title for row in db.session.execute(stmt)] == ['Pain 100%_bio', 'Courses']
+        stmt, _ = search_statement('mssql', user_id + 1, query_terms('pain'))
+        assert db.session.execute(stmt).all() == []
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+
+import seeding
+from models import db, Task, User
+from seeding import seed_database, task_counts, SEED_PASSWORD
+from tasks import reconcile_task_counters
+
+
+def login(client, username):
+    response = client.post('/auth/login', json={'username': username, 'password': SEED_PASSWORD})
+    assert response.status_code == 200
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def test_task_counts_skew():
+    """Test la répartition des tâches : somme exacte, décroissante, uniforme sans biais."""
+    counts = task_counts(100, 10_000, 1.2)
+    assert sum(counts) == 10_000
+    assert counts == sorted(counts, reverse=True)
+    assert counts[0] > 10 * counts[-1]
+
+    assert task_counts(4, 10, 0) == [3, 3, 2, 2]
+
+
+def test_seed_database(app, client):
+    """Test le chargement : compteurs, index reconstruits, données utilisables par l'API."""
+    with app.app_context():
+        summary = seed_database(20, 2000, skew=1.0, seed=1, batch_size=300)
+        assert summary['tasks'] == 2000
+        assert db.session.scalar(db.select(db.func.count()).select_from(Task)) == 2000
+        # Compteurs renseignés au chargement : rien à corriger
+        assert reconcile_task_counters() == 0
+        indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('tasks')}
+        assert {index.name for index in Task.__table__.indexes} <= indexes
+
+    headers = login(client, summary['first_user'])
+    stats = client.get('/api/tasks/stats', headers=headers).get_json()['stats']
+    assert stats['total'] == summary['max_tasks_per_user']
+
+    page = client.get('/api/tasks?cursor=&per_page=5', headers=headers).get_json()
+    assert len(page['tasks']) == 5
+    title = page['tasks'][0]['title']
+    # Index de recherche reconstruit depuis les tâches chargées
+    found = client.get('/api/tasks/search', query_string={'q': title},
+                       headers=headers).get_json()['tasks']
+    assert title in [task['title'] for task in found]
+
+
+def test_seed_database_is_reproducible_and_appends(app):
+    """Test qu'une même graine produit les mêmes tâches et qu'un second chargement s'ajoute."""
+    def contents():
+        return db.session.execute(
+            db.select(Task.title, Task.completed, Task.user_id).order_by(Task.id)
+        ).all()
+
+    with app.app_context():
+        seed_database(5, 200, seed=7, defer_indexes=False)
+        first = contents()
+        db.drop_all()
+        db.create_all()
+        seed_database(5, 200, seed=7, defer_indexes=False)
+        assert contents() == first
+
+        summary = seed_database(3, 30, seed=8)
+        assert summary['first_user'] == 'seed5'
+        assert db.session.scalar(db.select(db.func.count()).select_from(Task)) == 230
+
+
+def test_seed_database_numbers_after_existing_prefix(app):
+    """Test que seuls les noms <prefix><chiffres> décalent la numérotation."""
+    with app.app_context():
+        for username in ('seed7', 'seedling', 'seed_admin', 'seed10x'):
+            db.session.add(User(username, f'{username}@example.com', SEED_PASSWORD))
+        db.session.commit()
+        assert seed_database(2, 4, seed=1, defer_indexes=False)['first_user'] == 'seed8'
+
+
+def test_seed_database_restores_indexes_on_error(app, monkeypatch):
+    """Test que les index et PRAGMA synchronous sont rétablis si le chargement échoue."""
+    def failing_insert(*args):
+        raise RuntimeError("lot refusé")
+
+    monkeypatch.setattr(seeding, 'bulk_insert', failing_insert)
+    with app.app_context():
+        with db.engine.connect() as connection:
+            synchronous = connection.exec_driver_sql('PRAGMA synchronous').scalar()
+        with pytest.raises(RuntimeError):
+            seed_database(3, 30, seed=1)
+
+        inspector = db.inspect(db.engine)
+        indexes = {index['name'] for index in inspector.get_indexes('tasks')}
+        assert {index.name for index in Task.__table__.indexes} <= indexes
+        assert inspector.has_table('tasks_fts')
+        with db.engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == synchronous
+
+
+def test_bulk_insert_uses_copy_on_postgresql():
+    """Test qu'un lot est envoyé en un seul COPY sur PostgreSQL (psycopg2)."""
+    copies = []
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def copy_expert(self, sql, buffer):
+            copies.append((sql, buffer.read()))
+
+    connection = SimpleNamespace(
+        dialect=SimpleNamespace(name='postgresql', driver='psycopg2'),
+        connection=SimpleNamespace(cursor=Cursor),
+    )
+    rows = [('A', 'texte', True, 'd1', 'd1', 1), ('B', None, False, 'd2', 'd2', 1)]
+    seeding.bulk_insert(connection, Task.__table__, seeding.TASK_COLUMNS, rows)
+
+    assert copies == [(
+        'COPY tasks (title, description, completed, created_at, updated_at, user_id) '
+        'FROM STDIN WITH (FORMAT csv)',
+        'A,texte,True,d1,d1,1\r\nB,,False,d2,d2,1\r\n',
+    )]
@@ -0,0 +1,463 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+import pytest
+from werkzeug.http import http_date
+
+from models import db, Task
+import tasks
+
+
+def create_tasks(client, headers, count):
+    """Créer plusieurs tâches et renvoyer leurs identifiants."""
+    ids = []
+    for i in range(count):
+        response = client.post('/api/tasks', json={'title': f'Tâche {i}'}, headers=headers)
+        assert response.status_code == 201
+        ids.append(response.get_json()['task']['id'])
+    return ids
+
+
+def test_get_tasks_page_mode(client, auth_headers):
+    """Test que la pagination par page reste inchangée."""
+    create_tasks(client, auth_headers, 3)
+    response = client.get('/api/tasks?page=1&per_page=2&completed=false', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert len(data['tasks']) == 2
+    assert data['pagination']['total'] == 3
+    assert data['pagination']['has_next'] is True
+
+
+def test_get_tasks_cursor_mode(client, auth_headers):
+    """Test que le mode curseur parcourt toutes les tâches sans doublon."""
+    ids = create_tasks(client, auth_headers, 5)
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'/api/tasks?cursor={cursor}&per_page=2', headers=auth_headers)
+        data = response.get_json()
+        assert response.status_code == 200
+        assert 'total' not in data['pagination']
+        seen.extend(task['id'] for task in data['tasks'])
+        cursor = data['pagination']['next_cursor']
+
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_get_tasks_cursor_total_optional(client, auth_headers):
+    """Test que le total n'est calculé qu'à la demande en mode curseur."""
+    create_tasks(client, auth_headers, 2)
+    response = client.get('/api/tasks?cursor=&include_total=true', headers=auth_headers)
+
+    assert response.get_json()['pagination']['total'] == 2
+
+
+@pytest.mark.parametrize('cursor', ['invalide', 'bm9uLWpzb24'])
+def test_get_tasks_invalid_cursor(client, auth_headers, cursor):
+    """Test qu'un curseur invalide renvoie une erreur 400."""
+    response = client.get(f'/api/tasks?cursor={cursor}', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_create_tasks_batch(client, auth_headers):
+    """Test la création groupée avec un résultat par élément."""
+    response = client.post('/api/tasks/batch', json={
+        'tasks': [{'title': 'A'}, {'title': 'B', 'completed': True}]
+    }, headers=auth_headers)
+    results = response.get_json()['results']
+
+    assert response.status_code == 201
+    assert [r['task']['title'] for r in results] == ['A', 'B']
+    assert results[1]['task']['completed'] is True
+
+
+def test_create_tasks_batch_validation(client, auth_headers):
+    """Test que la validation signale l'élément invalide sans rien insérer."""
+    response = client.post('/api/tasks/batch', json={
+        'tasks': [{'title': 'A'}, {'title': ''}]
+    }, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert '1' in response.get_json()['error']
+    assert client.get('/api/tasks', headers=auth_headers).get_json()['pagination']['total'] == 0
+
+
+@pytest.mark.parametrize('method, path', [
+    ('post', '/api/tasks/batch'), ('put', '/api/tasks/batch'),
+    ('delete', '/api/tasks/batch'), ('patch', '/api/tasks/batch/toggle'),
+])
+@pytest.mark.parametrize('body', [[1], 'tâches', None])
+def test_tasks_batch_rejects_non_object_body(client, auth_headers, method, path, body):
+    """Test qu'un corps JSON qui n'est pas un objet est refusé (400) comme pour une tâche seule."""
+    response = getattr(client, method)(path, data=json.dumps(body), headers=auth_headers,
+                                       content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_update_toggle_delete_tasks_batch(client, auth_headers):
+    """Test les opérations groupées sur des tâches existantes et inconnues."""
+    ids = create_tasks(client, auth_headers, 2)
+
+    response = client.put('/api/tasks/batch', json={'tasks': [
+        {'id': ids[0], 'title': 'Renommée'}, {'id': 9999, 'title': 'X'}
+    ]}, headers=auth_headers)
+    results = response.get_json()['results']
+    assert results[0]['task']['title'] == 'Renommée'
+    assert results[1]['status'] == 404
+
+    response = client.patch('/api/tasks/batch/toggle', json={'ids': ids}, headers=auth_headers)
+    assert all(r['task']['completed'] for r in response.get_json()['results'])
+    task = client.get(f'/api/tasks/{ids[0]}', headers=auth_headers).get_json()['task']
+    assert task['title'] == 'Renommée' and task['completed'] is True
+
+    response = client.delete('/api/tasks/batch', json={'ids': [ids[0], 9999]}, headers=auth_headers)
+    assert [r['status'] for r in response.get_json()['results']] == [200, 404]
+    assert client.get(f'/api/tasks/{ids[0]}', headers=auth_headers).status_code == 404
+    assert client.get(f'/api/tasks/{ids[1]}', headers=auth_headers).status_code == 200
+
+
+def test_tasks_batch_rejects_repeated_ids(client, auth_headers):
+    """Test qu'un identifiant répété est refusé : les compteurs ne le compteraient qu'une fois."""
+    task_id = create_tasks(client, auth_headers, 1)[0]
+
+    response = client.put('/api/tasks/batch', json={'tasks': [
+        {'id': task_id, 'title': 'A', 'completed': True},
+        {'id': task_id, 'title': 'B', 'completed': True},
+    ]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert 'tasks' in response.get_json()['error']
+
+    for method, path in (('patch', '/api/tasks/batch/toggle'), ('delete', '/api/tasks/batch')):
+        response = getattr(client, method)(path, json={'ids': [task_id, task_id]}, headers=auth_headers)
+        assert response.status_code == 400
+        assert 'ids' in response.get_json()['error']
+
+    stats = client.get('/api/tasks/stats', headers=auth_headers).get_json()['stats']
+    assert stats == {'total': 1, 'completed': 0, 'pending': 1}
+
+
+def test_write_paths_without_returning(app, client, auth_headers, monkeypatch):
+    """Test le repli sans RETURNING (SQLite < 3.35)."""
+    with app.app_context():
+        dialect = db.engine.dialect
+    monkeypatch.setattr(dialect, 'update_returning', False)
+    monkeypatch.setattr(dialect, 'delete_returning', False)
+    monkeypatch.setattr(dialect, 'insert_executemany_returning_sort_by_parameter_order', False)
+    task_id = create_tasks(client, auth_headers, 1)[0]
+
+    response = client.post('/api/tasks/batch', json={'tasks': [{'title': 'A'}, {'title': 'B'}]},
+                           headers=auth_headers)
+    assert [r['task']['title'] for r in response.get_json()['results']] == ['A', 'B']
+    client.delete('/api/tasks/batch', json={'ids': [r['id'] for r in response.get_json()['results']]},
+                  headers=auth_headers)
+
+    response = client.put(f'/api/tasks/{task_id}', json={'title': 'Modifiée'}, headers=auth_headers)
+    assert response.get_json()['task']['title'] == 'Modifiée'
+
+    response = client.patch(f'/api/tasks/{task_id}/toggle', headers=auth_headers)
+    assert response.get_json()['task']['completed'] is True
+
+    assert client.delete(f'/api/tasks/{task_id}', headers=auth_headers).status_code == 200
+    assert client.get('/api/tasks/stats', headers=auth_headers).get_json()['stats']['total'] == 0
+    assert client.delete(f'/api/tasks/{task_id}', headers=auth_headers).status_code == 404
+    assert client.patch(f'/api/tasks/{task_id}/toggle', headers=auth_headers).status_code == 404
+
+
+def test_get_tasks_conditional(client, auth_headers):
+    """Test que la liste renvoie 304 tant qu'aucune tâche n'a changé."""
+    create_tasks(client, auth_headers, 1)
+    response = client.get('/api/tasks', headers=auth_headers)
+    etag = response.headers['ETag']
+
+    response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    response = client.get('/api/tasks?completed=true', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+    create_tasks(client, auth_headers, 1)
+    response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_get_task_conditional(app, client, auth_headers):
+    """Test l'ETag et Last-Modified d'une tâche et leur mise à jour."""
+    task_id = create_tasks(client, auth_headers, 1)[0]
+    with app.app_context():
+        # Modification antérieure à la seconde en cours : Last-Modified est annoncé
+        db.session.execute(db.update(Task).values(updated_at=datetime(2024, 1, 1, 12, 0, 0, 500)))
+        db.session.commit()
+    response = client.get(f'/api/tasks/{task_id}', headers=auth_headers)
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    last_modified = response.headers['Last-Modified']
+    assert last_modified == 'Mon, 01 Jan 2024 12:00:01 GMT'
+
+    response = client.get(f'/api/tasks/{task_id}', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    response = client.get(f'/api/tasks/{task_id}', headers={**auth_headers, 'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+    # Même seconde que la modification : jamais de 304
+    response = client.get(f'/api/tasks/{task_id}',
+                          headers={**auth_headers, 'If-Modified-Since': 'Mon, 01 Jan 2024 12:00:00 GMT'})
+    assert response.status_code == 200
+
+    client.patch(f'/api/tasks/{task_id}/toggle', headers=auth_headers)
+    response = client.get(f'/api/tasks/{task_id}', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['task']['updated_at'] > response.get_json()['task']['created_at']
+
+    client.delete(f'/api/tasks/{task_id}', headers=auth_headers)
+    response = client.get(f'/api/tasks/{task_id}', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 404
+
+
+def test_conditional_same_second_write_is_not_masked(client, auth_headers):
+    """Test qu'une écriture dans la seconde en cours n'est pas validable par date."""
+    task_id = create_tasks(client, auth_headers, 1)[0]
+    response = client.get(f'/api/tasks/{task_id}', headers=auth_headers)
+    # La seconde de la modification n'est pas écoulée : pas de Last-Modified
+    assert 'Last-Modified' not in response.headers
+
+    now = http_date(time.time())
+    client.patch(f'/api/tasks/{task_id}/toggle', headers=auth_headers)
+    response = client.get(f'/api/tasks/{task_id}', headers={**auth_headers, 'If-Modified-Since': now})
+    assert response.status_code == 200
+    assert response.get_json()['task']['completed'] is True
+
+
+def test_row_to_dict_matches_to_dict(app, client, auth_headers):
+    """Test que la sérialisation par projection reproduit Task.to_dict."""
+    create_tasks(client, auth_headers, 1)
+    with app.app_context():
+        task = Task.query.first()
+        row = db.session.execute(db.select(*Task.projection())).first()
+        assert Task.row_to_dict(row) == task.to_dict()
+
+
+def test_export_tasks_ndjson(client, auth_headers):
+    """Test que l'export NDJSON renvoie une tâche par ligne, des plus récentes aux plus anciennes."""
+    ids = create_tasks(client, auth_headers, 3)
+    client.patch(f'/api/tasks/{ids[0]}/toggle', headers=auth_headers)
+
+    response = client.get('/api/tasks/export', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment' in response.headers['Content-Disposition']
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [task['id'] for task in lines] == ids[::-1]
+
+    response = client.get('/api/tasks/export?completed=true', headers=auth_headers)
+    assert [json.loads(line)['id'] for line in response.data.decode().splitlines()] == [ids[0]]
+
+
+def test_export_tasks_csv(client, auth_headers, monkeypatch):
+    """Test que l'export CSV contient toutes les tâches quand elles sont lues par lots."""
+    monkeypatch.setattr(tasks, 'EXPORT_BATCH_SIZE', 2)
+    ids = create_tasks(client, auth_headers, 5)
+
+    response = client.get('/api/tasks/export?format=csv', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+    assert [int(row['id']) for row in rows] == ids[::-1]
+    assert rows[0]['title'] == 'Tâche 4'
+
+
+def test_export_tasks_empty_and_invalid(client, auth_headers):
+    """Test l'export sans tâche et le rejet d'un format inconnu."""
+    response = client.get('/api/tasks/export?format=csv', headers=auth_headers)
+    assert response.data.decode().strip() == 'id,title,description,completed,created_at,updated_at,user_id'
+
+    response = client.get('/api/tasks/export?format=xml', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_import_tasks_ndjson(client, auth_headers, monkeypatch):
+    """Test que l'import insère les lignes valides par lots et résume les rejets."""
+    monkeypatch.setattr(tasks, 'IMPORT_CHUNK_SIZE', 2)
+    body = '\n'.join([
+        json.dumps({'title': 'A'}),
+        json.dumps({'title': 'B', 'completed': True}),
+        '',
+        '{pas du json',
+        json.dumps({'title': ''}),
+        json.dumps(['C']),
+        json.dumps({'title': 'D', 'description': 'd'}),
+    ])
+    response = client.post('/api/tasks/import', data=body, headers=auth_headers,
+                           content_type='application/x-ndjson')
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['accepted'] == 3
+    assert data['rejected'] == 3
+    assert [error['line'] for error in data['errors']] == [4, 5, 6]
+
+    titles = [task['title'] for task in client.get('/api/tasks', headers=auth_headers).get_json()['tasks']]
+    assert sorted(titles) == ['A', 'B', 'D']
+
+
+def test_import_tasks_keeps_empty_description(client, auth_headers):
+    """Test qu'une tâche importée sans description garde une description vide (pas NULL)."""
+    body = '{"title": "A"}\n{"title": "B", "description": ""}\n'
+    response = client.post('/api/tasks/import', data=body, headers=auth_headers,
+                           content_type='application/x-ndjson')
+    assert response.get_json()['accepted'] == 2
+
+    tasks_list = client.get('/api/tasks', headers=auth_headers).get_json()['tasks']
+    assert [task['description'] for task in tasks_list] == ['', '']
+
+
+def test_import_tasks_csv_round_trip(client, auth_headers):
+    """Test qu'un export CSV peut être réimporté tel quel."""
+    create_tasks(client, auth_headers, 3)
+    export = client.get('/api/tasks/export?format=csv', headers=auth_headers).data
+
+    response = client.post('/api/tasks/import', data=export, headers=auth_headers,
+                           content_type='text/csv')
+    assert response.get_json() == {'accepted': 3, 'rejected': 0, 'errors': []}
+    total = client.get('/api/tasks', headers=auth_headers).get_json()['pagination']['total']
+    assert total == 6
+
+
+def test_import_tasks_unsupported_content_type(client, auth_headers):
+    """Test qu'un corps d'un autre type est refusé."""
+    response = client.post('/api/tasks/import', json=[{'title': 'A'}], headers=auth_headers)
+    assert response.status_code == 415
+
+
+def get_stats(client, headers):
+    response = client.get('/api/tasks/stats', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['stats']
+
+
+def test_task_stats_follow_writes(client, auth_headers):
+    """Test que les compteurs suivent chaque écriture, unitaire et groupée."""
+    assert get_stats(client, auth_headers) == {'total': 0, 'completed': 0, 'pending': 0}
+    ids = create_tasks(client, auth_headers, 2)
+    client.post('/api/tasks', json={'title': 'Faite', 'completed': True}, headers=auth_headers)
+    assert get_stats(client, auth_headers) == {'total': 3, 'completed': 1, 'pending': 2}
+
+    client.patch(f'/api/tasks/{ids[0]}/toggle', headers=auth_headers)
+    client.put(f'/api/tasks/{ids[1]}', json={'title': 'B', 'completed': True}, headers=auth_headers)
+    client.put(f'/api/tasks/{ids[1]}', json={'title': 'B', 'completed': True}, headers=auth_headers)
+    assert get_stats(client, auth_headers) == {'total': 3, 'completed': 3, 'pending': 0}
+
+    client.delete(f'/api/tasks/{ids[0]}', headers=auth_headers)
+    client.post('/api/tasks/batch', json={'tasks': [
+        {'title': 'C'}, {'title': 'D', 'completed': True}
+    ]}, headers=auth_headers)
+    assert get_stats(client, auth_headers) == {'total': 4, 'completed': 3, 'pending': 1}
+
+    batch_ids = [task['id'] for task in client.get(
+        '/api/tasks?per_page=100', headers=auth_headers).get_json()['tasks']]
+    client.patch('/api/tasks/batch/toggle', json={'ids': batch_ids}, headers=auth_headers)
+    assert get_stats(client, auth_headers) == {'total': 4, 'completed': 1, 'pending': 3}
+
+    client.put('/api/tasks/batch', json={'tasks': [
+        {'id': task_id, 'title': 'E', 'completed': True} for task_id in batch_ids
+    ]}, headers=auth_headers)
+    client.delete('/api/tasks/batch', json={'ids': batch_ids[:2]}, headers=auth_headers)
+    assert get_stats(client, auth_headers) == {'total': 2, 'completed': 2, 'pending': 0}
+
+    client.post('/api/tasks/import', data='{"title": "F"}\n{"title": "G", "completed": true}\n',
+                headers=auth_headers, content_type='application/x-ndjson')
+    assert get_stats(client, auth_headers) == {'total': 4, 'completed': 3, 'pending': 1}
+
+
+def test_reconcile_task_counters(app, client, auth_headers):
+    """Test que la réconciliation corrige les compteurs qui ont divergé et invalide l'ETag de /stats."""
+    create_tasks(client, auth_headers, 3)
+    etag = client.get('/api/tasks/stats', headers=auth_headers).headers['ETag']
+    with app.app_context():
+        # Écriture hors API : les compteurs ne sont pas mis à jour
+        user_id = db.session.scalar(db.select(Task.user_id))
+        db.session.execute(db.update(Task).values(completed=True))
+        db.session.commit()
+        assert tasks.reconcile_task_counters() == 1
+        assert tasks.reconcile_task_counters() == 0
+        assert tasks.reconcile_task_counters(user_id) == 0
+
+    response = client.get('/api/tasks/stats', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['stats'] == {'total': 3, 'completed': 3, 'pending': 0}
+    response = client.get('/api/tasks/stats',
+                          headers={**auth_headers, 'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+
+def test_get_tasks_filters(app, client, auth_headers):
+    """Test les filtres par intervalle de création et par préfixe du titre."""
+    for title in ('Rapport annuel', 'Rapport mensuel', 'rappel', 'Courses'):
+        client.post('/api/tasks', json={'title': title}, headers=auth_headers)
+    with app.app_context():
+        # Dates de création distinctes et connues
+        for day, task in enumerate(db.session.scalars(db.select(Task).order_by(Task.id)), 1):
+            task.created_at = task.created_at.replace(year=2024, month=1, day=day)
+        db.session.commit()
+
+    def titles(query):
+        response = client.get(f'/api/tasks?{query}', headers=auth_headers)
+        assert response.status_code == 200
+        return sorted(task['title'] for task in response.get_json()['tasks'])
+
+    assert titles('title_prefix=Rapport') == ['Rapport annuel', 'Rapport mensuel']
+    assert titles('title_prefix=rap') == ['rappel']
+    assert titles('created_after=2024-01-02T00:00:00&created_before=2024-01-04T00:00:00') == [
+        'Rapport mensuel', 'rappel'
+    ]
+    # Date avec fuseau : convertie en UTC
+    assert titles('created_after=2024-01-04T01:00:00%2B02:00') == ['Courses']
+    assert titles('title_prefix=Rapport&created_after=2024-01-02T00:00:00&cursor=') == [
+        'Rapport mensuel'
+    ]
+
+
+def test_get_tasks_sort_and_fields(client, auth_headers):
+    """Test le tri multi-colonnes (page et curseur) et la projection des colonnes."""
+    client.post('/api/tasks/batch', json={'tasks': [
+        {'title': 'B', 'completed': True}, {'title': 'A'}, {'title': 'C'}, {'title': 'A'},
+        {'title': 'D', 'completed': True}
+    ]}, headers=auth_headers)
+
+    response = client.get('/api/tasks?sort=-completed,title&fields=title,completed',
+                          headers=auth_headers)
+    tasks = response.get_json()['tasks']
+    assert tasks[0] == {'title': 'B', 'completed': True}
+    assert [task['title'] for task in tasks] == ['B', 'D', 'A', 'A', 'C']
+
+    # Curseur sur un tri en sens mélangés
+    seen, cursor = [], ''
+    while cursor is not None:
+        data = client.get(f'/api/tasks?sort=-completed,title&fields=id,title&per_page=2'
+                          f'&cursor={cursor}', headers=auth_headers).get_json()
+        assert all(set(task) == {'id', 'title'} for task in data['tasks'])
+        seen.extend(task['title'] for task in data['tasks'])
+        cursor = data['pagination']['next_cursor']
+    assert seen == ['B', 'D', 'A', 'A', 'C']
+
+    # Sans paramètre : toutes les colonnes, comme to_dict
+    task = client.get('/api/tasks', headers=auth_headers).get_json()['tasks'][0]
+    assert list(task) == ['id', 'title', 'description', 'completed', 'created_at',
+                          'updated_at', 'user_id']
+
+
+@pytest.mark.parametrize('query', [
+    'sort=password', 'sort=title,-title', 'fields=id,secret', 'fields=-id', 'fields=title,-title', 'completed=peut-être',
+    'created_after=2024-02-01T00:00:00&created_before=2024-01-01T00:00:00',
+    'title_prefix=', 'sort=title&cursor=WyJhIl0',
+])
+def test_get_tasks_invalid_query(client, auth_headers, query):
+    """Test le rejet des filtres, tris et colonnes invalides."""
+    response = client.get(f'/api/tasks?{query}', headers=auth_headers)
+    assert response.status_code == 400